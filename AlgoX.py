@@ -1,7 +1,15 @@
-from itertools import product
+import random
+from itertools import combinations, product
+from time import perf_counter
 
-def solve_sudoku(size, grid):
-    """An efficient Sudoku solver using Algorithm X."""
+import numpy as np
+
+# Prebuilt exact-cover tables, keyed by box size (num_rows, num_cols)
+_templates = {}
+_int_templates = {}
+
+def build_template(size) -> tuple:
+    """Build the exact-cover tables (X, Y) for an empty grid with boxes of the given size."""
     num_rows, num_cols = size
     N = num_rows * num_cols
 
@@ -24,21 +32,261 @@ def solve_sudoku(size, grid):
         ]
 
     X = inverse_representation(Y, X)
+
+    return X, Y
+
+def get_template(size) -> tuple:
+    """Return the cached exact-cover tables for the given box size, building them on first use.
+    
+    The returned tables are shared, so callers must not modify them - use `working_copy` instead."""
+    key = tuple(size)
+    template = _templates.get(key)
+    if template is None:
+        template = _templates[key] = build_template(key)
+    return template
+
+def working_copy(size) -> tuple:
+    """Return a fresh (X, Y) pair for the given box size that a solve is free to cover and uncover.
     
-    # Remove constraints that are already satisfied 
-    try:
-        for i, row in enumerate(grid):
-            for j, n in enumerate(row):
-                if n:
-                    cover(X, Y, (i, j, n))
-    except KeyError as e:
-        # Key Error arises when we can't remove _____ - there is no solution
-        yield [[-1]*9]*9
+    Only the column sets of X are mutated by `cover`/`uncover`, so Y is shared with the template."""
+    X, Y = get_template(size)
+    return {col: set(rows) for col, rows in X.items()}, Y
+
+def build_int_template(size) -> tuple:
+    """Build the exact-cover tables (X, Y) for an empty grid with every choice and constraint numbered.
+
+    Choice (r * N + c) * N + n - 1 puts n at (r, c), as in `DLX`, and the constraints are numbered
+    densely in blocks of N * N: the cell r * N + c, then the row, column and box of n. Y is a list,
+    indexed by choice, of the tuples of its constraints, computed as one NumPy array, and X is a
+    list, indexed by constraint, of its choices. A search over them hashes nothing but small ints."""
+    num_rows, num_cols = size
+    N = num_rows * num_cols
+    row, col, n = np.indices((N, N, N)).reshape(3, -1)
+    box = (row // num_rows) * num_rows + col // num_cols
+    constraints = np.stack([row * N + col, (1 * N + row) * N + n, (2 * N + col) * N + n, (3 * N + box) * N + n], axis=1)
+
+    Y = list(map(tuple, constraints.tolist()))
+    X = [set() for _ in range(4 * N * N)]
+    for choice, choice_constraints in enumerate(Y):
+        for constraint in choice_constraints:
+            X[constraint].add(choice)
+    return X, Y
+
+def get_int_template(size) -> tuple:
+    """Return the cached integer tables of `build_int_template`, which callers must not modify."""
+    key = tuple(size)
+    template = _int_templates.get(key)
+    if template is None:
+        template = _int_templates[key] = build_int_template(key)
+    return template
+
+def solve_sudoku(size, grid, stats=None, propagate=(), budget=None, choose="any"):
+    """An efficient Sudoku solver using Algorithm X.
     
-    for solution in solve(X, Y, []):
+    Pass a `SearchStats` as stats to count the search and time its phases, and the names of
+    rules from `RULES` as propagate to run them at every search node before branching. Pass a
+    `SearchBudget` as budget to stop the search with `BudgetExceeded` once it runs out. choose is
+    how the column to branch on is picked, one of `CHOICES`."""
+    if stats is not None:
+        start = perf_counter()
+    propagator = Propagator(propagate, size) if propagate else None
+
+    # Start from tables with the constraints that are already satisfied removed
+    tables = reduced_copy(size, grid)
+    if tables is None:
+        # Two givens share a constraint - there is no solution
+        N = size[0] * size[1]
+        yield [[-1] * N for _ in range(N)]
+        return
+    X, Y = tables
+
+    if stats is not None:
+        start = stats.lap("build", start)
+    for solution in solve(X, Y, [], stats, propagator, budget, choose):
+        if stats is not None:
+            start = stats.lap("search", start)
         for (row, col, number) in solution:
             grid[row][col] = number
+        if stats is not None:
+            stats.lap("write_back", start)
         yield grid
+        if stats is not None:
+            start = perf_counter()
+    if stats is not None:
+        stats.lap("search", start)
+
+def reduced_copy(size, grid):
+    """Return (X, Y) for grid with the constraints of its givens already satisfied, or None if two givens clash.
+
+    This gives the same tables as covering every given on a `working_copy`, but is built from the
+    shared template with whole-set operations: a row survives only if none of its constraints is
+    satisfied by a given, so each open column is its template column minus the rows touching a
+    satisfied one."""
+    template, Y = get_template(size)
+    if hasattr(grid, "tolist"):
+        grid = grid.tolist()  # plain ints hash much faster than numpy scalars
+
+    satisfied = set()
+    for i, values in enumerate(grid):
+        for j, n in enumerate(values):
+            if n:
+                constraints = Y.get((i, j, n))
+                if constraints is None:
+                    return None  # not a number that fits the grid
+                for constraint in constraints:
+                    if constraint in satisfied:
+                        return None
+                    satisfied.add(constraint)
+
+    dead = set()
+    for constraint in satisfied:
+        dead.update(template[constraint])
+    X = {col: rows - dead for col, rows in template.items() if col not in satisfied}
+    return X, Y
+
+def solve_array(grid, size=(3, 3), stats=None, budget=None, choose="any"):
+    """Yield every solution of a NumPy grid as a new array, searching the integer tables of `get_int_template`.
+
+    grid is read once and left as it is. If two givens clash a grid of -1s is yielded. stats, budget
+    and choose are as for `solve_sudoku`; the propagation rules need the tuple tables and are not
+    available here."""
+    if stats is not None:
+        start = perf_counter()
+    grid = np.asarray(grid)
+    N = size[0] * size[1]
+    tables = reduced_array_copy(size, grid)
+    if tables is None:
+        yield np.full((N, N), -1)
+        return
+    X, Y = tables
+
+    if stats is not None:
+        start = stats.lap("build", start)
+    for solution in solve(X, Y, [], stats, None, budget, choose):
+        if stats is not None:
+            start = stats.lap("search", start)
+        # A choice divided by N gives the flat index of its cell and its number - 1
+        cells, numbers = np.divmod(np.array(solution, dtype=np.intp), N)
+        solved = grid.copy()
+        solved.flat[cells] = numbers + 1
+        if stats is not None:
+            stats.lap("write_back", start)
+        yield solved
+        if stats is not None:
+            start = perf_counter()
+    if stats is not None:
+        stats.lap("search", start)
+
+def enumerate_into(grid, size=(3, 3), out=None, limit: int = None, stats=None, budget=None, choose="any") -> tuple:
+    """Write every solution of a NumPy grid into a uint8 buffer, returning (solutions, count).
+
+    Each solution takes one row of N * N bytes. out may be a preallocated uint8 array of shape
+    (capacity, N, N) or (capacity, N * N), and the search stops once it is full; otherwise a buffer
+    is made and doubled as needed. limit caps the count either way. solutions is a view of the
+    first count rows of the buffer, shaped (count, N, N). The search yields its own row list and
+    the choices are decoded into preallocated arrays, so nothing is allocated per solution."""
+    if stats is not None:
+        start = perf_counter()
+    grid = np.asarray(grid)
+    N = size[0] * size[1]
+    if out is None:
+        buffer = np.empty((64 if limit is None else min(limit, 64), N * N), dtype=np.uint8)
+    else:
+        if out.dtype != np.uint8 or out.size != len(out) * N * N or not out.flags.c_contiguous:
+            raise ValueError(f"out must be a contiguous uint8 array of shape (capacity, {N}, {N}), not {out.dtype} {out.shape}")
+        buffer = out.reshape(len(out), N * N)  # a view, so out is written through it
+        limit = len(out) if limit is None else min(limit, len(out))
+
+    tables = reduced_array_copy(size, grid)
+    total = 0
+    if tables is not None and (limit is None or limit > 0):
+        X, Y = tables
+        base = grid.astype(np.uint8).ravel()
+        choices = np.empty(len(X) // 4, dtype=np.intp)  # one choice for each empty cell
+        cells, numbers = np.empty_like(choices), np.empty_like(choices)
+
+        if stats is not None:
+            start = stats.lap("build", start)
+        for solution in solve(X, Y, [], stats, None, budget, choose, copy=False):
+            if stats is not None:
+                start = stats.lap("search", start)
+            if total == len(buffer):
+                grown = np.empty((2 * total if limit is None else min(2 * total, limit), N * N), dtype=np.uint8)
+                grown[:total] = buffer
+                buffer = grown
+            choices[:] = solution
+            np.divmod(choices, N, out=(cells, numbers))
+            numbers += 1
+            row = buffer[total]
+            row[:] = base
+            row[cells] = numbers
+            total += 1
+            if stats is not None:
+                start = stats.lap("write_back", start)
+            if total == limit:
+                break
+        if stats is not None:
+            stats.lap("search", start)
+    return buffer[:total].reshape(total, N, N), total
+
+def reduced_array_copy(size, grid):
+    """Return the integer tables (X, Y) for a NumPy grid with the constraints of its givens already
+    satisfied, or None if two givens clash, as `reduced_copy` does for the tuple tables."""
+    template, Y = get_int_template(size)
+    N = size[0] * size[1]
+    grid = np.asarray(grid)
+    rows, cols = np.nonzero(grid)
+    numbers = grid[rows, cols].astype(np.intp)
+    if ((numbers < 1) | (numbers > N)).any():
+        return None  # not a number that fits the grid
+
+    satisfied = set()
+    for choice in ((rows * N + cols) * N + numbers - 1).tolist():
+        for constraint in Y[choice]:
+            if constraint in satisfied:
+                return None
+            satisfied.add(constraint)
+
+    dead = set()
+    for constraint in satisfied:
+        dead.update(template[constraint])
+    X = {col: rows - dead for col, rows in enumerate(template) if col not in satisfied}
+    return X, Y
+
+def count_solutions(grid, limit: int = 2, size=(3, 3), choose: str = "any") -> int:
+    """Return the number of solutions of grid, stopping once limit have been found.
+
+    No grids are built, and the tables come from `reduced_array_copy` of the shared integer template."""
+    tables = reduced_array_copy(size, grid)
+    if tables is None:
+        return 0
+    return count(*tables, limit, choose)
+
+def is_unique(grid, size=(3, 3)) -> bool:
+    """Return True if grid has exactly one solution."""
+    return count_solutions(grid, 2, size) == 1
+
+def count(X, Y, limit: int, choose: str = "any", budget=None) -> int:
+    """Return the number of exact covers left in X, stopping once limit have been found.
+
+    X is searched in place with an explicit stack, as in `solve`, and is restored before returning
+    unless budget runs out, in which case the `BudgetExceeded` leaves it part way."""
+    index = ColumnIndex(X, choose)
+    total = 0
+    stack = []  # the levels of the search, see `push_level`
+    while True:
+        if budget is not None:
+            budget.tick()
+        if not X:
+            total += 1
+        else:
+            push_level(X, Y, stack, index)
+
+        if total >= limit:
+            for frame in stack:
+                frame[2] = iter(())  # try no more rows, so that next_row puts X back
+        if not next_row(X, Y, stack, index):
+            return total
 
 def inverse_representation(constraints_per_choice, constraints):
     """Return the inverse representation of the constraints satisfied by each choice.
@@ -52,24 +300,159 @@ def inverse_representation(constraints_per_choice, constraints):
     
     return choices_per_constraint
 
-def solve(X, Y, solution) -> list:
-    # If no more columns (constraints) left, we have a solution
-    if not X:
-        yield list(solution) 
-    else:
-        min_col = min(X, key=lambda col: len(X[col]))
-        for row in list(X[min_col]):
-            solution.append(row)
-            removed_cols = cover(X, Y, row)
+def solve(X, Y, solution, stats=None, propagator=None, budget=None, choose="any", copy=True) -> list:
+    """Yield every exact cover of X as a list of rows, appended to the rows already in solution.
+
+    With copy False the solution list itself is yielded rather than a copy of it, which saves a
+    list per solution but only holds the cover until the search is resumed.
+
+    The search keeps its own stack instead of recursing, so each solution is yielded straight to the
+    caller and deep searches on large boards do not hit the recursion limit. As in Dancing Links the
+    branching column is covered before any of its rows is tried, which takes it out of X with its
+    rows untouched until it is put back, so they are walked without copying them.
+
+    The column to branch on is one with the fewest rows, found from a `ColumnIndex` that breaks
+    ties as choose says. With stats, the time spent running and undoing the propagator is moved
+    from the "search" phase, which the caller laps around the whole search, to "propagate"."""
+    counting = stats is not None
+    index = ColumnIndex(X, choose)
+    if propagator is not None:
+        propagator.index = index
+    stack = []  # for each level: its column, the column's rows, an iterator over them, the columns covered for the row being tried and the propagator mark
+    while True:
+        # Enter a new node
+        if budget is not None:
+            budget.tick()
+        if counting:
+            stats.nodes += 1
+        mark = None
+        dead = False
+        if propagator is not None:
+            # Make every inference we can before branching, they are undone when this node is left
+            if counting:
+                started = perf_counter()
+            mark = propagator.mark()
+            changes = propagator.run(X, Y, solution)
+            if counting and changes:
+                stats.propagations += changes
+            if changes is None:
+                if counting:
+                    stats.backtracks += 1
+                propagator.undo(X, Y, solution, mark)
+                dead = True
+            if counting:
+                _propagated(stats, started)
 
-            for solution in solve(X, Y, solution):
-                yield solution
-            
-            uncover(X, Y, row, removed_cols)
+        if not dead:
+            if counting:
+                stats.depth(len(solution))
+            # If no more columns (constraints) left, we have a solution
+            if not X:
+                if counting:
+                    stats.solutions += 1
+                yield list(solution) if copy else solution
+                if propagator is not None:
+                    if counting:
+                        started = perf_counter()
+                    propagator.undo(X, Y, solution, mark)
+                    if counting:
+                        _propagated(stats, started)
+            else:
+                min_col = index.smallest(X)
+                if counting and not X[min_col]:
+                    stats.backtracks += 1
+                rows = cover_column(X, Y, min_col, index)
+                stack.append([min_col, rows, iter(rows), None, mark])
 
-            solution.pop()
+        # Move on to the next row of the deepest level that has one left, leaving exhausted levels
+        while stack:
+            frame = stack[-1]
+            col, rows, untried, covered, mark = frame
+            if covered is not None:
+                for j, j_rows in reversed(covered):
+                    uncover_column(X, Y, j, j_rows, index)
+                if counting:
+                    stats.uncovers += 1
+                solution.pop()
+            row = next(untried, None)
+            if row is not None:
+                solution.append(row)
+                frame[3] = [(j, cover_column(X, Y, j, index)) for j in Y[row] if j != col]
+                if counting:
+                    stats.covers += 1
+                break
+            stack.pop()
+            uncover_column(X, Y, col, rows, index)
+            if propagator is not None:
+                if counting:
+                    started = perf_counter()
+                propagator.undo(X, Y, solution, mark)
+                if counting:
+                    _propagated(stats, started)
+        else:
+            return
 
-def cover(X, Y, row) -> list:
+def _propagated(stats, start: float) -> None:
+    """Move the time since start from the search phase to the propagate phase."""
+    seconds = perf_counter() - start
+    stats.phases["propagate"] += seconds
+    stats.phases["search"] -= seconds
+
+# How `ColumnIndex` picks between the columns with the fewest rows. "scan" keeps no index and takes
+# the first smallest column in X, as a plain min() over X does
+CHOICES = ("any", "lowest", "random", "scan")
+
+
+class ColumnIndex:
+    """The columns of X bucketed by how many rows they have, so that a smallest one is found by looking
+    at a few buckets rather than every column.
+
+    The cover functions keep the buckets up to date when they are passed the index. choose breaks
+    ties between the smallest columns: "any", the default, takes whichever the bucket gives first in
+    O(1). For the tuple tables that depends on string hashing and so changes from run to run; the
+    integer tables give the same order every run. "lowest" takes the smallest column key, which
+    makes the search the same on every run but costs a scan of the smallest bucket at every node.
+    "random" takes a random one from a generator seeded with seed. `benchmark.py --choices`
+    compares them."""
+
+    __slots__ = ("buckets", "choose", "rng")
+
+    def __init__(self, X, choose: str = "any", seed=0) -> None:
+        if choose not in CHOICES:
+            raise ValueError(f"Unknown column choice {choose!r}, expected one of {CHOICES}")
+        self.choose = choose
+        self.rng = random.Random(seed) if choose == "random" else None
+        self.buckets = None
+        if choose != "scan":
+            self.buckets = [set() for _ in range(max(map(len, X.values()), default=0) + 1)]
+            for col, rows in X.items():
+                self.buckets[len(rows)].add(col)
+
+    def smallest(self, X):
+        """Return a column of X with the fewest rows."""
+        if self.buckets is None:
+            return min(X, key=lambda col: len(X[col]))
+        for bucket in self.buckets:
+            if bucket:
+                if self.choose == "any":
+                    return next(iter(bucket))
+                if self.choose == "lowest":
+                    return min(bucket)
+                return self.rng.choice(tuple(bucket))
+
+    def shrink(self, col, size: int) -> None:
+        """Move col to the bucket for size after it lost a row."""
+        self.buckets[size + 1].remove(col)
+        self.buckets[size].add(col)
+
+    def grow(self, col, size: int) -> None:
+        """Move col to the bucket for size after it gained a row."""
+        self.buckets[size - 1].remove(col)
+        self.buckets[size].add(col)
+
+def cover(X, Y, row, index=None) -> list:
+    if index is not None and index.buckets is not None:
+        return [cover_column(X, Y, j, index) for j in Y[row]]
     removed_cols = [] # Keep track of columns removed
     for j in Y[row]:
         for i in X[j]:
@@ -79,7 +462,55 @@ def cover(X, Y, row) -> list:
         removed_cols.append(X.pop(j))
     return removed_cols
 
-def uncover(X, Y, row, removed_cols) -> None:
+def cover_column(X, Y, col, index=None) -> set:
+    """Remove a column and every row in it from X, returning its rows to pass to `uncover_column`.
+
+    Covering the columns of a row one at a time like this has the same effect as `cover`."""
+    rows = X.pop(col)
+    buckets = index.buckets if index is not None else None
+    if buckets is None:
+        for i in rows:
+            for k in Y[i]:
+                if k != col:
+                    X[k].remove(i)
+        return rows
+
+    buckets[len(rows)].remove(col)
+    for i in rows:
+        for k in Y[i]:
+            if k != col:
+                column = X[k]
+                column.remove(i)
+                size = len(column)
+                buckets[size + 1].remove(k)
+                buckets[size].add(k)
+    return rows
+
+def uncover_column(X, Y, col, rows, index=None) -> None:
+    """Undo `cover_column`, which must be done in the reverse order of the covers."""
+    buckets = index.buckets if index is not None else None
+    if buckets is None:
+        for i in rows:
+            for k in Y[i]:
+                if k != col:
+                    X[k].add(i)
+    else:
+        for i in rows:
+            for k in Y[i]:
+                if k != col:
+                    column = X[k]
+                    column.add(i)
+                    size = len(column)
+                    buckets[size - 1].remove(k)
+                    buckets[size].add(k)
+        buckets[len(rows)].add(col)
+    X[col] = rows
+
+def uncover(X, Y, row, removed_cols, index=None) -> None:
+    if index is not None and index.buckets is not None:
+        for j in reversed(Y[row]):
+            uncover_column(X, Y, j, removed_cols.pop(), index)
+        return
     # Insert the removed columns in the reverse order of when they were removed
     for j in reversed(Y[row]):
         X[j] = removed_cols.pop()
@@ -89,6 +520,200 @@ def uncover(X, Y, row, removed_cols) -> None:
                 if k != j:
                     X[k].add(i)
 
+def push_level(X, Y, stack, index) -> list:
+    """Cover a column of X with the fewest rows and push it onto stack as a new level of an explicit-stack search.
+
+    A level is [column, its rows, an iterator over the rows to try, the columns covered for the row
+    being tried], and is returned so the caller can change the order its rows are tried in."""
+    col = index.smallest(X)
+    rows = cover_column(X, Y, col, index)
+    frame = [col, rows, iter(rows), None]
+    stack.append(frame)
+    return frame
+
+def next_row(X, Y, stack, index, solution=None) -> bool:
+    """Move the search on to the next row of the deepest level of stack that has one left.
+
+    The row being tried at that level is uncovered, and popped from solution if one is given, before
+    the next row is covered and appended. Levels with no rows left are popped and their column put
+    back. Returns False once stack is empty, when X is as it was before the first `push_level`."""
+    while stack:
+        frame = stack[-1]
+        col, rows, untried, covered = frame
+        if covered is not None:
+            for j, j_rows in reversed(covered):
+                uncover_column(X, Y, j, j_rows, index)
+            if solution is not None:
+                solution.pop()
+        row = next(untried, None)
+        if row is not None:
+            if solution is not None:
+                solution.append(row)
+            frame[3] = [(j, cover_column(X, Y, j, index)) for j in Y[row] if j != col]
+            return True
+        stack.pop()
+        uncover_column(X, Y, col, rows, index)
+    return False
+
+class Propagator:
+    """Runs a set of Sudoku inference rules to a fixed point at a search node.
+
+    Rows the rules force into the solution are covered and rows they rule out are removed from
+    their columns. Both are recorded on a trail so the node can be restored exactly on backtrack."""
+
+    def __init__(self, rules, size) -> None:
+        unknown = [name for name in rules if name not in RULES]
+        if unknown:
+            raise ValueError(f"Unknown propagation rules {unknown}, expected some of {sorted(RULES)}")
+        self.rules = [RULES[name] for name in rules]
+        self.units = get_units(size)
+        self.trail = []
+        self.index = None  # the `ColumnIndex` of the search, kept up to date by every change
+
+    def mark(self) -> int:
+        return len(self.trail)
+
+    def force(self, X, Y, solution, row) -> None:
+        """Add row to the solution."""
+        solution.append(row)
+        self.trail.append((row, cover(X, Y, row, self.index)))
+
+    def eliminate(self, X, Y, row) -> None:
+        """Remove row from the matrix without choosing it."""
+        buckets = self.index.buckets if self.index is not None else None
+        for j in Y[row]:
+            X[j].remove(row)
+            if buckets is not None:
+                self.index.shrink(j, len(X[j]))
+        self.trail.append((row, None))
+
+    def undo(self, X, Y, solution, mark: int) -> None:
+        """Take back every force and elimination made since mark, most recent first."""
+        trail = self.trail
+        while len(trail) > mark:
+            row, removed_cols = trail.pop()
+            if removed_cols is None:
+                for j in Y[row]:
+                    X[j].add(row)
+                    if self.index is not None and self.index.buckets is not None:
+                        self.index.grow(j, len(X[j]))
+            else:
+                uncover(X, Y, row, removed_cols, self.index)
+                solution.pop()
+
+    def run(self, X, Y, solution):
+        """Apply the rules until none of them changes anything.
+
+        Return the number of rows forced or eliminated, or None if the node has no solution."""
+        total = 0
+        while True:
+            changes = 0
+            for rule in self.rules:
+                result = rule(self, X, Y, solution)
+                if result is None:
+                    return None
+                changes += result
+            if not changes:
+                return total
+            total += changes
+
+_units = {}
+
+def get_units(size) -> list:
+    """Return the `row-col` columns of every row, column and box of the grid."""
+    key = tuple(size)
+    if key not in _units:
+        num_rows, num_cols = key
+        N = num_rows * num_cols
+        rows = [[("rc", (r, c)) for c in range(N)] for r in range(N)]
+        cols = [[("rc", (r, c)) for r in range(N)] for c in range(N)]
+        boxes = [
+            [("rc", (r, c)) for r in range(top, top + num_rows) for c in range(left, left + num_cols)]
+            for top in range(0, N, num_rows) for left in range(0, N, num_cols)
+        ]
+        _units[key] = rows + cols + boxes
+    return _units[key]
+
+def singles(propagator, X, Y, solution):
+    """Naked and hidden singles: choose the only row left in any column."""
+    changes = 0
+    buckets = propagator.index.buckets if propagator.index is not None else None
+    while True:
+        if buckets is not None:
+            single_cols = [*buckets[0], *buckets[1]] if len(buckets) > 1 else list(buckets[0])
+        else:
+            single_cols = [col for col, rows in X.items() if len(rows) < 2]
+        if not single_cols:
+            return changes
+        for col in single_cols:
+            rows = X.get(col)
+            if rows is None:
+                continue  # covered by a row forced earlier in this pass
+            if not rows:
+                return None
+            if len(rows) == 1:
+                propagator.force(X, Y, solution, next(iter(rows)))
+                changes += 1
+
+def naked_subsets(k: int):
+    """Return the rule for naked subsets of size k: if k cells of a unit have only k numbers between
+    them, those numbers can be removed from every other cell of the unit."""
+    def rule(propagator, X, Y, solution):
+        changes = 0
+        for unit in propagator.units:
+            cells = [X[cell] for cell in unit if cell in X]
+            if len(cells) <= k:
+                continue
+            numbers = [{number for (_, _, number) in rows} for rows in cells]
+            small = [i for i, nums in enumerate(numbers) if 2 <= len(nums) <= k]
+            for subset in combinations(small, k):
+                union = set().union(*(numbers[i] for i in subset))
+                if len(union) != k:
+                    continue
+                for i, rows in enumerate(cells):
+                    if i in subset:
+                        continue
+                    for row in [row for row in rows if row[2] in union]:
+                        propagator.eliminate(X, Y, row)
+                        changes += 1
+        return changes
+    return rule
+
+def box_line(propagator, X, Y, solution):
+    """Pointing and claiming: if a number can only go in one line of a box, it cannot go anywhere
+    else in that line, and if it can only go in one box of a line, nowhere else in that box."""
+    changes = 0
+    for (kind, (unit, number)), rows in X.items():
+        if len(rows) < 2:
+            continue
+        if kind == "bn":
+            # Pointing - the rows share a grid row or grid column
+            for position, line_kind in ((0, "rn"), (1, "cn")):
+                lines = {row[position] for row in rows}
+                if len(lines) == 1:
+                    line = X.get((line_kind, (lines.pop(), number)), ())
+                    for row in [row for row in line if Y[row][3][1][0] != unit]:
+                        propagator.eliminate(X, Y, row)
+                        changes += 1
+        elif kind in ("rn", "cn"):
+            # Claiming - the rows share a box
+            boxes = {Y[row][3][1][0] for row in rows}
+            if len(boxes) == 1:
+                position = 0 if kind == "rn" else 1
+                box = X.get(("bn", (boxes.pop(), number)), ())
+                for row in [row for row in box if row[position] != unit]:
+                    propagator.eliminate(X, Y, row)
+                    changes += 1
+    return changes
+
+# The rules that can be passed to `solve_sudoku` as propagate
+RULES = {
+    "singles": singles,
+    "naked_pairs": naked_subsets(2),
+    "naked_triples": naked_subsets(3),
+    "box_line": box_line,
+}
+
 def test() -> None:
     valid_grid = [
         [5, 3, 0, 0, 7, 0, 0, 0, 0],
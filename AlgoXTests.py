@@ -26,5 +26,192 @@ class TestSolver(unittest.TestCase):
 
         self.assertEqual(expected_solution, [choice for choice in actual_solution])
 
+class TestTemplate(unittest.TestCase):
+    def test_template_is_cached(self):
+        self.assertIs(get_template((3, 3)), get_template((3, 3)))
+
+    def test_working_copy_does_not_touch_template(self):
+        X, Y = working_copy((3, 3))
+        cover(X, Y, (0, 0, 5))
+
+        template_X, _ = get_template((3, 3))
+        self.assertEqual(len(template_X), 324)
+        self.assertEqual(len(template_X[("rc", (0, 1))]), 9)
+        self.assertEqual(len(X[("rc", (0, 1))]), 8)
+
+class TestPropagation(unittest.TestCase):
+    def test_rules_keep_every_solution(self):
+        grid = [[1, 2, 3, 4, 5, 6], [4, 5, 6, 0, 0, 0], [0] * 6, [0] * 6, [2, 0, 0, 0, 0, 0], [0, 0, 0, 0, 0, 1]]
+        for rules in [(), ("singles",), ("box_line",), ("naked_pairs", "naked_triples"), tuple(RULES)]:
+            with self.subTest(rules=rules):
+                solutions = {str(s) for s in solve_sudoku((2, 3), [row[:] for row in grid], propagate=rules)}
+                self.assertEqual(len(solutions), 272)
+
+    def test_singles_reduce_branching(self):
+        from SearchStats import SearchStats
+        grid = [
+            [0, 0, 0, 0, 0, 0, 0, 1, 2],
+            [0, 0, 0, 0, 3, 5, 0, 0, 0],
+            [0, 0, 0, 6, 0, 0, 0, 7, 0],
+            [7, 0, 0, 0, 0, 0, 3, 0, 0],
+            [0, 0, 0, 4, 0, 0, 8, 0, 0],
+            [1, 0, 0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 0, 1, 2, 0, 0, 0, 0],
+            [0, 8, 0, 0, 0, 0, 0, 4, 0],
+            [0, 5, 0, 0, 0, 0, 6, 0, 0],
+            ]
+        plain, propagated = SearchStats(), SearchStats()
+        expected = [row[:] for row in next(solve_sudoku((3, 3), [row[:] for row in grid], plain))]
+        actual = next(solve_sudoku((3, 3), [row[:] for row in grid], propagated, ("singles", "box_line")))
+
+        self.assertEqual(actual, expected)
+        self.assertLess(propagated.nodes, plain.nodes)
+        self.assertGreater(propagated.propagations, 0)
+
+    def test_unknown_rule(self):
+        with self.assertRaises(ValueError):
+            list(solve_sudoku((2, 2), [[0] * 4 for _ in range(4)], propagate=("guess",)))
+
+class TestCounting(unittest.TestCase):
+    def test_count_solutions(self):
+        empty = [[0] * 4 for _ in range(4)]
+
+        self.assertEqual(count_solutions(empty, limit=1000, size=(2, 2)), 288)
+        self.assertEqual(count_solutions(empty, limit=5, size=(2, 2)), 5)
+
+    def test_is_unique(self):
+        import numpy as np
+        puzzles = np.load("data/very_easy_puzzle.npy")
+
+        self.assertTrue(all(is_unique(puzzle) for puzzle in puzzles))
+        self.assertFalse(is_unique([[0] * 9 for _ in range(9)]))
+
+    def test_clashing_givens(self):
+        grid = [[0] * 4 for _ in range(4)]
+        grid[0][0] = grid[3][0] = 1
+
+        self.assertEqual(count_solutions(grid, size=(2, 2)), 0)
+
+    def test_reduced_copy_matches_covering_givens(self):
+        grid = [[1, 0, 0, 0], [0, 0, 3, 0], [0, 4, 0, 0], [0, 0, 0, 2]]
+        X, Y = working_copy((2, 2))
+        for i, row in enumerate(grid):
+            for j, n in enumerate(row):
+                if n:
+                    cover(X, Y, (i, j, n))
+
+        self.assertEqual(reduced_copy((2, 2), grid)[0], X)
+
+
+class TestIterative(unittest.TestCase):
+    def test_no_recursion_limit(self):
+        import sys
+        import numpy as np
+        puzzle = np.load("data/large_25_puzzle.npy")[0]
+        limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(100)  # far fewer levels than the 239 empty cells
+        try:
+            solution = next(solve_sudoku((5, 5), puzzle.copy()))
+            self.assertEqual(count_solutions(solution, size=(5, 5)), 1)
+        finally:
+            sys.setrecursionlimit(limit)
+
+    def test_search_restores_tables(self):
+        X, Y = working_copy((2, 2))
+        before = {col: set(rows) for col, rows in X.items()}
+
+        self.assertEqual(len(list(solve(X, Y, []))), 288)
+        self.assertEqual(count(X, Y, 10), 10)
+        self.assertEqual(X, before)
+
+
+class TestColumnIndex(unittest.TestCase):
+    def test_every_choice_counts_the_same(self):
+        empty = [[0] * 4 for _ in range(4)]
+        for choose in CHOICES:
+            self.assertEqual(count_solutions(empty, limit=1000, size=(2, 2), choose=choose), 288, choose)
+
+    def test_buckets_follow_the_search(self):
+        X, Y = working_copy((2, 2))
+        index = ColumnIndex(X)
+        removed = [cover_column(X, Y, col, index) for col in [("rc", (0, 0)), ("rn", (1, 2))]]
+        self.assertEqual(len(X[index.smallest(X)]), min(len(rows) for rows in X.values()))
+        for col, rows in reversed(list(zip([("rc", (0, 0)), ("rn", (1, 2))], removed))):
+            uncover_column(X, Y, col, rows, index)
+
+        for size, bucket in enumerate(index.buckets):
+            self.assertTrue(all(len(X[col]) == size for col in bucket))
+        self.assertEqual(sum(map(len, index.buckets)), len(X))
+
+    def test_propagation_with_index(self):
+        grid = [[1, 2, 3, 4, 5, 6], [4, 5, 6, 0, 0, 0], [0] * 6, [0] * 6, [2, 0, 0, 0, 0, 0], [0, 0, 0, 0, 0, 1]]
+        for choose in CHOICES:
+            solutions = solve_sudoku((2, 3), [row[:] for row in grid], propagate=RULES, choose=choose)
+            self.assertEqual(sum(1 for _ in solutions), 272, choose)
+
+    def test_unknown_choice(self):
+        with self.assertRaises(ValueError):
+            count_solutions([[0] * 4 for _ in range(4)], size=(2, 2), choose="best")
+
+
+class TestIntegerTables(unittest.TestCase):
+    def test_encoding(self):
+        X, Y = get_int_template((3, 3))
+
+        self.assertEqual(len(X), 324)
+        # 7 at row 4, column 5 is in box 4
+        self.assertEqual(Y[4 * 81 + 5 * 9 + 6], (4 * 9 + 5, 81 + 4 * 9 + 6, 162 + 5 * 9 + 6, 243 + 4 * 9 + 6))
+        self.assertTrue(all(len(rows) == 9 for rows in X))
+
+    def test_solve_array_matches_solve_sudoku(self):
+        import numpy as np
+        for difficulty, size in [("hard", (3, 3)), ("large_16", (4, 4))]:
+            for puzzle in np.load(f"data/{difficulty}_puzzle.npy")[:5]:
+                before = puzzle.copy()
+                expected = [np.array(solution) for solution in solve_sudoku(size, puzzle.copy())]
+                actual = list(solve_array(puzzle, size))
+
+                np.testing.assert_array_equal(actual, expected)
+                np.testing.assert_array_equal(puzzle, before)
+
+    def test_solve_array_clashing_givens(self):
+        import numpy as np
+        grid = np.zeros((4, 4), dtype=int)
+        grid[0, 0] = grid[3, 0] = 1
+
+        self.assertTrue((next(solve_array(grid, (2, 2))) == -1).all())
+        self.assertEqual(len(list(solve_array(np.zeros((4, 4), dtype=int), (2, 2)))), 288)
+
+
+class TestEnumerateInto(unittest.TestCase):
+    def setUp(self):
+        import numpy as np
+        self.grid = np.array([[1, 2, 3, 4, 5, 6], [4, 5, 6, 0, 0, 0], [0] * 6, [0] * 6, [2, 0, 0, 0, 0, 0], [0, 0, 0, 0, 0, 1]])
+        self.expected = sorted(str(solution) for solution in solve_sudoku((2, 3), self.grid.tolist()))
+
+    def test_growable_buffer(self):
+        solutions, total = enumerate_into(self.grid, (2, 3))
+
+        self.assertEqual(total, 272)
+        self.assertEqual(solutions.shape, (272, 6, 6))
+        self.assertEqual(solutions.dtype.name, "uint8")
+        self.assertEqual(sorted(str(solution.tolist()) for solution in solutions), self.expected)
+
+    def test_caller_buffer_and_limit(self):
+        import numpy as np
+        out = np.zeros((100, 6, 6), dtype=np.uint8)
+        solutions, total = enumerate_into(self.grid, (2, 3), out)
+
+        self.assertEqual(total, 100)
+        self.assertTrue(np.shares_memory(solutions, out))
+        self.assertTrue((out > 0).all())
+        self.assertEqual(enumerate_into(self.grid, (2, 3), out, limit=5)[1], 5)
+        self.assertEqual(enumerate_into(self.grid, (2, 3), limit=70)[0].shape, (70, 6, 6))
+
+    def test_bad_buffer(self):
+        import numpy as np
+        with self.assertRaises(ValueError):
+            enumerate_into(self.grid, (2, 3), np.zeros((10, 36), dtype=int))
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,87 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from Engines import get_engine
+
+def solve_many(puzzles, engine: str = "dlx", workers: int = None, chunksize: int = None, size=(3, 3)) -> np.ndarray:
+    """Solve a stack of puzzles, returning the solutions as an array of the same shape in input order.
+
+    Chunks of the stack are solved in a pool of worker processes, which read the puzzles from and
+    write the solutions to shared memory so no grid is pickled. Puzzles without a solution come
+    back as grids of -1s."""
+    puzzles = np.asarray(puzzles)
+    get_engine(engine)  # fail early on an unknown engine
+    out_dtype = np.result_type(puzzles.dtype, np.int8)  # must be able to hold -1
+    count = len(puzzles)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, count))
+    if chunksize is None:
+        chunksize = max(1, -(-count // (workers * 4)))
+
+    if workers == 1:
+        results = np.empty(puzzles.shape, dtype=out_dtype)
+        _solve_range(puzzles, results, 0, count, engine, size)
+        return results
+
+    shm_in = SharedMemory(create=True, size=max(1, puzzles.nbytes))
+    shm_out = SharedMemory(create=True, size=max(1, count * puzzles[0].size * np.dtype(out_dtype).itemsize))
+    try:
+        shared_puzzles = np.ndarray(puzzles.shape, dtype=puzzles.dtype, buffer=shm_in.buf)
+        shared_puzzles[:] = puzzles
+        shared_results = np.ndarray(puzzles.shape, dtype=out_dtype, buffer=shm_out.buf)
+
+        layout = (shm_in.name, shm_out.name, puzzles.shape, puzzles.dtype.str, np.dtype(out_dtype).str)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_solve_chunk, layout, start, min(start + chunksize, count), engine, size)
+                for start in range(0, count, chunksize)
+            ]
+            for future in futures:
+                future.result()
+
+        results = shared_results.copy()
+        del shared_puzzles, shared_results  # release the views before closing the buffers
+    finally:
+        for shm in (shm_in, shm_out):
+            shm.close()
+            shm.unlink()
+
+    return results
+
+def _solve_range(puzzles, results, start: int, stop: int, engine: str, size) -> None:
+    """Solve puzzles[start:stop] into results[start:stop]."""
+    solve = get_engine(engine)
+    for i in range(start, stop):
+        results[i] = solve(puzzles[i], size)
+
+def _solve_chunk(layout, start: int, stop: int, engine: str, size) -> None:
+    """Worker entry point: attach to the shared buffers described by layout and solve one chunk."""
+    in_name, out_name, shape, in_dtype, out_dtype = layout
+    shm_in, shm_out = SharedMemory(name=in_name), SharedMemory(name=out_name)
+    try:
+        puzzles = np.ndarray(shape, dtype=in_dtype, buffer=shm_in.buf)
+        results = np.ndarray(shape, dtype=out_dtype, buffer=shm_out.buf)
+        _solve_range(puzzles, results, start, stop, engine, size)
+        del puzzles, results
+    finally:
+        shm_in.close()
+        shm_out.close()
+
+if __name__ == "__main__":
+    import time
+
+    for difficulty in ['very_easy', 'easy', 'medium', 'hard']:
+        sudokus = np.load(f"data/{difficulty}_puzzle.npy")
+        solutions = np.load(f"data/{difficulty}_solution.npy")
+
+        start_time = time.perf_counter()
+        results = solve_many(sudokus)
+        end_time = time.perf_counter()
+
+        correct = sum(np.array_equal(results[i], solutions[i]) for i in range(len(sudokus)))
+        print(f"{correct}/{len(sudokus)} {difficulty} sudokus correct in {end_time - start_time:.3f} seconds")
@@ -0,0 +1,40 @@
+import unittest
+
+import numpy as np
+
+from BatchSolver import solve_many
+
+
+class TestSolveMany(unittest.TestCase):
+    def setUp(self) -> None:
+        self.puzzles = np.load("data/easy_puzzle.npy")
+        self.solutions = np.load("data/easy_solution.npy")
+
+    def test_inline(self) -> None:
+        results = solve_many(self.puzzles, workers=1)
+
+        self.assertEqual(results.shape, self.puzzles.shape)
+        np.testing.assert_array_equal(results, self.solutions)
+
+    def test_process_pool_keeps_input_order(self) -> None:
+        for engine in ["algox", "dlx", "dfs"]:
+            with self.subTest(engine=engine):
+                results = solve_many(self.puzzles, engine=engine, workers=2, chunksize=4)
+                np.testing.assert_array_equal(results, self.solutions)
+
+    def test_invalid_givens_come_back_unsolved(self) -> None:
+        puzzles = self.puzzles[:3].copy()
+        puzzles[0, 0, 0] = -1
+        puzzles[1, 0, 0] = 10
+        for engine in ["algox", "dlx", "dfs"]:
+            with self.subTest(engine=engine):
+                results = solve_many(puzzles, engine=engine, workers=1)
+                self.assertTrue((results[:2] == -1).all())
+                np.testing.assert_array_equal(results[2], self.solutions[2])
+
+    def test_unknown_engine(self) -> None:
+        with self.assertRaises(ValueError):
+            solve_many(self.puzzles, engine="guess")
+
+if __name__ == "__main__":
+    unittest.main()
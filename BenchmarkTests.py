@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from benchmark import *
+
+
+class TestBenchmark(unittest.TestCase):
+    def setUp(self) -> None:
+        # Two-puzzle corpora of 9x9 and 16x16 boards
+        self.tmp = tempfile.TemporaryDirectory()
+        for corpus in ("hard", "large_16"):
+            for kind in ("puzzle", "solution"):
+                stack = np.load(f"data/{corpus}_{kind}.npy")
+                np.save(os.path.join(self.tmp.name, f"{corpus}_{kind}.npy"), stack[2:4])
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_run_and_compare(self) -> None:
+        report = run(["algox", "dfs_mrv"], ["hard", "large_16"], data_dir=self.tmp.name, timeout=10.0)
+
+        for engine in ("algox", "dfs_mrv"):
+            for corpus in ("hard", "large_16"):
+                stats = report["results"][engine][corpus]
+                self.assertEqual((stats["puzzles"], stats["correct"], stats["timeouts"]), (2, 2, 0))
+                self.assertGreater(stats["peak_memory"], 0)
+        self.assertEqual(compare(report, report, 0.2), [])
+
+        baseline = {"results": {"algox": {"hard": dict(report["results"]["algox"]["hard"], p50=report["results"]["algox"]["hard"]["p50"] / 2)}}}
+        self.assertEqual(len(compare(report, baseline, 0.2)), 1)
+
+    def test_rules_and_choices(self) -> None:
+        for corpus in ("hard", "large_16"):
+            with self.subTest(corpus=corpus):
+                rules = bench_rules(corpus, self.tmp.name)
+                self.assertEqual([result["rules"] for result in rules], [list(rules) for rules in RULE_SETS])
+                self.assertTrue(all(result["nodes"] >= 2 for result in rules))
+
+                choices = bench_choices(corpus, self.tmp.name)
+                self.assertEqual([result["choose"] for result in choices], list(AlgoX.CHOICES))
+                self.assertTrue(all(result["nodes"] >= 2 for result in choices))
+
+    def test_setup(self) -> None:
+        result = bench_setup((2, 2), repeats=2)
+
+        self.assertGreater(result["rebuild"], 0)
+        self.assertGreater(result["template_copy"], 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,206 @@
+import os
+
+import numpy as np
+
+import LineFormat
+from LineFormat import format_line
+
+# Packed corpus layout: a fixed header followed by fixed-size records. Boards up to 14 x 14 take
+# 4 bits per cell, two cells per byte with the first cell in the high nibble; larger boards take a
+# byte per cell. The all-ones value of a cell stores a -1 (unsolvable) cell.
+MAGIC = b"SUDOKUP1"
+HEADER_SIZE = 16
+PACKED_SUFFIX = ".sdkp"
+
+def cell_bits(N: int = 9) -> int:
+    """Return the bits per cell used to pack an N x N grid."""
+    return 4 if N <= 14 else 8
+
+def record_size(N: int = 9) -> int:
+    """Return the number of bytes a packed N x N grid takes."""
+    return (N * N * cell_bits(N) + 7) // 8
+
+def parse_line(line, N: int = 9) -> np.ndarray:
+    """Parse an N*N character line of the `LineFormat` into an N x N grid."""
+    return np.array(LineFormat.parse_line(line, N), dtype=np.int8)
+
+def read_lines(path, start: int = 0, stop: int = None, N: int = 9):
+    """Yield the grids of a one-puzzle-per-line file lazily.
+
+    With start/stop byte offsets only the lines that begin in [start, stop) are read, so a corpus can be
+    sharded by byte range without the shards overlapping or missing a line."""
+    with open(path, "rb") as f:
+        if start:
+            # Skip the rest of the line that straddles start, it belongs to the previous shard
+            f.seek(start - 1)
+            f.readline()
+        while stop is None or f.tell() < stop:
+            line = f.readline()
+            if not line:
+                break
+            if line.strip() and not line.startswith(b"#"):
+                yield parse_line(line, N)
+
+def line_shards(path, shards: int) -> list:
+    """Split a line file into shards byte ranges of roughly equal size, for use with `read_lines`."""
+    total = os.path.getsize(path)
+    bounds = [total * i // shards for i in range(shards + 1)]
+    return list(zip(bounds, bounds[1:]))
+
+def read_npy(path):
+    """Yield the grids of an (N, n, n) .npy stack through a memory map, so only the pages in use are read."""
+    for grid in np.load(path, mmap_mode="r"):
+        yield grid
+
+def pack(grids) -> np.ndarray:
+    """Pack an (N, n, n) stack of grids into an (N, record_size(n)) array of bytes."""
+    grids = np.asarray(grids)
+    N = grids.shape[-1]
+    if N > 254:
+        raise ValueError("The packed format stores at most a byte per cell")
+    cells = grids.reshape(len(grids), -1).astype(np.int16)
+    if cell_bits(N) == 8:
+        return cells.astype(np.uint8)  # -1 wraps round to 0xFF
+    cells[cells < 0] = 0xF
+    if cells.shape[1] % 2:
+        cells = np.pad(cells, ((0, 0), (0, 1)))
+    return ((cells[:, 0::2] << 4) | cells[:, 1::2]).astype(np.uint8)
+
+def unpack(records, N: int = 9) -> np.ndarray:
+    """Unpack an (N, record_size(n)) array of bytes into an (N, n, n) stack of grids."""
+    records = np.asarray(records, dtype=np.uint8)
+    if cell_bits(N) == 8:
+        cells = records.astype(np.int16)
+        cells[cells == 0xFF] = -1
+        return cells.reshape(-1, N, N).astype(np.int8 if N < 128 else np.int16)
+    cells = np.empty((len(records), 2 * records.shape[1]), dtype=np.int8)
+    cells[:, 0::2] = records >> 4
+    cells[:, 1::2] = records & 0xF
+    cells[cells == 0xF] = -1
+    return cells[:, :N * N].reshape(-1, N, N)
+
+def _header(N: int) -> bytes:
+    return MAGIC + bytes([N, cell_bits(N)]) + bytes(HEADER_SIZE - len(MAGIC) - 2)
+
+
+class PackedCorpus:
+    """Random access to a packed corpus file through a memory map."""
+
+    def __init__(self, path) -> None:
+        with open(path, "rb") as f:
+            header = f.read(HEADER_SIZE)
+        if len(header) != HEADER_SIZE or not header.startswith(MAGIC):
+            raise ValueError(f"{path} is not a packed corpus")
+        self.path = path
+        self.N = header[len(MAGIC)]
+        self.record_size = record_size(self.N)
+        # Derive the count from the file size so a partly written corpus is still readable
+        self.count = (os.path.getsize(path) - HEADER_SIZE) // self.record_size
+        if self.count:
+            self.records = np.memmap(path, dtype=np.uint8, mode="r", offset=HEADER_SIZE, shape=(self.count, self.record_size))
+        else:
+            self.records = np.empty((0, self.record_size), dtype=np.uint8)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index):
+        """Return grid index, or a stack of grids for a slice."""
+        if isinstance(index, slice):
+            return unpack(self.records[index], self.N)
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("corpus index out of range")
+        return unpack(self.records[index:index + 1], self.N)[0]
+
+    def __iter__(self):
+        return self.iter_range(0, self.count)
+
+    def iter_range(self, start: int, stop: int, block: int = 1024):
+        """Yield grids start to stop, unpacking block records at a time."""
+        for i in range(start, stop, block):
+            yield from self[i:min(i + block, stop)]
+
+    def byte_offset(self, index: int) -> int:
+        """Return the byte offset in the file of record index."""
+        return HEADER_SIZE + index * self.record_size
+
+    def shard(self, i: int, shards: int) -> range:
+        """Return the record indices of shard i out of shards roughly equal shards."""
+        return range(self.count * i // shards, self.count * (i + 1) // shards)
+
+
+class PackedWriter:
+    """Append grids to a packed corpus file as they arrive."""
+
+    def __init__(self, path, N: int = 9, append: bool = False) -> None:
+        self.N = N
+        exists = append and os.path.exists(path) and os.path.getsize(path) >= HEADER_SIZE
+        if exists:
+            # Records of another board size would be read back as garbage
+            with open(path, "rb") as f:
+                header = f.read(HEADER_SIZE)
+            if not header.startswith(MAGIC):
+                raise ValueError(f"{path} is not a packed corpus")
+            if header != _header(N):
+                raise ValueError(f"{path} holds {header[len(MAGIC)]}x{header[len(MAGIC)]} grids, not {N}x{N}")
+        self.file = open(path, "ab" if exists else "wb")
+        if not exists:
+            self.file.write(_header(N))
+        self.count = 0
+
+    def write(self, grid) -> None:
+        self.file.write(pack(np.asarray(grid)[None]).tobytes())
+        self.count += 1
+
+    def write_many(self, grids) -> None:
+        grids = np.asarray(grids)
+        self.file.write(pack(grids).tobytes())
+        self.count += len(grids)
+
+    def flush(self) -> None:
+        self.file.flush()
+
+    def close(self) -> None:
+        self.file.close()
+
+    def __enter__(self) -> "PackedWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class LineWriter:
+    """Write grids to a text stream one line at a time, flushing after every line so that readers
+    downstream see each solution as soon as it is finished."""
+
+    def __init__(self, stream, flush: bool = True) -> None:
+        self.stream = stream
+        self.auto_flush = flush
+        self.count = 0
+
+    def write(self, grid) -> None:
+        self.stream.write(format_line(grid) + "\n")
+        self.count += 1
+        if self.auto_flush:
+            self.stream.flush()
+
+    def close(self) -> None:
+        self.stream.flush()
+
+    def __enter__(self) -> "LineWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+def read_corpus(path, N: int = 9):
+    """Yield the grids of a corpus in any of the supported formats, chosen by file suffix."""
+    path = os.fspath(path)
+    if path.endswith(".npy"):
+        return read_npy(path)
+    if path.endswith(PACKED_SUFFIX):
+        return iter(PackedCorpus(path))
+    return read_lines(path, N=N)
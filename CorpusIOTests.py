@@ -0,0 +1,86 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from CorpusIO import *
+
+
+class TestCorpusIO(unittest.TestCase):
+    def setUp(self) -> None:
+        self.puzzles = np.load("data/easy_puzzle.npy")
+        self.solutions = np.load("data/easy_solution.npy").astype(np.int8)
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_pack_round_trip(self) -> None:
+        # The easy solutions include grids of -1s for unsolvable puzzles
+        np.testing.assert_array_equal(unpack(pack(self.solutions)), self.solutions)
+        self.assertEqual(pack(self.puzzles).shape, (len(self.puzzles), 41))
+
+    def test_packed_writer_and_random_access(self) -> None:
+        path = os.path.join(self.tmp.name, "easy" + PACKED_SUFFIX)
+        with PackedWriter(path) as writer:
+            writer.write(self.puzzles[0])
+            writer.write_many(self.puzzles[1:])
+
+        corpus = PackedCorpus(path)
+        self.assertEqual(len(corpus), len(self.puzzles))
+        np.testing.assert_array_equal(corpus[7], self.puzzles[7])
+        np.testing.assert_array_equal(corpus[-1], self.puzzles[-1])
+        np.testing.assert_array_equal(np.array(list(corpus)), self.puzzles)
+        self.assertEqual(
+            [i for shard in range(4) for i in corpus.shard(shard, 4)],
+            list(range(len(self.puzzles)))
+        )
+
+    def test_line_shards_cover_every_line_once(self) -> None:
+        path = os.path.join(self.tmp.name, "easy.txt")
+        with open(path, "w") as f:
+            writer = LineWriter(f)
+            for puzzle in self.puzzles:
+                writer.write(puzzle)
+
+        grids = [grid for start, stop in line_shards(path, 4) for grid in read_lines(path, start, stop)]
+        np.testing.assert_array_equal(np.array(grids), self.puzzles)
+
+    def test_parse_line(self) -> None:
+        line = format_line(self.puzzles[0]).replace("0", ".")
+
+        np.testing.assert_array_equal(parse_line(line), self.puzzles[0])
+        with self.assertRaises(ValueError):
+            parse_line("123")
+
+    def test_unsolved_line_round_trip(self) -> None:
+        grid = np.full((9, 9), -1, dtype=np.int8)
+
+        self.assertEqual(format_line(grid), "-" * 81)
+        np.testing.assert_array_equal(parse_line(format_line(grid)), grid)
+
+    def test_append_checks_board_size(self) -> None:
+        path = os.path.join(self.tmp.name, "easy" + PACKED_SUFFIX)
+        with PackedWriter(path) as writer:
+            writer.write_many(self.puzzles[:3])
+        with PackedWriter(path, append=True) as writer:
+            writer.write_many(self.puzzles[3:])
+
+        self.assertEqual(len(PackedCorpus(path)), len(self.puzzles))
+        with self.assertRaises(ValueError):
+            PackedWriter(path, 16, append=True)
+
+    def test_large_boards(self) -> None:
+        # A nibble holds at most 14 values besides empty and -1, so 16x16 and larger grids take a byte per cell
+        for size in (16, 25, 36):
+            grids = np.load(f"data/large_{size}_solution.npy")
+            grids[0] = -1
+            np.testing.assert_array_equal(unpack(pack(grids), size), grids)
+            np.testing.assert_array_equal(parse_line(format_line(grids[1]), size), grids[1])
+
+    def test_read_npy(self) -> None:
+        np.testing.assert_array_equal(np.array(list(read_corpus("data/easy_puzzle.npy"))), self.puzzles)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,274 @@
+from array import array
+from time import perf_counter
+
+class DancingLinks:
+    """Knuth's Dancing Links stored in flat integer arrays.
+
+    Node 0 is the root, nodes 1..num_cols are the column headers and every 1 in the
+    matrix gets one node after those. For each node we keep its left/right/up/down
+    neighbours and its column header, and for each column header its size."""
+
+    def __init__(self, num_cols: int, rows) -> None:
+        self.num_cols = num_cols
+        total = 1 + num_cols + sum(len(row) for row in rows)
+
+        # Every node starts linked to itself
+        self.L = array('i', range(total))
+        self.R = array('i', range(total))
+        self.U = array('i', range(total))
+        self.D = array('i', range(total))
+        self.C = array('i', range(total))
+        self.S = array('i', bytes(4 * (num_cols + 1)))
+        self.row_of = array('i', [-1]) * total  # the row id of each node, -1 for headers
+        self.row_start = array('i')             # the first node of each row
+
+        L, R, U, D, C, S, row_of = self.L, self.R, self.U, self.D, self.C, self.S, self.row_of
+
+        # Link the root and the column headers in a ring
+        for j in range(num_cols + 1):
+            L[j] = j - 1 if j else num_cols
+            R[j] = j + 1 if j < num_cols else 0
+
+        node = num_cols + 1
+        for i, row in enumerate(rows):
+            self.row_start.append(node if row else -1)
+            first = node
+            for col in row:
+                column = col + 1
+
+                # Append to the bottom of the column
+                C[node] = column
+                U[node] = U[column]
+                D[node] = column
+                D[U[column]] = node
+                U[column] = node
+                S[column] += 1
+
+                # Append to the end of the row
+                L[node] = node - 1 if node != first else node
+                R[node] = first
+                if node != first:
+                    R[node - 1] = node
+                    L[first] = node
+
+                row_of[node] = i
+                node += 1
+
+    def copy(self) -> "DancingLinks":
+        """Return an independent copy of the links, which is much cheaper than rebuilding them."""
+        other = DancingLinks.__new__(DancingLinks)
+        other.num_cols = self.num_cols
+        for name in ("L", "R", "U", "D", "C", "S", "row_of", "row_start"):
+            setattr(other, name, array('i', getattr(self, name)))
+        return other
+
+    def cover(self, column: int) -> None:
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+
+        # Unlink the column header node
+        R[L[column]] = R[column]
+        L[R[column]] = L[column]
+
+        # Move down the column and remove each row by traversing right
+        i = D[column]
+        while i != column:
+            j = R[i]
+            while j != i:
+                D[U[j]] = D[j]
+                U[D[j]] = U[j]
+                S[C[j]] -= 1
+                j = R[j]
+            i = D[i]
+
+    def uncover(self, column: int) -> None:
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+
+        # Move up the column and add each row back by traversing left
+        i = U[column]
+        while i != column:
+            j = L[i]
+            while j != i:
+                S[C[j]] += 1
+                D[U[j]] = j
+                U[D[j]] = j
+                j = L[j]
+            i = U[i]
+
+        # Relink the column header node, this must be done last
+        R[L[column]] = column
+        L[R[column]] = column
+
+    def select(self, row: int) -> bool:
+        """Add a row to the partial solution up front by covering all of its columns.
+
+        Return False if one of its columns has already been covered, as the row then clashes with an earlier one."""
+        node = self.row_start[row]
+        R, L, C = self.R, self.L, self.C
+        j = node
+        while True:
+            column = C[j]
+            if L[R[column]] != column:
+                return False
+            self.cover(column)
+            j = R[j]
+            if j == node:
+                return True
+
+    def min_column(self) -> int:
+        """Return the uncovered column with the fewest nodes."""
+        R, S = self.R, self.S
+        column = R[0]
+        best, best_size = column, S[column]
+        while column and best_size > 1:
+            if S[column] < best_size:
+                best, best_size = column, S[column]
+            column = R[column]
+        return best
+
+    def search(self, stats=None, budget=None):
+        """Yield every exact cover as a list of row ids, using an explicit stack rather than recursion.
+
+        Pass a `SearchStats` as stats to count nodes, dead ends, cover/uncover calls and depth, and
+        a `SearchBudget` as budget to stop with `BudgetExceeded` once it runs out. The links are
+        then left mid-search, so search a copy if they are needed again."""
+        R, L, D, C, row_of = self.R, self.L, self.D, self.C, self.row_of
+        solution = []  # the node chosen at each level
+        counting = stats is not None
+
+        while True:
+            if budget is not None:
+                budget.tick()
+            if counting:
+                stats.nodes += 1
+                stats.depth(len(solution))
+            if R[0] == 0:
+                if counting:
+                    stats.solutions += 1
+                yield [row_of[node] for node in solution]
+            else:
+                column = self.min_column()
+                self.cover(column)
+                if counting:
+                    stats.covers += 1
+                row = D[column]
+                if row != column:
+                    solution.append(row)
+                    j = R[row]
+                    while j != row:
+                        self.cover(C[j])
+                        if counting:
+                            stats.covers += 1
+                        j = R[j]
+                    continue
+                self.uncover(column)
+                if counting:
+                    stats.uncovers += 1
+                    stats.backtracks += 1
+
+            # Backtrack to the most recent level that still has a row left to try
+            while solution:
+                row = solution.pop()
+                j = L[row]
+                while j != row:
+                    self.uncover(C[j])
+                    if counting:
+                        stats.uncovers += 1
+                    j = L[j]
+
+                column = C[row]
+                row = D[row]
+                if row != column:
+                    solution.append(row)
+                    j = R[row]
+                    while j != row:
+                        self.cover(C[j])
+                        if counting:
+                            stats.covers += 1
+                        j = R[j]
+                    break
+                self.uncover(column)
+                if counting:
+                    stats.uncovers += 1
+            else:
+                return
+
+# Prebuilt links for an empty grid, keyed by box size (num_rows, num_cols)
+_templates = {}
+
+def sudoku_links(size) -> DancingLinks:
+    """Return fresh links for an empty grid with boxes of the given size.
+
+    Row r*N*N + c*N + (n-1) places number n in cell (r, c). The columns are the
+    `row-col`, `row-number`, `col-number` and `box-number` constraints in that order."""
+    key = tuple(size)
+    links = _templates.get(key)
+    if links is None:
+        num_rows, num_cols = key
+        N = num_rows * num_cols
+        rows = []
+        for row in range(N):
+            for col in range(N):
+                box = (row // num_rows) * num_rows + (col // num_cols)
+                for n in range(N):
+                    rows.append((
+                        row * N + col,
+                        N * N + row * N + n,
+                        2 * N * N + col * N + n,
+                        3 * N * N + box * N + n,
+                    ))
+        links = _templates[key] = DancingLinks(4 * N * N, rows)
+    return links.copy()
+
+def solve_sudoku(size, grid, stats=None, budget=None):
+    """A Sudoku solver using Dancing Links, with the same contract as `AlgoX.solve_sudoku`.
+
+    Each solution is written into grid, which is then yielded. Pass a `SearchStats` as stats to
+    count the search and time its phases."""
+    if stats is not None:
+        start = perf_counter()
+    num_rows, num_cols = size
+    N = num_rows * num_cols
+    links = sudoku_links(size)
+
+    # Remove constraints that are already satisfied
+    for i, row in enumerate(grid):
+        for j, n in enumerate(row):
+            if n and (not 1 <= n <= N or not links.select((i * N + j) * N + int(n) - 1)):
+                # A given that does not fit the grid, or two givens sharing a constraint - there is no solution
+                yield [[-1] * N for _ in range(N)]
+                return
+
+    if stats is not None:
+        start = stats.lap("build", start)
+    for solution in links.search(stats, budget):
+        if stats is not None:
+            start = stats.lap("search", start)
+        for choice in solution:
+            cell, n = divmod(choice, N)
+            grid[cell // N][cell % N] = n + 1
+        if stats is not None:
+            stats.lap("write_back", start)
+        yield grid
+        if stats is not None:
+            start = perf_counter()
+    if stats is not None:
+        stats.lap("search", start)
+
+def test() -> None:
+    valid_grid = [
+        [5, 3, 0, 0, 7, 0, 0, 0, 0],
+        [6, 0, 0, 1, 9, 5, 0, 0, 0],
+        [0, 9, 8, 0, 0, 0, 0, 6, 0],
+        [8, 0, 0, 0, 6, 0, 0, 0, 3],
+        [4, 0, 0, 8, 0, 3, 0, 0, 1],
+        [7, 0, 0, 0, 2, 0, 0, 0, 6],
+        [0, 6, 0, 0, 0, 0, 2, 8, 0],
+        [0, 0, 0, 4, 1, 9, 0, 0, 5],
+        [0, 0, 0, 0, 8, 0, 0, 7, 9]
+        ]
+
+    for solution in solve_sudoku((3, 3), valid_grid):
+        print(*solution, sep='\n')
+
+if __name__ == "__main__":
+    test()
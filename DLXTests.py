@@ -0,0 +1,61 @@
+import unittest
+
+from DLX import *
+
+
+class TestSearch(unittest.TestCase):
+    def test_search(self):
+        # Rows A-F of Knuth's example, with columns 1-7 numbered from 0
+        rows = [[0, 3, 6], [0, 3], [3, 4, 6], [2, 4, 5], [1, 2, 5, 6], [1, 6]]
+        links = DancingLinks(7, rows)
+
+        self.assertEqual(list(links.search()), [[1, 3, 5]])
+
+    def test_search_restores_links(self):
+        links = DancingLinks(3, [[0], [1, 2], [0, 1], [2]])
+        before = links.copy()
+
+        self.assertEqual(sorted(sorted(s) for s in links.search()), [[0, 1], [2, 3]])
+        for name in ("L", "R", "U", "D", "S"):
+            self.assertEqual(getattr(links, name), getattr(before, name))
+
+
+class TestSudoku(unittest.TestCase):
+    def test_solve_sudoku(self):
+        grid = [
+            [5, 3, 0, 0, 7, 0, 0, 0, 0],
+            [6, 0, 0, 1, 9, 5, 0, 0, 0],
+            [0, 9, 8, 0, 0, 0, 0, 6, 0],
+            [8, 0, 0, 0, 6, 0, 0, 0, 3],
+            [4, 0, 0, 8, 0, 3, 0, 0, 1],
+            [7, 0, 0, 0, 2, 0, 0, 0, 6],
+            [0, 6, 0, 0, 0, 0, 2, 8, 0],
+            [0, 0, 0, 4, 1, 9, 0, 0, 5],
+            [0, 0, 0, 0, 8, 0, 0, 7, 9]
+            ]
+        solutions = list(solve_sudoku((3, 3), grid))
+
+        self.assertEqual(len(solutions), 1)
+        self.assertEqual(solutions[0][0], [5, 3, 4, 6, 7, 8, 9, 1, 2])
+        self.assertEqual(solutions[0][8], [3, 4, 5, 2, 8, 6, 1, 7, 9])
+
+    def test_repeated_given(self):
+        grid = [[0] * 4 for _ in range(4)]
+        grid[0][0] = grid[0][3] = 2
+
+        self.assertEqual(list(solve_sudoku((2, 2), grid)), [[[-1] * 4] * 4])
+
+    def test_given_out_of_range(self):
+        for n in (-1, 5):
+            grid = [[0] * 4 for _ in range(4)]
+            grid[1][2] = n
+
+            self.assertEqual(list(solve_sudoku((2, 2), grid)), [[[-1] * 4] * 4])
+
+    def test_count_4x4_grids(self):
+        grid = [[0] * 4 for _ in range(4)]
+
+        self.assertEqual(sum(1 for _ in solve_sudoku((2, 2), grid)), 288)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,298 @@
+"""Send each puzzle along the route that is fastest for puzzles like it.
+
+    python Dispatcher.py --learn                        # time the routes on the corpora, write data/dispatch.json
+    python Dispatcher.py --difficulties hard large_16   # compare dispatching with each engine on its own
+
+Routing looks at three features of a puzzle, the later ones only when the earlier ones call for them:
+
+1. Its number of clues, counted straight from the array, picks the first step: an engine, which
+   is given the puzzle as it is, or "singles".
+2. "singles" runs `analyse`, which fills in the cells forced by singles on the uni_script bitmask
+   state. If that solves the puzzle, or shows it has none, no engine runs.
+3. Otherwise the entropy of what is left, the sum of log2(candidates) over its empty cells, picks
+   the engine, which is given the board with the forced cells filled in.
+
+The config is learned from the timings of every engine on the benchmark corpora, both on the
+puzzles as given and after singles, so the cost of the analysis is weighed against skipping it.
+It is stored as JSON, with a rule per board size:
+
+    {"default": "algox", "sizes": {"9": {"clues": {"thresholds": [40.5], "routes": ["algox", "singles"]},
+                                         "entropy": {"thresholds": [21.5], "routes": ["dfs_mrv", "algox"]}}}}
+
+A rule picks routes[i] for the first threshold i its feature is below, and the last route if it
+is below none of them. Sizes without a rule go straight to the default engine."""
+import argparse
+import json
+import math
+import os
+import random
+import time
+from collections import Counter
+
+import numpy as np
+
+from Engines import ENGINES, _uni_script_driver, box_size, get_engine
+from SearchBudget import SearchBudget, TimedOut
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "dispatch.json")
+
+# What a missing config falls back to: every puzzle goes straight to one engine
+DEFAULT_CONFIG = {"default": "dlx", "sizes": {}}
+
+# The clue route that runs `analyse` and picks the engine from what is left
+SINGLES = "singles"
+
+# Copies of each solvable corpus puzzle that `learn` times as well: a positive fraction of the empty
+# cells filled in from the solution, or a negative fraction of the givens cleared. A board size
+# with one corpus then still spans a range of clue counts, including sparser puzzles than the
+# corpus has, on which a route's slow runs show up. A cleared copy may have more than one solution
+VARIANTS = (-0.5, -0.25, 0.25, 0.5)
+
+
+class Features:
+    """What `analyse` finds out about a puzzle."""
+
+    __slots__ = ("clues", "forced", "solved", "entropy")
+
+    def __init__(self, clues: int, forced: int, solved: bool, entropy: float) -> None:
+        self.clues = clues      # givens in the puzzle
+        self.forced = forced    # cells filled in by singles
+        self.solved = solved    # singles filled in every cell
+        self.entropy = entropy  # bits of choice left: the sum of log2(candidates) over the empty cells
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self) -> str:
+        return f"Features({', '.join(f'{k}={v!r}' for k, v in self.as_dict().items())})"
+
+def analyse(grid, size=(3, 3)) -> tuple:
+    """Fill in the cells of grid forced by singles and return (features, board).
+
+    board is the grid with those cells filled in, which has the same solutions, or None if a given
+    is out of range or repeats, or the singles leave a cell with no candidates, when there are no
+    solutions."""
+    grid = np.asarray(grid)
+    N = len(grid)
+    try:
+        state = _uni_script_driver().SudokuBitState(board=grid, n=N, box=tuple(size))
+    except ValueError:
+        return Features(int(np.count_nonzero(grid)), 0, False, 0.0), None
+    clues = state.filled
+    if not state.no_repeats() or not state.fill_singles():
+        return Features(clues, 0, False, 0.0), None
+
+    empty = state.get_empty_cells()
+    entropy = sum(math.log2(state.candidates(cell).bit_count()) for cell in empty)
+    return Features(clues, state.filled - clues, not empty, entropy), state.get_board()
+
+def _check_engine(name: str) -> None:
+    """Raise ValueError if name is not an engine a route can lead to."""
+    get_engine(name)
+    if name == "auto":
+        raise ValueError("A route cannot lead back to the auto engine")
+
+def _pick(rule: dict, value: float) -> str:
+    """Return the route of rule for a feature value."""
+    for threshold, route in zip(rule["thresholds"], rule["routes"]):
+        if value < threshold:
+            return route
+    return rule["routes"][-1]
+
+
+class Dispatcher:
+    """Solve puzzles along the routes a dispatch config picks for them, keeping count of where they went.
+
+    config is a config dict or the path of a JSON one; by default `CONFIG_PATH` if it exists, and
+    otherwise `DEFAULT_CONFIG`. `solve` has the signature of an engine, and is the "auto" engine.
+    routes counts the puzzles that went straight to each engine, were settled by "singles", or
+    went to "singles+<engine>"."""
+
+    def __init__(self, config=None) -> None:
+        if config is None:
+            config = CONFIG_PATH if os.path.exists(CONFIG_PATH) else DEFAULT_CONFIG
+        if not isinstance(config, dict):
+            with open(config) as f:
+                config = json.load(f)
+        # Fail early on an unknown engine
+        _check_engine(config["default"])
+        for rule in config["sizes"].values():
+            for route in rule["clues"]["routes"]:
+                if route != SINGLES:
+                    _check_engine(route)
+            for engine in rule["entropy"]["routes"]:
+                _check_engine(engine)
+        self.config = config
+        self.routes = Counter()
+
+    def choose(self, clues: int, N: int) -> str:
+        """Return the first step for a puzzle of size N x N with clues givens: an engine or `SINGLES`."""
+        rule = self.config["sizes"].get(str(N))
+        return self.config["default"] if rule is None else _pick(rule["clues"], clues)
+
+    def choose_engine(self, entropy: float, N: int) -> str:
+        """Return the engine for a puzzle of size N x N that singles left with entropy bits of choice."""
+        rule = self.config["sizes"].get(str(N))
+        return self.config["default"] if rule is None else _pick(rule["entropy"], entropy)
+
+    def solve(self, grid, size=(3, 3), stats=None, budget=None):
+        """Solve grid along the routes for its features, returning what the engine returns."""
+        N = size[0] * size[1]
+        route = self.choose(np.count_nonzero(grid), N)
+        if route != SINGLES:
+            self.routes[route] += 1
+            return get_engine(route)(grid, size, stats, budget)
+
+        if stats is not None:
+            start = time.perf_counter()
+        features, board = analyse(grid, size)
+        if stats is not None:
+            stats.propagations += features.forced
+            stats.lap("propagate", start)
+        if board is None:
+            self.routes[SINGLES] += 1
+            return np.full((N, N), -1)
+        if features.solved:
+            self.routes[SINGLES] += 1
+            return board
+        engine = self.choose_engine(features.entropy, N)
+        self.routes[f"{SINGLES}+{engine}"] += 1
+        return get_engine(engine)(board, size, stats, budget)
+
+def variant(puzzle, solution, fraction: float, rng) -> np.ndarray:
+    """Return a copy of puzzle with a fraction of its empty cells filled in from solution or, for a
+    negative fraction, that fraction of its givens cleared."""
+    puzzle = np.array(puzzle)
+    cells = np.flatnonzero(puzzle == 0) if fraction > 0 else np.flatnonzero(puzzle)
+    chosen = rng.sample(cells.tolist(), round(abs(fraction) * len(cells)))
+    puzzle.flat[chosen] = np.asarray(solution).flat[chosen] if fraction > 0 else 0
+    return puzzle
+
+def _mean_time(solve, repeat: int, timeout: float) -> float:
+    """Return the mean seconds of repeat calls of solve(budget), or infinity if one runs out of timeout seconds.
+
+    The mean rather than the median, so that an engine with random choices pays for its slow runs."""
+    total = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        if isinstance(solve(SearchBudget(timeout)), TimedOut):
+            return math.inf
+        total += time.perf_counter() - start
+    return total / repeat
+
+def time_puzzle(puzzle, size, engines, repeat: int = 5, timeout: float = 1.0) -> dict:
+    """Time engines on a puzzle as given and after singles, and return what learning needs.
+
+    That is clues, the seconds of each engine on the puzzle in "engines", the seconds of `analyse`
+    in "singles", the entropy it leaves, and the seconds of each engine on the board it returns in
+    "after", or None if the analysis settled the puzzle."""
+    seconds = {engine: _mean_time(lambda budget: get_engine(engine)(puzzle.copy(), size, None, budget), repeat, timeout) for engine in engines}
+    analysis = _mean_time(lambda budget: analyse(puzzle, size), repeat, timeout)
+    features, board = analyse(puzzle, size)
+    after = None
+    if board is not None and not features.solved:
+        after = {engine: _mean_time(lambda budget: get_engine(engine)(board.copy(), size, None, budget), repeat, timeout) for engine in engines}
+    return {"clues": features.clues, "engines": seconds, "singles": analysis, "entropy": features.entropy, "after": after}
+
+def fit_rule(timings, bins: int = 8, min_puzzles: int = 8) -> dict:
+    """Return the rule for one board size that sends each range of a feature along its fastest route.
+
+    timings holds (feature value, {route: seconds}) for each puzzle, with infinite seconds for a
+    route that timed out; puzzles on which every route timed out are left out. The puzzles are
+    split at the quantiles of their values into at most bins ranges of about min_puzzles or more,
+    and each range takes the route with the least total time on it, so a route that timed out on
+    any of its puzzles is only taken if every route did. Neighbouring ranges with the same route
+    are merged. seconds is the total time of the rule."""
+    timings = [(value, seconds) for value, seconds in timings if min(seconds.values()) < math.inf]
+    bins = max(1, min(bins, len(timings) // min_puzzles))
+    values = np.array([value for value, _ in timings])
+    cuts = sorted({round(cut, 2) for cut in np.quantile(values, np.linspace(0, 1, bins + 1)[1:-1]).tolist()})
+    ranges = np.searchsorted(cuts, values, side="right")
+    groups = []  # (upper cut, route) for each range, merged with the one before when they share a route
+    total = 0.0
+    for i in range(len(cuts) + 1):
+        members = [seconds for (_, seconds), r in zip(timings, ranges) if r == i]
+        if not members:
+            continue
+        cost = {route: sum(seconds[route] for seconds in members) for route in members[0]}
+        route = min(cost, key=cost.get)
+        total += cost[route]
+        upper = cuts[i] if i < len(cuts) else None
+        if groups and groups[-1][1] == route:
+            groups[-1] = (upper, route)
+        else:
+            groups.append((upper, route))
+    return {"thresholds": [upper for upper, _ in groups[:-1]], "routes": [route for _, route in groups], "seconds": total}
+
+def fit_size(timings, default: str) -> dict:
+    """Return the clue and entropy rules for one board size from the `time_puzzle` timings of its puzzles.
+
+    The entropy rule is fitted first, on the puzzles singles leave unsolved. Then the cost of the
+    singles route on each puzzle is the analysis plus, unless that settles it, the engine the
+    entropy rule picks, and the clue rule chooses between that and each engine on its own."""
+    unsettled = [(timing["entropy"], timing["after"]) for timing in timings if timing["after"] is not None]
+    entropy = fit_rule(unsettled) if unsettled else {"thresholds": [], "routes": [default], "seconds": 0.0}
+    clues = []
+    for timing in timings:
+        singles = timing["singles"]
+        if timing["after"] is not None:
+            singles += timing["after"][_pick(entropy, timing["entropy"])]
+        clues.append((timing["clues"], dict(timing["engines"], **{SINGLES: singles})))
+    return {"clues": fit_rule(clues), "entropy": entropy}
+
+def learn(corpora, data_dir: str = "data", engines=None, repeat: int = 5, timeout: float = 1.0, seed: int = 0) -> dict:
+    """Time engines (by default every one) on the named corpora and their `VARIANTS` and return the dispatch config.
+
+    The default, for board sizes with no corpus, is the engine with the least total time on the
+    puzzles as given."""
+    engines = engines or [name for name in ENGINES if name != "auto"]
+    rng = random.Random(seed)
+    by_size = {}
+    for corpus in corpora:
+        puzzles = np.load(os.path.join(data_dir, f"{corpus}_puzzle.npy"))
+        solutions = np.load(os.path.join(data_dir, f"{corpus}_solution.npy"))
+        N = puzzles.shape[-1]
+        copies = [variant(puzzle, solution, fraction, rng) for puzzle, solution in zip(puzzles, solutions) if solution.min() > 0 for fraction in VARIANTS]
+        by_size.setdefault(N, []).extend(time_puzzle(puzzle, box_size(N), engines, repeat, timeout) for puzzle in list(puzzles) + copies)
+
+    totals = Counter()
+    for timings in by_size.values():
+        for timing in timings:
+            totals.update(timing["engines"])
+    default = min(totals, key=totals.get) if totals else DEFAULT_CONFIG["default"]
+    return {"default": default, "sizes": {str(N): fit_size(timings, default) for N, timings in sorted(by_size.items())}}
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--learn", action="store_true", help="learn the config from the corpora and write it to --config")
+    parser.add_argument("--config", default=CONFIG_PATH)
+    parser.add_argument("--difficulties", nargs="+", default=["very_easy", "easy", "medium", "hard", "large_16", "large_25", "large_36"])
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per engine and puzzle when learning, whose mean is kept, or passes over each corpus when comparing, whose median is kept")
+    parser.add_argument("--timeout", type=float, default=1.0, help="seconds an engine may take on a puzzle when learning, ten times that when comparing")
+    args = parser.parse_args(argv)
+
+    if args.learn:
+        config = learn(args.difficulties, args.data_dir, repeat=args.repeat, timeout=args.timeout)
+        with open(args.config, "w") as f:
+            json.dump(config, f, indent=2)
+        print(json.dumps(config, indent=2))
+        return
+
+    dispatcher = Dispatcher(args.config)
+    for difficulty in args.difficulties:
+        puzzles = np.load(os.path.join(args.data_dir, f"{difficulty}_puzzle.npy"))
+        size = box_size(puzzles.shape[-1])
+        for name, solve in [("auto", dispatcher.solve)] + [(name, get_engine(name)) for name in ENGINES if name != "auto"]:
+            solve(puzzles[0].copy(), size, None, SearchBudget(args.timeout * 10))  # warm up, so the first engine is not charged for it
+            passes = []
+            for _ in range(args.repeat):
+                start_time = time.perf_counter()
+                for puzzle in puzzles:
+                    solve(puzzle.copy(), size, None, SearchBudget(args.timeout * 10))
+                passes.append(time.perf_counter() - start_time)
+            print(f"{difficulty:10} {name:8} {1000 * float(np.median(passes)) / len(puzzles):9.3f} ms/puzzle")
+    print(f"routes: {dict(dispatcher.routes)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+import math
+import random
+import unittest
+
+import numpy as np
+
+from Dispatcher import *
+from SearchStats import SearchStats
+
+
+class TestAnalyse(unittest.TestCase):
+    def test_singles_settle_easy_puzzles(self) -> None:
+        puzzles = np.load("data/very_easy_puzzle.npy")
+        solutions = np.load("data/very_easy_solution.npy")
+        for puzzle, solution in zip(puzzles, solutions):
+            features, board = analyse(puzzle)
+            self.assertTrue(features.solved)
+            self.assertEqual(features.clues + features.forced, 81)
+            self.assertEqual(features.entropy, 0.0)
+            np.testing.assert_array_equal(board, solution)
+
+    def test_hard_puzzles_keep_their_givens(self) -> None:
+        puzzle = np.load("data/hard_puzzle.npy")[2]
+        features, board = analyse(puzzle)
+
+        self.assertFalse(features.solved)
+        self.assertEqual(features.clues, np.count_nonzero(puzzle))
+        self.assertGreater(features.entropy, 0)
+        self.assertTrue((board[puzzle > 0] == puzzle[puzzle > 0]).all())
+
+    def test_no_solutions(self) -> None:
+        puzzle = np.zeros((9, 9), dtype=int)
+        puzzle[0, :2] = 9
+        self.assertIsNone(analyse(puzzle)[1])
+
+        puzzle[0, :2] = [-1, 10]
+        self.assertIsNone(analyse(puzzle)[1])
+
+
+class TestDispatcher(unittest.TestCase):
+    def setUp(self) -> None:
+        self.config = {"default": "dlx", "sizes": {"9": {
+            "clues": {"thresholds": [30], "routes": ["algox", "singles"]},
+            "entropy": {"thresholds": [50.0, 100.0], "routes": ["dfs_mrv", "algox", "dlx"]},
+        }}}
+
+    def test_choose(self) -> None:
+        dispatcher = Dispatcher(self.config)
+
+        self.assertEqual(dispatcher.choose(25, 9), "algox")
+        self.assertEqual(dispatcher.choose(30, 9), "singles")
+        self.assertEqual(dispatcher.choose(25, 16), "dlx")
+        self.assertEqual(dispatcher.choose_engine(10.0, 9), "dfs_mrv")
+        self.assertEqual(dispatcher.choose_engine(50.0, 9), "algox")
+        self.assertEqual(dispatcher.choose_engine(120.0, 9), "dlx")
+        self.assertEqual(dispatcher.choose_engine(10.0, 16), "dlx")
+
+    def test_solve_routes_every_puzzle(self) -> None:
+        dispatcher = Dispatcher(self.config)
+        for difficulty in ("easy", "medium", "hard"):
+            puzzles = np.load(f"data/{difficulty}_puzzle.npy")
+            solutions = np.load(f"data/{difficulty}_solution.npy")
+            for puzzle, solution in zip(puzzles, solutions):
+                np.testing.assert_array_equal(dispatcher.solve(puzzle), solution)
+
+        self.assertEqual(dispatcher.routes["algox"], 15)
+        self.assertGreater(dispatcher.routes["singles"], 0)
+        self.assertEqual(sum(dispatcher.routes.values()), 45)
+
+    def test_singles_are_timed(self) -> None:
+        config = dict(self.config, sizes={"9": dict(self.config["sizes"]["9"], clues={"thresholds": [], "routes": ["singles"]})})
+        puzzle = np.load("data/hard_puzzle.npy")[2]
+        stats = SearchStats()
+        Dispatcher(config).solve(puzzle, (3, 3), stats)
+
+        self.assertEqual(stats.propagations, analyse(puzzle)[0].forced)
+        self.assertGreater(stats.phases["propagate"], 0)
+        self.assertGreater(stats.nodes, 0)
+
+    def test_unknown_engine(self) -> None:
+        for config in [
+            {"default": "guess", "sizes": {}},
+            {"default": "singles", "sizes": {}},
+            {"default": "dlx", "sizes": {"9": dict(self.config["sizes"]["9"], entropy={"thresholds": [], "routes": ["auto"]})}},
+        ]:
+            with self.subTest(config=config), self.assertRaises(ValueError):
+                Dispatcher(config)
+
+
+class TestLearning(unittest.TestCase):
+    def test_fit_rule(self) -> None:
+        timings = [(i, {"fast_low": i / 100, "fast_high": (20 - i) / 100}) for i in range(20)]
+        rule = fit_rule(timings, bins=2, min_puzzles=5)
+
+        self.assertEqual(rule["routes"], ["fast_low", "fast_high"])
+        self.assertEqual(rule["thresholds"], [9.5])
+        self.assertAlmostEqual(rule["seconds"], 1.0)
+
+    def test_fit_rule_avoids_timeouts(self) -> None:
+        timings = [(i, {"fast_but_stalls": math.inf if i == 3 else 0.001, "steady": 0.01}) for i in range(10)]
+        timings.append((11, {"fast_but_stalls": math.inf, "steady": math.inf}))
+
+        self.assertEqual(fit_rule(timings, bins=1)["routes"], ["steady"])
+
+    def test_fit_size_costs_the_analysis(self) -> None:
+        def timing(clues, engines, singles, entropy=0.0, after=None):
+            return {"clues": clues, "engines": engines, "singles": singles, "entropy": entropy, "after": after}
+
+        # Sparse puzzles are cheaper to solve directly, dense ones are settled by singles
+        timings = [timing(20, {"a": 0.01}, 0.005, 40.0, {"a": 0.009}) for _ in range(8)]
+        timings += [timing(70, {"a": 0.01}, 0.001) for _ in range(8)]
+        rule = fit_size(timings, "a")
+
+        self.assertEqual(rule["clues"]["routes"], ["a", "singles"])
+        self.assertEqual(rule["entropy"]["routes"], ["a"])
+
+    def test_variants_keep_the_solution(self) -> None:
+        puzzle = np.load("data/hard_puzzle.npy")[2]
+        solution = np.load("data/hard_solution.npy")[2]
+        clues = np.count_nonzero(puzzle)
+        rng = random.Random(0)
+
+        denser = variant(puzzle, solution, 0.5, rng)
+        self.assertEqual(np.count_nonzero(denser), clues + round(0.5 * (81 - clues)))
+        self.assertTrue((denser[denser > 0] == solution[denser > 0]).all())
+        np.testing.assert_array_equal(Dispatcher().solve(denser), solution)
+
+        sparser = variant(puzzle, solution, -0.5, rng)
+        self.assertEqual(np.count_nonzero(sparser), clues - round(0.5 * clues))
+        self.assertTrue((sparser[sparser > 0] == puzzle[sparser > 0]).all())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -18,11 +18,15 @@ class LinkedListNode:
 
 class ToroidalMatrix:
     def __init__(self) -> None:
-        self.matrix = None
+        self.matrix = None  # the nodes by position, kept only by `fill`
         self.header = LinkedListNode()  # this is our entry point into the lattice
+        self.columns = []  # the column headers, by column index
+        self.rows = []  # the first node of each row, by row
+        self.stats = None  # set to a SearchStats to count cover/uncover calls
 
     def cover(self, node: LinkedListNode) -> None:
-        logging.warning(f"covering")
+        if self.stats is not None:
+            self.stats.covers += 1
         column = node.column
 
         # Unlink the column header node
@@ -38,13 +42,14 @@ class ToroidalMatrix:
                 right_node.up.down = right_node.down
                 right_node.down.up = right_node.up
 
-                self.matrix[0][right_node.col_Id].node_count -= 1
+                right_node.column.node_count -= 1
                 right_node = right_node.right
 
             row = row.down
 
     def uncover(self, node: LinkedListNode) -> None :
-        logging.warning(f"uncovering")
+        if self.stats is not None:
+            self.stats.uncovers += 1
         column = node.column
 
         # Move up the column and add each row by traversing left
@@ -56,8 +61,8 @@ class ToroidalMatrix:
                 left_node.up.down = left_node
                 left_node.down.up = left_node
 
-                self.matrix[0][left_node.col_Id].node_count += 1
-                left_node = left_node.right
+                left_node.column.node_count += 1
+                left_node = left_node.left
 
             row = row.up
 
@@ -79,81 +84,78 @@ class ToroidalMatrix:
         return min_col
 
     def fill(self, constraint_matrix: list[list]) -> None:
-        no_of_rows, no_of_cols = len(constraint_matrix), len(constraint_matrix[0])
-        no_of_rows += 1  # Extra row for the header row 
+        """Build the lattice from a dense matrix of booleans, which is left as it was.
 
-        # Add an array of 1s to designate the position of header nodes
-        constraint_matrix.insert(0, [True for _ in range(no_of_cols)])
+        Node (i, j) of self.matrix is the 1 at constraint_matrix[i - 1][j], and row 0 holds the
+        column headers."""
+        no_of_rows, no_of_cols = len(constraint_matrix) + 1, len(constraint_matrix[0])
+        rows = [[j for j, value in enumerate(row) if value] for row in constraint_matrix]
+        nodes = self._link(rows, no_of_cols, 1)
 
         self.matrix = [[None for _ in range(no_of_cols)] for _ in range(no_of_rows)]
-        
-        # Fill header row with nodes
+        self.matrix[0] = self.columns
+        for node in nodes:
+            self.matrix[node.row_Id][node.col_Id] = node
+
+    def fill_rows(self, rows: list[list[int]], no_of_cols: int) -> None:
+        """Build the lattice from the column indices of the 1s in each row."""
+        self._link([list(columns) for columns in rows], no_of_cols)
+
+    def fill_coo(self, row_ids, col_ids, shape: tuple) -> None:
+        """Build the lattice from the coordinates of its 1s, as lists or NumPy index arrays in any order."""
+        if hasattr(row_ids, "tolist"):
+            row_ids, col_ids = row_ids.tolist(), col_ids.tolist()  # plain ints are much faster to index with
+        no_of_rows, no_of_cols = shape
+        rows = [[] for _ in range(no_of_rows)]
+        for i, j in zip(row_ids, col_ids):
+            rows[i].append(j)
+        self._link(rows, no_of_cols)
+
+    def fill_csr(self, indptr, indices, no_of_cols: int) -> None:
+        """Build the lattice from compressed sparse rows: the 1s of row i are at indices[indptr[i]:indptr[i + 1]]."""
+        if hasattr(indptr, "tolist"):
+            indptr, indices = indptr.tolist(), indices.tolist()
+        self._link([indices[start:stop] for start, stop in zip(indptr, indptr[1:])], no_of_cols)
+
+    def _link(self, rows: list[list[int]], no_of_cols: int, first_row_id: int = 0) -> list:
+        """Link a node for every column index in rows and return the nodes.
+
+        Every node is appended to the bottom of its column and to the end of its row as it is made,
+        so the whole lattice is built in one pass over the 1s. The column headers are kept in
+        self.columns and the first node of each row in self.rows (None for an empty row)."""
+        header = self.header = LinkedListNode()
+        self.columns = []
+        left = header
         for j in range(no_of_cols):
-            self.matrix[0][j] = LinkedListNode()
-
-        # Create node for every 1 in the constraint_matrix
-        for i in range(no_of_rows):
-            for j in range(no_of_cols):
-
-                # Create node only if 1 in the constraint matrix
-                if constraint_matrix[i][j]:
-                    self.matrix[i][j] = LinkedListNode()
-
-                    # Increment header node count if not a header node
-                    if i:
-                        self.matrix[0][j].node_count += 1
-
-        # Link the nodes together
-        for i in range(no_of_rows):
-            for j in range(no_of_cols):
-
-                    if self.matrix[i][j]:
-                        # Add pointer to column header
-                        self.matrix[i][j].column = self.matrix[0][j]
-
-                        # Set row and column ID
-                        self.matrix[i][j].row_Id = i
-                        self.matrix[i][j].col_Id = j
-
-                        # Connect Node to neighbours
-                        a, b = i, j  # to keep track of the position we start
-
-                        # Left
-                        b = ToroidalMatrix.get_left(b, no_of_cols)
-                        while (not constraint_matrix[a][b]) and (b != j):
-                            b = self.get_left(b, no_of_cols)
-                        self.matrix[i][j].left = self.matrix[i][b]
-
-                        # Right
-                        a, b = i, j
-
-                        b = ToroidalMatrix.get_right(b, no_of_cols)
-                        while (not constraint_matrix[a][b]) and (b != j):
-                            b = self.get_right(b, no_of_cols)
-                        self.matrix[i][j].right = self.matrix[i][b]
-
-                        # Up
-                        a, b = i, j
-
-                        a = ToroidalMatrix.get_up(a, no_of_rows)
-                        while (not constraint_matrix[a][b]) and (a != i):
-                            a = self.get_up(a, no_of_rows)
-                        self.matrix[i][j].up = self.matrix[a][j]     
-
-                        # Down
-                        a, b = i, j
-
-                        a = ToroidalMatrix.get_down(a, no_of_rows)
-                        while (not constraint_matrix[a][b]) and (a != i):
-                            a = self.get_down(a, no_of_rows)
-                        self.matrix[i][j].down = self.matrix[a][j]
-
-        # We link the header between the first and last header columns
-        self.header.right = self.matrix[0][0]
-        self.header.left = self.matrix[0][no_of_cols-1]
-
-        self.matrix[0][0].left = self.header
-        self.matrix[0][no_of_cols-1].right = self.header
+            column = LinkedListNode()
+            column.up = column.down = column.column = column
+            column.row_Id, column.col_Id = 0, j
+            column.left, left.right = left, column
+            left = column
+            self.columns.append(column)
+        left.right, header.left = header, left
+
+        nodes = []
+        self.rows = []
+        for i, columns in enumerate(rows, first_row_id):
+            first = None
+            for j in columns:
+                column = self.columns[j]
+                node = LinkedListNode()
+                node.row_Id, node.col_Id, node.column = i, j, column
+                node.up, node.down = column.up, column
+                column.up.down = node
+                column.up = node
+                column.node_count += 1
+                if first is None:
+                    first = node.left = node.right = node
+                else:
+                    node.left, node.right = first.left, first
+                    first.left.right = node
+                    first.left = node
+                nodes.append(node)
+            self.rows.append(first)
+        return nodes
 
     def print_matrix(self) -> None:
         no_of_rows, no_of_cols = len(self.matrix), len(self.matrix[0])
@@ -161,29 +163,13 @@ class ToroidalMatrix:
 
         for i in range(no_of_rows):
             print(to_print[i])
-        
-    @staticmethod
-    def get_left(pos: int, no_of_cols: int):
-        return no_of_cols - 1 if (pos - 1) < 0 else pos - 1
-
-    @staticmethod
-    def get_right(pos: int, no_of_cols: int):
-        return (pos + 1) % no_of_cols
-
-    @staticmethod
-    def get_up(pos: int, no_of_rows: int):
-        return no_of_rows - 1 if (pos - 1) < 0 else pos - 1
-
-    @staticmethod
-    def get_down(pos: int, no_of_rows: int):
-        return (pos + 1) % no_of_rows
 
 
 def search(k: int, toroidal_matrix: ToroidalMatrix):
-    logging.warning(f"Level {k}")
+    logging.debug("Level %d", k)
     solutions = []
     if toroidal_matrix.header.right == toroidal_matrix.header:
-        logging.warning("Found solution")
+        logging.debug("Found solution")
         print(solutions)
         return
     
@@ -0,0 +1,83 @@
+import os
+import sys
+
+import numpy as np
+
+import AlgoX
+import DLX
+from SearchBudget import BudgetExceeded, TimedOut
+from uni_script.SudokuBitState import default_box as box_size  # the (rows, cols) boxes of an N x N grid, as square as possible
+
+def _first_solution(solutions, N: int, stats=None):
+    """Return the first grid yielded by a solve_sudoku generator, a grid of -1s if there is none, or
+    `TimedOut` if the budget of the search ran out first."""
+    try:
+        for solution in solutions:
+            return np.array(solution)
+    except BudgetExceeded as e:
+        return TimedOut(e.reason, e.nodes, stats)
+    return np.full((N, N), -1)
+
+def solve_algox(grid, size=(3, 3), stats=None, budget=None):
+    """Solve with `AlgoX.solve_array`."""
+    return _first_solution(AlgoX.solve_array(grid, size, stats, budget), size[0] * size[1], stats)
+
+def solve_dlx(grid, size=(3, 3), stats=None, budget=None):
+    """Solve with `DLX.solve_sudoku`."""
+    return _first_solution(DLX.solve_sudoku(size, np.array(grid), stats, budget), size[0] * size[1], stats)
+
+def solve_dfs(grid, size=(3, 3), stats=None, budget=None):
+    """Solve with the depth-first search in uni_script."""
+    try:
+        return np.asarray(_uni_script_driver().sudoku_solver(np.array(grid), stats, tuple(size), budget))
+    except BudgetExceeded as e:
+        return TimedOut(e.reason, e.nodes, stats)
+
+def solve_dfs_mrv(grid, size=(3, 3), stats=None, budget=None):
+    """Solve with the uni_script depth-first search, choosing cells by fewest candidates and
+    values by least constraining, so that every run does the same search."""
+    try:
+        return np.asarray(_uni_script_driver().sudoku_solver(np.array(grid), stats, tuple(size), budget, "mrv", "lcv"))
+    except BudgetExceeded as e:
+        return TimedOut(e.reason, e.nodes, stats)
+
+def solve_auto(grid, size=(3, 3), stats=None, budget=None):
+    """Solve along the routes `Dispatcher` picks for the puzzle from its clues and, after singles, its entropy."""
+    return _dispatcher().solve(grid, size, stats, budget)
+
+_auto = None
+
+def _dispatcher():
+    """Return the `Dispatcher` behind the "auto" engine, made on first use as its module imports this one."""
+    global _auto
+    if _auto is None:
+        from Dispatcher import Dispatcher
+        _auto = Dispatcher()
+    return _auto
+
+def _uni_script_driver():
+    """Import the uni_script driver, whose modules import each other as top-level scripts."""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "uni_script")
+    if path not in sys.path:
+        sys.path.append(path)
+    import driver
+    return driver
+
+# Every engine takes (grid, size, stats=None, budget=None) and returns the solved grid, or a grid of -1s
+# if there is no solution. Passing a `SearchStats` as stats collects the counters and phase times of
+# that solve. Passing a `SearchBudget` as budget bounds its time and nodes, and the engine returns a
+# `TimedOut`, which keeps the stats so far, if the budget runs out
+ENGINES = {
+    "algox": solve_algox,
+    "dlx": solve_dlx,
+    "dfs": solve_dfs,
+    "dfs_mrv": solve_dfs_mrv,
+    "auto": solve_auto,
+}
+
+def get_engine(name: str):
+    """Return the solve function registered under name."""
+    try:
+        return ENGINES[name]
+    except KeyError:
+        raise ValueError(f"Unknown engine {name!r}, expected one of {sorted(ENGINES)}") from None
@@ -0,0 +1,200 @@
+"""Generate unique-solution puzzles.
+
+    python Generator.py --count 1000 --difficulty hard --seed 1 --workers 4 --output hard.npy
+
+A random full grid is built with a randomised Algorithm X search, then clues are removed one at a
+time in random order for as long as the puzzle keeps a unique solution."""
+import argparse
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from AlgoX import ColumnIndex, count, cover, next_row, push_level, uncover, working_copy
+from SearchBudget import BudgetExceeded, SearchBudget
+
+# Clues to stop removing at for each difficulty of a 9x9 puzzle, scaled by area for other sizes. At 0
+# every clue that can go is removed, which leaves a minimal puzzle - one where removing any remaining
+# clue breaks uniqueness.
+DIFFICULTIES = {
+    "very_easy": 50,
+    "easy": 40,
+    "medium": 32,
+    "hard": 0,
+}
+
+# Search nodes per cell that `random_grid` allows a search before starting again
+RESTART_NODES = 6
+
+def random_grid(size=(3, 3), rng=None) -> list:
+    """Return a random full grid. The boxes on the diagonal share no row or column, so each is filled
+    with its own shuffle of the digits, and the rest is found by an Algorithm X search that tries the
+    rows of each column in random order.
+
+    How long that search takes is heavy tailed: now and then an early choice leads it into a huge
+    dead subtree, which on 36x36 boards can take millions of nodes, while most runs that succeed
+    take a few nodes per cell. So it is given RESTART_NODES nodes per cell, and started again from
+    fresh diagonal boxes, with a quarter more nodes, whenever it runs out."""
+    rng = rng or random.Random()
+    num_rows, num_cols = size
+    N = num_rows * num_cols
+    max_nodes = RESTART_NODES * N * N
+    while True:
+        X, Y = working_copy(size)
+        diagonal = []
+        for box in range(min(num_rows, num_cols)):
+            digits = rng.sample(range(1, N + 1), N)
+            for k, number in enumerate(digits):
+                diagonal.append((box * num_rows + k // num_cols, box * num_cols + k % num_cols, number))
+        for row in diagonal:
+            cover(X, Y, row)
+        try:
+            solution = _random_cover(X, Y, rng, SearchBudget(max_nodes=max_nodes))
+        except BudgetExceeded:
+            max_nodes += max_nodes // 4
+            continue
+        if solution is not None:
+            break
+
+    grid = [[0] * N for _ in range(N)]
+    for (row, col, number) in diagonal + solution:
+        grid[row][col] = number
+    return grid
+
+def _random_cover(X, Y, rng, budget=None):
+    """Return the first exact cover of X found by the randomised search, or None, leaving X covered by it.
+
+    Uses an explicit stack so that large boards do not hit the recursion limit, and a `ColumnIndex`
+    so that the smallest column is found without scanning X. Ties go to the lowest column, so a seeded
+    rng always gives the same grid. budget may stop the search with `BudgetExceeded`."""
+    index = ColumnIndex(X, "lowest")
+    solution = []
+    stack = []  # the levels of the search, see `push_level`, with their rows in random order
+    while X:
+        if budget is not None:
+            budget.tick()
+        frame = push_level(X, Y, stack, index)
+        order = sorted(frame[1])
+        rng.shuffle(order)
+        frame[2] = iter(order)
+        if not next_row(X, Y, stack, index, solution):
+            return None
+    return solution
+
+def remove_clues(grid, size=(3, 3), target: int = 0, rng=None) -> list:
+    """Return a copy of the full grid with clues removed in random order while the solution stays unique,
+    stopping once only target clues are left.
+
+    The solver state is reused between removals rather than rebuilt. Every clue is covered up front in
+    the reverse of the order they will be tried, so the next one to try is always on top and can be
+    uncovered. To test a removal the few clues that had to be kept are covered again, the removed
+    clue's own value is ruled out, and the search looks for any other solution."""
+    rng = rng or random.Random()
+    N = size[0] * size[1]
+    X, Y = working_copy(size)
+
+    order = [(r, c) for r in range(N) for c in range(N)]
+    rng.shuffle(order)
+    stack = []
+    for r, c in reversed(order):
+        row = (r, c, grid[r][c])
+        stack.append((row, cover(X, Y, row)))
+
+    puzzle = [list(values) for values in grid]
+    kept = []  # clues whose removal broke uniqueness
+    clues = N * N
+
+    while stack and clues > target:
+        row, removed_cols = stack.pop()
+        uncover(X, Y, row, removed_cols)
+
+        covered = [(clue, cover(X, Y, clue)) for clue in kept]
+        for j in Y[row]:
+            X[j].remove(row)
+        another = count(X, Y, 1)
+        for j in Y[row]:
+            X[j].add(row)
+        for clue, clue_cols in reversed(covered):
+            uncover(X, Y, clue, clue_cols)
+
+        if another:
+            kept.append(row)
+        else:
+            puzzle[row[0]][row[1]] = 0
+            clues -= 1
+
+    return puzzle
+
+def remove_random(grid, size=(3, 3), target: int = 0, rng=None) -> list:
+    """Return a copy of the full grid with all but target clues removed at random, without checking
+    uniqueness. Much faster than `remove_clues` on large boards, for puzzles that only need to be solvable."""
+    rng = rng or random.Random()
+    N = size[0] * size[1]
+    puzzle = [list(values) for values in grid]
+    for cell in rng.sample(range(N * N), N * N - target):
+        puzzle[cell // N][cell % N] = 0
+    return puzzle
+
+def generate(difficulty: str = "hard", seed=None, size=(3, 3), unique: bool = True) -> tuple:
+    """Return a (puzzle, solution) pair of N x N int8 arrays for the given difficulty.
+
+    With unique=False clues are removed at random down to the difficulty's clue count, so the puzzle
+    is solvable but may have other solutions too."""
+    if difficulty not in DIFFICULTIES:
+        raise ValueError(f"Unknown difficulty {difficulty!r}, expected one of {sorted(DIFFICULTIES)}")
+    rng = random.Random(seed)
+    N = size[0] * size[1]
+    target = round(DIFFICULTIES[difficulty] * N * N / 81)
+    solution = random_grid(size, rng)
+    if unique:
+        puzzle = remove_clues(solution, size, target, rng)
+    else:
+        puzzle = remove_random(solution, size, target or N * N // 3, rng)
+    return np.array(puzzle, dtype=np.int8), np.array(solution, dtype=np.int8)
+
+def _generate_range(difficulty: str, seed: int, start: int, stop: int, size, unique: bool) -> tuple:
+    pairs = [generate(difficulty, f"{seed}:{i}", size, unique) for i in range(start, stop)]
+    return np.array([p for p, _ in pairs]), np.array([s for _, s in pairs])
+
+def generate_many(count: int, difficulty: str = "hard", seed: int = 0, workers: int = 1, size=(3, 3), chunksize: int = 16, unique: bool = True) -> tuple:
+    """Return (puzzles, solutions) stacks of count puzzles.
+
+    Puzzle i is always generated from the seed "seed:i", so the output does not depend on workers."""
+    if workers <= 1:
+        return _generate_range(difficulty, seed, 0, count, size, unique)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(_generate_range, difficulty, seed, start, min(start + chunksize, count), size, unique)
+            for start in range(0, count, chunksize)
+        ]
+        chunks = [future.result() for future in futures]
+    return np.concatenate([p for p, _ in chunks]), np.concatenate([s for _, s in chunks])
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=100)
+    parser.add_argument("--difficulty", choices=sorted(DIFFICULTIES), default="hard")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--box", type=int, nargs=2, default=(3, 3), metavar=("ROWS", "COLS"), help="box size (default: 3 3)")
+    parser.add_argument("--any-solution", action="store_true", help="remove clues at random without keeping the solution unique")
+    parser.add_argument("--output", help="save the puzzles here as <name>_puzzle.npy, and the solutions alongside as <name>_solution.npy")
+    args = parser.parse_args(argv)
+
+    start_time = time.perf_counter()
+    puzzles, solutions = generate_many(args.count, args.difficulty, args.seed, args.workers, tuple(args.box), unique=not args.any_solution)
+    elapsed = time.perf_counter() - start_time
+
+    clues = (puzzles != 0).sum(axis=(1, 2))
+    print(f"Generated {args.count} {args.difficulty} puzzles in {elapsed:.2f} seconds ({args.count / elapsed:.1f} puzzles/second)")
+    print(f"Clues: min {clues.min()}, mean {clues.mean():.1f}, max {clues.max()}")
+
+    if args.output:
+        name = args.output.removesuffix(".npy").removesuffix("_puzzle")
+        np.save(f"{name}_puzzle.npy", puzzles)
+        np.save(f"{name}_solution.npy", solutions)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import unittest
+
+import numpy as np
+
+from AlgoX import count_solutions, is_unique
+from Engines import ENGINES
+from Generator import *
+
+
+class TestGenerator(unittest.TestCase):
+    def test_random_grid_is_a_solution(self) -> None:
+        grid = random_grid((3, 3), random.Random(1))
+
+        self.assertEqual(count_solutions(grid), 1)
+        self.assertTrue(all(sorted(row) == list(range(1, 10)) for row in grid))
+
+    def test_generated_puzzle_is_unique_and_matches_solution(self) -> None:
+        puzzle, solution = generate("medium", seed=2)
+
+        self.assertTrue(is_unique(puzzle))
+        self.assertEqual(np.count_nonzero(puzzle), DIFFICULTIES["medium"])
+        np.testing.assert_array_equal(puzzle[puzzle != 0], solution[puzzle != 0])
+
+    def test_hard_puzzles_are_minimal(self) -> None:
+        puzzle, _ = generate("hard", seed=3, size=(2, 2))
+
+        self.assertTrue(is_unique(puzzle, (2, 2)))
+        for r, c in zip(*np.nonzero(puzzle)):
+            fewer = puzzle.copy()
+            fewer[r, c] = 0
+            self.assertFalse(is_unique(fewer, (2, 2)))
+
+    def test_large_board_any_solution(self) -> None:
+        puzzle, solution = generate("easy", seed=5, size=(4, 4), unique=False)
+
+        self.assertEqual(np.count_nonzero(puzzle), round(DIFFICULTIES["easy"] * 256 / 81))
+        np.testing.assert_array_equal(puzzle[puzzle != 0], solution[puzzle != 0])
+        for name, solve in ENGINES.items():
+            result = solve(puzzle, (4, 4))
+            self.assertTrue((result > 0).all(), name)
+            np.testing.assert_array_equal(result[puzzle != 0], puzzle[puzzle != 0])
+
+    def test_seeded_output_does_not_depend_on_workers(self) -> None:
+        one, _ = generate_many(6, "easy", seed=4, workers=1)
+        two, _ = generate_many(6, "easy", seed=4, workers=2, chunksize=2)
+
+        np.testing.assert_array_equal(one, two)
+
+if __name__ == "__main__":
+    unittest.main()
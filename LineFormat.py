@@ -0,0 +1,37 @@
+"""The one-puzzle-per-line text format, in plain Python so that reading and writing lines does not import NumPy.
+
+A line holds the N * N cells of a grid row by row: `0` or `.` is an empty cell, `-` is a -1
+(unsolvable) cell, `1`-`9` are themselves and `A`-`Z` then `a`-`z` are 10 upwards."""
+from math import isqrt
+
+# Line format characters for the values 1 to 61, so boards up to 61 x 61 fit on a line, and for
+# an empty cell and a -1 (unsolvable) cell
+DIGITS = "123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+UNSOLVED = "-"
+VALUES = {ch: i + 1 for i, ch in enumerate(DIGITS)}
+VALUES.update({"0": 0, ".": 0, UNSOLVED: -1})
+
+def parse_line(line, N: int = None) -> list:
+    """Parse a line of N * N characters into an N x N grid of lists, taking N from its length if not given."""
+    text = line.strip()
+    if isinstance(text, bytes):
+        text = text.decode("ascii")
+    if N is None:
+        N = isqrt(len(text))
+        if not N or N * N != len(text):
+            raise ValueError(f"Expected a square number of characters, got {len(text)}: {text!r}")
+    elif len(text) != N * N:
+        raise ValueError(f"Expected {N * N} characters, got {len(text)}: {text!r}")
+    try:
+        cells = [VALUES[ch] for ch in text]
+    except KeyError as e:
+        raise ValueError(f"Unexpected character {e.args[0]!r} in {text!r}") from None
+    if max(cells) > N:
+        raise ValueError(f"Value {max(cells)} does not fit a {N}x{N} grid: {text!r}")
+    return [cells[i:i + N] for i in range(0, N * N, N)]
+
+def format_line(grid) -> str:
+    """Format a grid of lists or a NumPy grid as a single line."""
+    if hasattr(grid, "tolist"):
+        grid = grid.tolist()
+    return "".join(UNSOLVED if v < 0 else DIGITS[v - 1] if v else "0" for row in grid for v in row)
@@ -0,0 +1,21 @@
+import unittest
+
+from LineFormat import *
+
+
+class TestLineFormat(unittest.TestCase):
+    def test_round_trip(self) -> None:
+        grid = [[1, 0, -1, 4], [0, 0, 0, 0], [2, 0, 0, 0], [0, 0, 0, 3]]
+
+        self.assertEqual(format_line(grid), "10-4000020000003")
+        self.assertEqual(parse_line(format_line(grid)), grid)
+        self.assertEqual(parse_line(format_line(grid).encode(), 4), grid)
+
+    def test_size_comes_from_the_length(self) -> None:
+        self.assertEqual(len(parse_line("G" + "0" * 255)), 16)
+        for line, N in [("0" * 15, None), ("0" * 16, 9), ("5" + "0" * 15, None), ("x" * 16, None)]:
+            with self.subTest(line=line, N=N), self.assertRaises(ValueError):
+                parse_line(line, N)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import numpy as np
+
+from BatchSolver import solve_many
+
+# Values of the status array returned by `propagate`
+INVALID = -1
+UNSOLVED = 0
+SOLVED = 1
+
+def analyse(grids, size=(3, 3)) -> tuple:
+    """Validate a stack of grids and work out the candidates of every empty cell, all at once.
+
+    Return (candidates, invalid) where candidates[p, r, c, d] is True if digit d+1 can go in cell (r, c)
+    of grid p, and invalid[p] is True if grid p repeats a digit in a unit, has an empty cell with no
+    candidates or has a unit with nowhere left to put some digit."""
+    num_rows, num_cols = size
+    N = num_rows * num_cols
+    P = len(grids)
+
+    onehot = grids[..., None] == np.arange(1, N + 1)
+    empty = grids == 0
+
+    # How often each digit appears in each row, column and box
+    in_row = onehot.sum(axis=2, dtype=np.int16)
+    in_col = onehot.sum(axis=1, dtype=np.int16)
+    in_box = onehot.reshape(P, num_cols, num_rows, num_rows, num_cols, N).sum(axis=(2, 4), dtype=np.int16)
+    invalid = (in_row > 1).any(axis=(1, 2)) | (in_col > 1).any(axis=(1, 2)) | (in_box > 1).any(axis=(1, 2, 3))
+
+    box_used = in_box.repeat(num_rows, axis=1).repeat(num_cols, axis=2).astype(bool)
+    candidates = ~(in_row[:, :, None, :].astype(bool) | in_col[:, None, :, :].astype(bool) | box_used)
+    candidates &= empty[..., None]
+
+    invalid |= (empty & ~candidates.any(axis=-1)).any(axis=(1, 2))
+
+    # A digit missing from a unit must have at least one cell left in it
+    row_places = candidates.sum(axis=2, dtype=np.int16)
+    col_places = candidates.sum(axis=1, dtype=np.int16)
+    box_places = candidates.reshape(P, num_cols, num_rows, num_rows, num_cols, N).sum(axis=(2, 4), dtype=np.int16)
+    invalid |= ((in_row == 0) & (row_places == 0)).any(axis=(1, 2))
+    invalid |= ((in_col == 0) & (col_places == 0)).any(axis=(1, 2))
+    invalid |= ((in_box == 0) & (box_places == 0)).any(axis=(1, 2, 3))
+
+    return candidates, invalid, (row_places, col_places, box_places)
+
+def propagate(puzzles, size=(3, 3), block: int = 4096) -> tuple:
+    """Fill in naked and hidden singles on every puzzle of a stack in lockstep until none are left.
+
+    Return (grids, status) where grids holds the propagated puzzles and status[p] is SOLVED, UNSOLVED
+    (propagation got stuck and the puzzle needs a search) or INVALID. Puzzles are processed block at a
+    time to bound the size of the candidate arrays."""
+    grids = np.array(puzzles, dtype=np.int16)
+    status = np.full(len(grids), UNSOLVED, dtype=np.int8)
+
+    for start in range(0, len(grids), block):
+        stop = min(start + block, len(grids))
+        grids[start:stop], status[start:stop] = _propagate_block(grids[start:stop], size)
+
+    return grids, status
+
+def _propagate_block(grids, size) -> tuple:
+    num_rows, num_cols = size
+    N = num_rows * num_cols
+    status = np.full(len(grids), UNSOLVED, dtype=np.int8)
+    active = np.arange(len(grids))
+
+    while active.size:
+        current = grids[active]
+        candidates, invalid, (row_places, col_places, box_places) = analyse(current, size)
+        complete = ~(current == 0).any(axis=(1, 2))
+
+        # Naked singles, then hidden singles in each row, column and box
+        assign = candidates & (candidates.sum(axis=-1) == 1)[..., None]
+        assign |= candidates & (row_places == 1)[:, :, None, :]
+        assign |= candidates & (col_places == 1)[:, None, :, :]
+        assign |= candidates & (box_places == 1).repeat(num_rows, axis=1).repeat(num_cols, axis=2)
+
+        # Two different digits forced into one cell
+        invalid |= (assign.sum(axis=-1) > 1).any(axis=(1, 2))
+
+        cells = assign.any(axis=-1)
+        current[cells] = assign.argmax(axis=-1)[cells] + 1
+        progressed = cells.any(axis=(1, 2)) & ~invalid
+        grids[active] = current
+
+        status[active[invalid]] = INVALID
+        status[active[complete & ~invalid]] = SOLVED
+        active = active[progressed & ~complete]
+
+    return grids, status
+
+def solve_lockstep(puzzles, engine: str = "dlx", size=(3, 3), workers: int = 1) -> np.ndarray:
+    """Solve a stack of puzzles by propagating them all in lockstep and only searching the ones left unsolved.
+
+    The remaining puzzles are handed to `BatchSolver.solve_many` with the given engine and workers."""
+    puzzles = np.asarray(puzzles)
+    grids, status = propagate(puzzles, size)
+
+    results = grids.astype(np.result_type(puzzles.dtype, np.int8))
+    results[status == INVALID] = -1
+
+    unsolved = np.flatnonzero(status == UNSOLVED)
+    if unsolved.size:
+        results[unsolved] = solve_many(grids[unsolved], engine=engine, workers=workers, size=size)
+
+    return results
+
+if __name__ == "__main__":
+    import time
+
+    for difficulty in ['very_easy', 'easy', 'medium', 'hard']:
+        sudokus = np.load(f"data/{difficulty}_puzzle.npy")
+        solutions = np.load(f"data/{difficulty}_solution.npy")
+
+        start_time = time.perf_counter()
+        _, status = propagate(sudokus)
+        results = solve_lockstep(sudokus)
+        end_time = time.perf_counter()
+
+        correct = sum(np.array_equal(results[i], solutions[i]) for i in range(len(sudokus)))
+        print(f"{correct}/{len(sudokus)} {difficulty} sudokus correct in {end_time - start_time:.3f} seconds, "
+              f"{np.count_nonzero(status == SOLVED)} solved by propagation, {np.count_nonzero(status == INVALID)} rejected")
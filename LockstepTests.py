@@ -0,0 +1,42 @@
+import unittest
+
+import numpy as np
+
+from Lockstep import *
+
+
+class TestPropagate(unittest.TestCase):
+    def test_very_easy_solved_by_propagation(self) -> None:
+        puzzles = np.load("data/very_easy_puzzle.npy")
+        solutions = np.load("data/very_easy_solution.npy")
+        grids, status = propagate(puzzles)
+
+        self.assertTrue((status == SOLVED).all())
+        np.testing.assert_array_equal(grids, solutions)
+
+    def test_repeated_digit_is_invalid(self) -> None:
+        puzzle = np.load("data/very_easy_puzzle.npy")[:1].copy()
+        puzzle[0, 0, 0] = puzzle[0, 1, 1] = 5  # same box
+        _, status = propagate(puzzle)
+
+        self.assertEqual(status[0], INVALID)
+
+    def test_small_blocks(self) -> None:
+        puzzles = np.load("data/easy_puzzle.npy")
+        whole = propagate(puzzles)
+        blocked = propagate(puzzles, block=4)
+
+        np.testing.assert_array_equal(whole[0], blocked[0])
+        np.testing.assert_array_equal(whole[1], blocked[1])
+
+
+class TestSolveLockstep(unittest.TestCase):
+    def test_matches_solutions(self) -> None:
+        for difficulty in ["easy", "hard"]:
+            with self.subTest(difficulty=difficulty):
+                puzzles = np.load(f"data/{difficulty}_puzzle.npy")
+                solutions = np.load(f"data/{difficulty}_solution.npy")
+                np.testing.assert_array_equal(solve_lockstep(puzzles), solutions)
+
+if __name__ == "__main__":
+    unittest.main()
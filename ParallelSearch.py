@@ -0,0 +1,221 @@
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from AlgoX import ColumnIndex, cover, next_row, push_level, reduced_copy, uncover
+from SearchBudget import BudgetExceeded, SearchBudget
+
+# Set in each worker process by `_start_worker`, and by the parent once it has all the solutions it needs
+_stop = None
+
+
+class _EventToken:
+    """A `CancelToken` backed by a multiprocessing event, so the parent can stop every worker at once."""
+
+    __slots__ = ("event",)
+
+    def __init__(self, event) -> None:
+        self.event = event
+
+    @property
+    def cancelled(self) -> bool:
+        return self.event.is_set()
+
+
+def split(grid, size=(3, 3), depth: int = None, tasks: int = 1, choose: str = "any") -> tuple:
+    """Expand the top of the Algorithm X search tree of grid, returning (solutions, prefixes).
+
+    Each prefix is the list of rows chosen on the way down to one open node of the frontier, and
+    the subtrees under the prefixes together hold every solution that is not already in solutions.
+    The tree is expanded a whole level at a time, depth levels if given, otherwise until there are
+    at least tasks prefixes. Branches that reach an empty column are dropped."""
+    tables = reduced_copy(size, grid)
+    if tables is None:
+        return [], []
+    X, Y = tables
+    solutions = []
+    frontier = [[]]
+    level = 0
+    while frontier and (level < depth if depth is not None else len(frontier) < tasks):
+        next_frontier = []
+        for prefix in frontier:
+            children = _expand(X, Y, prefix, choose)
+            if children is None:
+                solutions.append(prefix)
+            else:
+                next_frontier.extend(children)
+        frontier = next_frontier
+        level += 1
+    return solutions, frontier
+
+def _expand(X, Y, prefix: list, choose: str):
+    """Return the prefixes one level below prefix, or None if prefix is already a solution.
+
+    X is left as it was."""
+    removed = [cover(X, Y, row) for row in prefix]
+    if not X:
+        children = None
+    else:
+        col = ColumnIndex(X, choose).smallest(X)
+        children = [prefix + [row] for row in sorted(X[col])]
+    for row in reversed(prefix):
+        uncover(X, Y, row, removed.pop())
+    return children
+
+def _start_worker(stop) -> None:
+    global _stop
+    _stop = stop
+
+def _search(grid, size, prefix: list, mode: str, limit, split_nodes: int, choose: str) -> tuple:
+    """Search the subtree under prefix, returning (status, value).
+
+    The tables are rebuilt from the cached template and prefix is replayed onto them. The status is
+    "done" with the solutions found (as lists of rows) or their count, "split" with (solutions or
+    count found so far, open prefixes) if the subtree took more than split_nodes nodes, or
+    "cancelled" if the parent stopped the search. The open prefixes are the node the search was
+    about to enter and every untried sibling on the path down to it, so together they hold just
+    the part of the subtree not yet searched, and can be shared out between idle workers."""
+    X, Y = reduced_copy(size, grid)
+    for row in prefix:
+        cover(X, Y, row)
+    index = ColumnIndex(X, choose)
+    token = _EventToken(_stop) if _stop is not None else None
+    budget = SearchBudget(max_nodes=split_nodes, token=token) if split_nodes is not None or token is not None else None
+    counting = mode == "count"
+    found = 0 if counting else []
+    solution = list(prefix)
+    stack = []  # the levels of the search below prefix, see `push_level`
+    try:
+        while True:
+            if budget is not None:
+                budget.tick()
+            if not X:
+                if counting:
+                    found += 1
+                else:
+                    found.append(list(solution))
+                if limit is not None and (found if counting else len(found)) >= limit:
+                    return "done", found
+            else:
+                push_level(X, Y, stack, index)
+            if not next_row(X, Y, stack, index, solution):
+                return "done", found
+    except BudgetExceeded as e:
+        if e.reason != "nodes":
+            return "cancelled", None
+    # The budget runs out on entering the node at solution, before anything under it is searched
+    depth = len(prefix)
+    unexplored = [solution]
+    for level, (_, _, untried, _) in enumerate(stack):
+        unexplored.extend(solution[:depth + level] + [row] for row in untried)
+    return "split", (found, unexplored)
+
+def search(grid, size=(3, 3), mode: str = "solve", limit: int = None, workers: int = None, depth: int = None,
+           split_nodes: int = 20000, choose: str = "any"):
+    """Search the subtrees of grid's frontier in a pool of worker processes and merge what they find.
+
+    mode is "solve" or "count": a list of the solutions as lists of rows, or their number. Either
+    stops once limit solutions have been found, and the workers still searching are cancelled. The
+    frontier is depth levels down, or if depth is None deep enough for four subtrees per worker.
+    A subtree that takes more than split_nodes nodes is handed back with what it found so far and
+    the parts of it not yet searched, so a lopsided tree keeps every worker busy. The solutions come
+    back sorted by their rows, so without a limit the result is the same on every run however the
+    work was shared out."""
+    if mode not in ("solve", "count"):
+        raise ValueError(f"Unknown search mode {mode!r}, expected 'solve' or 'count'")
+    if split_nodes is not None and split_nodes < 1:
+        raise ValueError(f"split_nodes must be at least 1, got {split_nodes}")
+    if hasattr(grid, "tolist"):
+        grid = grid.tolist()
+    if workers is None:
+        workers = os.cpu_count() or 1
+    found, prefixes = split(grid, size, depth, workers * 4, choose)
+    solutions = [] if mode == "count" else found
+    total = len(found)
+
+    def remaining():
+        return None if limit is None else limit - total
+
+    if workers <= 1:
+        queue = deque(prefixes)
+        while queue and (limit is None or total < limit):
+            prefix = queue.popleft()
+            _, value = _search(grid, size, prefix, mode, remaining(), None, choose)
+            if mode == "count":
+                total += value
+            else:
+                solutions.extend(value)
+                total += len(value)
+    elif prefixes and (limit is None or total < limit):
+        context = multiprocessing.get_context()
+        stop = context.Event()
+        with ProcessPoolExecutor(workers, mp_context=context, initializer=_start_worker, initargs=(stop,)) as executor:
+            def submit(prefix):
+                pending.add(executor.submit(_search, grid, size, prefix, mode, remaining(), split_nodes, choose))
+
+            pending = set()
+            for prefix in prefixes:
+                submit(prefix)
+            while pending and (limit is None or total < limit):
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    status, value = future.result()
+                    if status == "cancelled":
+                        continue
+                    if status == "split":
+                        value, unexplored = value
+                        for prefix in unexplored:
+                            submit(prefix)
+                    if mode == "count":
+                        total += value
+                    else:
+                        solutions.extend(value)
+                        total += len(value)
+            stop.set()
+            for future in pending:
+                future.cancel()
+
+    if mode == "count":
+        return total if limit is None else min(total, limit)
+    solutions = sorted(sorted(solution) for solution in solutions)
+    return solutions if limit is None else solutions[:limit]
+
+def _to_grid(grid, rows, N: int) -> np.ndarray:
+    solved = np.array(grid).reshape(N, N)
+    for (row, col, number) in rows:
+        solved[row, col] = number
+    return solved
+
+def solve_parallel(grid, size=(3, 3), workers: int = None, **options) -> np.ndarray:
+    """Return a solution of grid found by a parallel `search`, or a grid of -1s if there is none."""
+    N = size[0] * size[1]
+    solutions = search(grid, size, "solve", 1, workers, **options)
+    if not solutions:
+        return np.full((N, N), -1)
+    return _to_grid(grid, solutions[0], N)
+
+def enumerate_parallel(grid, size=(3, 3), limit: int = None, workers: int = None, **options) -> list:
+    """Return every solution of grid, or the first limit found, as grids from a parallel `search`."""
+    N = size[0] * size[1]
+    return [_to_grid(grid, rows, N) for rows in search(grid, size, "solve", limit, workers, **options)]
+
+def count_parallel(grid, size=(3, 3), limit: int = None, workers: int = None, **options) -> int:
+    """Return the number of solutions of grid, stopping once limit have been found, from a parallel `search`."""
+    return search(grid, size, "count", limit, workers, **options)
+
+if __name__ == "__main__":
+    import time
+
+    from Engines import solve_algox
+
+    for difficulty, size in [("hard", (3, 3)), ("large_16", (4, 4))]:
+        puzzles = np.load(f"data/{difficulty}_puzzle.npy")
+        solutions = np.load(f"data/{difficulty}_solution.npy")
+        for name, solver in [("serial", lambda p: solve_algox(p, size)), ("parallel", lambda p: solve_parallel(p, size))]:
+            start_time = time.perf_counter()
+            correct = sum(np.array_equal(solver(puzzle), solution) for puzzle, solution in zip(puzzles, solutions))
+            end_time = time.perf_counter()
+            print(f"{name:8} {correct}/{len(puzzles)} {difficulty} sudokus correct in {end_time - start_time:.3f} seconds")
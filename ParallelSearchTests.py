@@ -0,0 +1,64 @@
+import unittest
+
+import numpy as np
+
+from AlgoX import solve_sudoku
+from ParallelSearch import *
+
+
+class TestSplit(unittest.TestCase):
+    def test_frontier_covers_every_solution(self) -> None:
+        grid = [[1, 2, 3, 4, 5, 6], [4, 5, 6, 0, 0, 0], [0] * 6, [0] * 6, [2, 0, 0, 0, 0, 0], [0, 0, 0, 0, 0, 1]]
+        _, prefixes = split(grid, (2, 3), depth=3)
+
+        self.assertEqual({len(prefix) for prefix in prefixes}, {3})
+        self.assertEqual(len({tuple(prefix) for prefix in prefixes}), len(prefixes))
+        self.assertEqual(count_parallel(grid, (2, 3), workers=1, depth=3), 272)
+
+    def test_clashing_givens(self) -> None:
+        self.assertEqual(split([[1, 1, 0, 0]] + [[0] * 4] * 3, (2, 2)), ([], []))
+
+
+class TestParallelSearch(unittest.TestCase):
+    def setUp(self) -> None:
+        self.grid = [[1, 2, 3, 4, 5, 6], [4, 5, 6, 0, 0, 0], [0] * 6, [0] * 6, [2, 0, 0, 0, 0, 0], [0, 0, 0, 0, 0, 1]]
+        self.serial = sorted(str(solution) for solution in solve_sudoku((2, 3), [row[:] for row in self.grid]))
+
+    def test_enumeration_merges_workers(self) -> None:
+        for workers, split_nodes in [(1, None), (2, 20000), (2, 20)]:
+            with self.subTest(workers=workers, split_nodes=split_nodes):
+                solutions = enumerate_parallel(self.grid, (2, 3), workers=workers, split_nodes=split_nodes)
+                self.assertEqual(sorted(str(solution.tolist()) for solution in solutions), self.serial)
+
+    def test_split_hands_back_only_the_unsearched_part(self) -> None:
+        from ParallelSearch import _search, _to_grid
+
+        status, (found, unexplored) = _search(self.grid, (2, 3), [], "solve", None, 50, "lowest")
+        self.assertEqual(status, "split")
+        for prefix in unexplored:
+            _, rest = _search(self.grid, (2, 3), prefix, "solve", None, None, "lowest")
+            found.extend(rest)
+
+        # Nothing is found twice, so no part of the tree was searched twice
+        self.assertEqual(sorted(str(_to_grid(self.grid, rows, 6).tolist()) for rows in found), self.serial)
+
+    def test_count(self) -> None:
+        self.assertEqual(count_parallel(self.grid, (2, 3), workers=2, split_nodes=20), 272)
+        self.assertEqual(count_parallel(self.grid, (2, 3), limit=10, workers=2), 10)
+
+    def test_limit_cancels_an_endless_search(self) -> None:
+        # An empty 9x9 grid has far too many solutions to enumerate
+        self.assertEqual(len(enumerate_parallel(np.zeros((9, 9), dtype=int), limit=50, workers=2)), 50)
+
+    def test_solve(self) -> None:
+        puzzles = np.load("data/hard_puzzle.npy")
+        solutions = np.load("data/hard_solution.npy")
+        for puzzle, solution in zip(puzzles[:5], solutions[:5]):
+            np.testing.assert_array_equal(solve_parallel(puzzle, workers=2, split_nodes=30), solution)
+
+        puzzle = puzzles[0].copy()
+        puzzle[0, :2] = 9
+        self.assertTrue((solve_parallel(puzzle, workers=2) == -1).all())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+from time import perf_counter
+
+
+class CancelToken:
+    """A flag another thread can set to stop a search at its next budget check."""
+
+    __slots__ = ("cancelled",)
+
+    def __init__(self) -> None:
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+
+class BudgetExceeded(Exception):
+    """Raised from inside a search loop when its `SearchBudget` runs out. reason is "deadline",
+    "nodes" or "cancelled"."""
+
+    def __init__(self, reason: str, nodes: int) -> None:
+        super().__init__(f"search stopped after {nodes} nodes: {reason}")
+        self.reason = reason
+        self.nodes = nodes
+
+
+class SearchBudget:
+    """A wall-clock deadline, a node limit and a cancel token for one solve, any of which may be left out.
+
+    Search loops call `tick` once per node, which only compares the node count; the clock and the
+    token are looked at every check_every nodes so that the check stays cheap. When any limit is
+    hit `tick` raises `BudgetExceeded`, leaving the search's tables as they were at that point.
+
+    The deadline is set from timeout when the budget is made, so make it just before the solve."""
+
+    __slots__ = ("deadline", "max_nodes", "token", "check_every", "nodes", "_next_check")
+
+    def __init__(self, timeout: float = None, max_nodes: int = None, token: CancelToken = None, check_every: int = 64) -> None:
+        self.deadline = None if timeout is None else perf_counter() + timeout
+        self.max_nodes = max_nodes
+        self.token = token
+        self.check_every = check_every
+        self.nodes = 0
+        self._next_check = check_every if max_nodes is None else min(check_every, max_nodes + 1)
+
+    def tick(self) -> None:
+        self.nodes += 1
+        if self.nodes >= self._next_check:
+            self.check()
+            self._next_check = self.nodes + self.check_every
+            if self.max_nodes is not None:
+                self._next_check = min(self._next_check, self.max_nodes + 1)
+
+    def check(self) -> None:
+        """Raise `BudgetExceeded` if any limit has been hit."""
+        if self.max_nodes is not None and self.nodes > self.max_nodes:
+            raise BudgetExceeded("nodes", self.nodes)
+        if self.token is not None and self.token.cancelled:
+            raise BudgetExceeded("cancelled", self.nodes)
+        if self.deadline is not None and perf_counter() >= self.deadline:
+            raise BudgetExceeded("deadline", self.nodes)
+
+    def remaining(self) -> float:
+        """Return the seconds left before the deadline, or None if there is none."""
+        return None if self.deadline is None else self.deadline - perf_counter()
+
+
+class TimedOut:
+    """What an engine returns instead of a grid when its budget ran out.
+
+    It is falsy, and keeps why the search stopped, how many nodes it got through and the stats
+    passed to the engine, which hold the counts and phase times up to that point."""
+
+    __slots__ = ("reason", "nodes", "stats")
+
+    def __init__(self, reason: str, nodes: int, stats=None) -> None:
+        self.reason = reason
+        self.nodes = nodes
+        self.stats = stats
+
+    def __bool__(self) -> bool:
+        return False
+
+    def __repr__(self) -> str:
+        return f"TimedOut(reason={self.reason!r}, nodes={self.nodes})"
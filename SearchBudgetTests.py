@@ -0,0 +1,70 @@
+import threading
+import unittest
+
+import numpy as np
+
+from DLX import sudoku_links
+from Engines import ENGINES
+from SearchBudget import *
+from SearchStats import SearchStats
+
+
+class TestSearchBudget(unittest.TestCase):
+    def setUp(self) -> None:
+        self.puzzle = np.load("data/hard_puzzle.npy")[3]
+        self.solution = np.load("data/hard_solution.npy")[3]
+
+    def test_node_limit(self) -> None:
+        for name, solve in ENGINES.items():
+            stats = SearchStats()
+            result = solve(self.puzzle, (3, 3), stats, SearchBudget(max_nodes=5))
+
+            self.assertIsInstance(result, TimedOut, name)
+            self.assertFalse(result)
+            self.assertEqual(result.reason, "nodes")
+            self.assertIs(result.stats, stats)
+            self.assertEqual(stats.nodes, 5, name)
+
+    def test_deadline(self) -> None:
+        for name, solve in ENGINES.items():
+            result = solve(self.puzzle, (3, 3), None, SearchBudget(timeout=0, check_every=1))
+
+            self.assertEqual(result.reason, "deadline", name)
+
+    def test_cancel_from_another_thread(self) -> None:
+        # Enumerating every 9x9 grid never finishes on its own
+        token = CancelToken()
+        timer = threading.Timer(0.05, token.cancel)
+        timer.start()
+        with self.assertRaises(BudgetExceeded) as raised:
+            for _ in sudoku_links((3, 3)).search(budget=SearchBudget(token=token)):
+                pass
+        timer.join()
+
+        self.assertEqual(raised.exception.reason, "cancelled")
+
+    def test_enough_budget_solves(self) -> None:
+        for name, solve in ENGINES.items():
+            result = solve(self.puzzle, (3, 3), None, SearchBudget(timeout=60, max_nodes=10 ** 6))
+
+            np.testing.assert_array_equal(result, self.solution, err_msg=name)
+
+    def test_dfs_mrv_repeats_its_search(self) -> None:
+        first, second = SearchStats(), SearchStats()
+        ENGINES["dfs_mrv"](self.puzzle, (3, 3), first)
+        ENGINES["dfs_mrv"](self.puzzle, (3, 3), second)
+
+        self.assertEqual(first.nodes, second.nodes)
+        self.assertEqual(first.backtracks, second.backtracks)
+
+    def test_check_every(self) -> None:
+        budget = SearchBudget(max_nodes=1000, check_every=10)
+        budget.token = CancelToken()
+        budget.token.cancel()
+        for _ in range(9):
+            budget.tick()
+        with self.assertRaises(BudgetExceeded):
+            budget.tick()
+
+if __name__ == "__main__":
+    unittest.main()
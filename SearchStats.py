@@ -0,0 +1,50 @@
+from time import perf_counter
+
+# The phases a solve is split into for timing
+PHASES = ("build", "propagate", "search", "write_back")
+
+
+class SearchStats:
+    """Opt-in counters and phase timers for a single solve.
+
+    Engines take `stats=None` and only touch the object when one is passed, so leaving it out
+    costs a single `is not None` test at each place that would be counted."""
+
+    __slots__ = ("nodes", "backtracks", "covers", "uncovers", "propagations", "max_depth", "solutions", "phases")
+
+    def __init__(self) -> None:
+        self.nodes = 0          # search nodes expanded
+        self.backtracks = 0     # dead ends - nodes with no choice left to try
+        self.covers = 0         # cover calls
+        self.uncovers = 0       # uncover calls
+        self.propagations = 0   # values placed or choices removed by inference rather than branching
+        self.max_depth = 0      # deepest level of the search
+        self.solutions = 0      # solutions found
+        self.phases = dict.fromkeys(PHASES, 0.0)
+
+    def lap(self, phase: str, start: float) -> float:
+        """Add the time since start to phase and return the current time, to start the next lap from."""
+        now = perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - start
+        return now
+
+    def depth(self, depth: int) -> None:
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+    def merge(self, other: "SearchStats") -> None:
+        """Add the counts and times of other into these stats, e.g. to total a batch."""
+        for name in ("nodes", "backtracks", "covers", "uncovers", "propagations", "solutions"):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        self.max_depth = max(self.max_depth, other.max_depth)
+        for phase, seconds in other.phases.items():
+            self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def as_dict(self) -> dict:
+        """Return the stats as a flat dict of numbers, with phase times in seconds as `<phase>_time`."""
+        result = {name: getattr(self, name) for name in self.__slots__ if name != "phases"}
+        result.update((f"{phase}_time", seconds) for phase, seconds in self.phases.items())
+        return result
+
+    def __repr__(self) -> str:
+        return f"SearchStats({', '.join(f'{k}={v!r}' for k, v in self.as_dict().items())})"
@@ -0,0 +1,46 @@
+import unittest
+
+import numpy as np
+
+import AlgoX
+from Engines import ENGINES
+from SearchStats import SearchStats
+
+
+class TestSearchStats(unittest.TestCase):
+    def test_engines_fill_in_stats(self) -> None:
+        puzzle = np.load("data/hard_puzzle.npy")[5]
+        for name, solve in ENGINES.items():
+            with self.subTest(engine=name):
+                stats = SearchStats()
+                with_stats = solve(puzzle, stats=stats)
+
+                np.testing.assert_array_equal(with_stats, solve(puzzle))
+                self.assertGreater(stats.nodes, 0)
+                self.assertEqual(stats.solutions, 1)
+                self.assertGreater(stats.max_depth, 0)
+                self.assertGreater(stats.phases["search"], 0)
+
+    def test_propagation_is_timed(self) -> None:
+        puzzle = np.load("data/hard_puzzle.npy")[5]
+        stats = SearchStats()
+        next(AlgoX.solve_sudoku((3, 3), puzzle.tolist(), stats, ("singles",)))
+
+        self.assertGreater(stats.propagations, 0)
+        self.assertGreater(stats.phases["propagate"], 0)
+        self.assertGreater(stats.phases["search"], 0)
+
+    def test_merge_and_as_dict(self) -> None:
+        a, b = SearchStats(), SearchStats()
+        a.nodes, a.max_depth = 3, 5
+        b.nodes, b.max_depth = 4, 2
+        b.lap("build", 0.0)
+        a.merge(b)
+        result = a.as_dict()
+
+        self.assertEqual(result["nodes"], 7)
+        self.assertEqual(result["max_depth"], 5)
+        self.assertGreater(result["build_time"], 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,381 @@
+"""A local solver service speaking line-delimited JSON over TCP, with a bundled client and load tester.
+
+    python Service.py serve --port 8765 --workers 4
+    python Service.py load --port 8765 --corpus data/hard_puzzle.npy --requests 2000 --concurrency 64
+    python Service.py load --corpus data/hard_puzzle.npy    # starts its own server on a free port
+
+Each request is one JSON object on a line and gets one JSON line back with the same id, in the order
+they finish rather than the order they were sent:
+
+    {"id": 1, "puzzle": "530070000600195000...", "deadline": 0.5}
+    {"id": 1, "status": "ok", "solution": "534678912672195348..."}
+    {"id": 2, "puzzles": ["...", "..."]}
+    {"id": 2, "status": "ok", "solutions": ["...", "..."]}
+    {"id": 3, "op": "stats"}
+
+Grids are written as in `CorpusIO.format_line`, and a solution of all `-` means there is none. A
+status other than ok is one of "overloaded" (the queue was full and the request was shed),
+"timeout" (its deadline passed) or "error"."""
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from math import isqrt
+
+import numpy as np
+
+from CorpusIO import format_line, parse_line
+from Engines import box_size, get_engine
+from SearchBudget import SearchBudget, TimedOut
+
+
+class Overloaded(Exception):
+    """Raised when a request is shed because the queue is full."""
+
+
+def _solve_batch(engine: str, grids, timeout: float = None) -> list:
+    """Solve a micro-batch in a worker, each grid at its own size.
+
+    The search stops once timeout seconds have passed, so a hard puzzle whose request has already
+    timed out cannot hold the worker. The puzzles not solved by then come back as `TimedOut`."""
+    solve = get_engine(engine)
+    budget = None if timeout is None else SearchBudget(timeout)
+    return [solve(grid, box_size(len(grid)), None, budget) for grid in grids]
+
+
+class ServiceStats:
+    """Counters and recent latencies of a `SolverService`."""
+
+    __slots__ = ("requests", "puzzles", "batches", "shed", "timeouts", "errors", "max_queue_depth", "latencies")
+
+    def __init__(self, window: int = 10000) -> None:
+        self.requests = 0           # requests answered ok
+        self.puzzles = 0            # puzzles solved
+        self.batches = 0            # micro-batches sent to the workers
+        self.shed = 0               # requests turned away with the queue full
+        self.timeouts = 0           # requests whose deadline passed
+        self.errors = 0             # requests that failed for any other reason
+        self.max_queue_depth = 0
+        self.latencies = deque(maxlen=window)  # seconds from arrival to answer of the latest ok requests
+
+    def as_dict(self) -> dict:
+        result = {name: getattr(self, name) for name in self.__slots__ if name != "latencies"}
+        if self.latencies:
+            p50, p95, p99 = np.percentile(self.latencies, [50, 95, 99])
+            result.update(p50=float(p50), p95=float(p95), p99=float(p99))
+        result["mean_batch"] = self.puzzles / self.batches if self.batches else 0.0
+        return result
+
+
+class SolverService:
+    """Queue puzzles and solve them in micro-batches on a pool of worker processes.
+
+    A batch is started whenever a worker is free, taking up to max_batch queued puzzles after waiting
+    max_wait seconds for more to arrive. While every worker is busy puzzles pile up in the queue, and a
+    request that would take it past max_queue puzzles is shed at once rather than left to time out.
+    With workers=0 batches run on a thread of the event loop instead, which is handy for tests."""
+
+    def __init__(self, engine: str = "dlx", workers: int = 1, max_batch: int = 32, max_wait: float = 0.002,
+                 max_queue: int = 4096, deadline: float = 10.0) -> None:
+        get_engine(engine)  # fail early on an unknown engine
+        self.engine = engine
+        self.workers = workers
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.max_queue = max_queue
+        self.deadline = deadline
+        self.stats = ServiceStats()
+        self.queue = asyncio.Queue()  # binds to the running loop on first use, so it can be made here
+        self.executor = None
+        self.server = None
+        self.port = None
+        self._batcher = None
+        self._connections = set()
+
+    @property
+    def queue_depth(self) -> int:
+        return self.queue.qsize()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        """Start the workers and listen on host:port, port 0 picking a free one which is then saved as self.port."""
+        if self.workers:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        self.slots = asyncio.Semaphore(max(1, self.workers))
+        self._batcher = asyncio.create_task(self._batch_loop())
+        self.server = await asyncio.start_server(self._handle, host, port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        if self.server is not None:
+            self.server.close()
+            for connection in list(self._connections):
+                connection.cancel()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            await self.server.wait_closed()
+        if self._batcher is not None:
+            self._batcher.cancel()
+        if self.executor is not None:
+            # Waiting for the batches still running blocks, so do it off the event loop
+            await asyncio.get_running_loop().run_in_executor(None, partial(self.executor.shutdown, cancel_futures=True))
+
+    async def __aenter__(self) -> "SolverService":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def solve(self, grids, deadline: float = None) -> list:
+        """Queue some puzzles and return their solutions, raising `Overloaded` if there is no room for them
+        all and `asyncio.TimeoutError` if they are not all solved within deadline seconds."""
+        loop = asyncio.get_running_loop()
+        expires = loop.time() + (deadline or self.deadline)
+        if self.queue.qsize() + len(grids) > self.max_queue:
+            self.stats.shed += 1
+            raise Overloaded(f"{self.queue.qsize()} puzzles already queued")
+
+        futures = []
+        for grid in grids:
+            future = loop.create_future()
+            self.queue.put_nowait((grid, future, expires))
+            futures.append(future)
+        self.stats.max_queue_depth = max(self.stats.max_queue_depth, self.queue.qsize())
+
+        try:
+            return await asyncio.wait_for(asyncio.gather(*futures), expires - loop.time())
+        except asyncio.TimeoutError:
+            self.stats.timeouts += 1
+            raise
+
+    async def _batch_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await self.slots.acquire()
+            batch = [await self.queue.get()]
+            if self.max_wait and self.queue.qsize() < self.max_batch - 1:
+                await asyncio.sleep(self.max_wait)
+            while len(batch) < self.max_batch and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+
+            # Drop puzzles whose request has already timed out or been cancelled
+            now = loop.time()
+            batch = [item for item in batch if not item[1].done() and item[2] > now]
+            if batch:
+                asyncio.create_task(self._run(batch))
+            else:
+                self.slots.release()
+
+    async def _run(self, batch) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            timeout = max(expires for _, _, expires in batch) - loop.time()
+            results = await loop.run_in_executor(self.executor, _solve_batch, self.engine, [grid for grid, _, _ in batch], timeout)
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            self.stats.batches += 1
+            self.stats.puzzles += len(batch)
+            for (_, future, _), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, TimedOut):
+                    future.set_exception(asyncio.TimeoutError())
+                else:
+                    future.set_result(result)
+        finally:
+            self.slots.release()
+
+    async def _handle(self, reader, writer) -> None:
+        """Serve one connection, answering each request as soon as it is done."""
+        self._connections.add(asyncio.current_task())
+        tasks = set()
+        try:
+            while line := await reader.readline():
+                task = asyncio.create_task(self._respond(line, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            await asyncio.gather(*tasks)
+        except (asyncio.CancelledError, ConnectionError):
+            pass  # the service is closing or the client went away
+        finally:
+            self._connections.discard(asyncio.current_task())
+            writer.close()
+
+    async def _respond(self, line: bytes, writer) -> None:
+        start = asyncio.get_running_loop().time()
+        response = {}
+        try:
+            request = json.loads(line)
+            response["id"] = request.get("id")
+            if request.get("op") == "stats":
+                response.update(status="ok", stats=self.stats.as_dict(), queue_depth=self.queue_depth)
+            else:
+                single = "puzzle" in request
+                grids = [_parse_grid(grid) for grid in ([request["puzzle"]] if single else request["puzzles"])]
+                solutions = await self.solve(grids, request.get("deadline"))
+                lines = [format_line(solution) for solution in solutions]
+                response.update({"status": "ok", "solution" if single else "solutions": lines[0] if single else lines})
+                self.stats.requests += 1
+                self.stats.latencies.append(asyncio.get_running_loop().time() - start)
+        except Overloaded as e:
+            response.update(status="overloaded", error=str(e))
+        except asyncio.TimeoutError:
+            response.update(status="timeout")
+        except Exception as e:
+            self.stats.errors += 1
+            response.update(status="error", error=f"{type(e).__name__}: {e}")
+        writer.write(json.dumps(response).encode() + b"\n")
+        await writer.drain()
+
+
+def _parse_grid(grid) -> np.ndarray:
+    """Read a grid sent as a line or as nested lists."""
+    if isinstance(grid, str):
+        return parse_line(grid, isqrt(len(grid)))
+    return np.array(grid, dtype=np.int8)
+
+
+class ServiceClient:
+    """A client for `SolverService` that can have any number of requests in flight on one connection."""
+
+    def __init__(self, reader, writer) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.pending = {}
+        self.next_id = 0
+        self._receiver = asyncio.create_task(self._receive())
+
+    @classmethod
+    async def connect(cls, host: str = "127.0.0.1", port: int = 8765) -> "ServiceClient":
+        return cls(*await asyncio.open_connection(host, port))
+
+    async def _receive(self) -> None:
+        try:
+            while line := await self.reader.readline():
+                response = json.loads(line)
+                future = self.pending.pop(response["id"], None)
+                if future is not None and not future.done():
+                    future.set_result(response)
+        finally:
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("connection closed"))
+
+    async def request(self, message: dict) -> dict:
+        """Send a request and return the response to it."""
+        self.next_id += 1
+        future = asyncio.get_running_loop().create_future()
+        self.pending[self.next_id] = future
+        self.writer.write(json.dumps(dict(message, id=self.next_id)).encode() + b"\n")
+        await self.writer.drain()
+        return await future
+
+    async def solve(self, puzzle, deadline: float = None) -> np.ndarray:
+        """Return the solution of a puzzle, raising as `SolverService.solve` does if it was not solved."""
+        response = await self.request({"puzzle": format_line(puzzle), "deadline": deadline})
+        return _parse_grid(_check(response)["solution"])
+
+    async def solve_many(self, puzzles, deadline: float = None) -> np.ndarray:
+        response = await self.request({"puzzles": [format_line(puzzle) for puzzle in puzzles], "deadline": deadline})
+        return np.array([_parse_grid(line) for line in _check(response)["solutions"]])
+
+    async def stats(self) -> dict:
+        return _check(await self.request({"op": "stats"}))["stats"]
+
+    async def close(self) -> None:
+        self.writer.close()
+        await self.writer.wait_closed()
+        self._receiver.cancel()
+
+
+def _check(response: dict) -> dict:
+    status = response["status"]
+    if status == "overloaded":
+        raise Overloaded(response.get("error"))
+    if status == "timeout":
+        raise asyncio.TimeoutError()
+    if status != "ok":
+        raise RuntimeError(response.get("error"))
+    return response
+
+
+async def load_test(puzzles, host: str = "127.0.0.1", port: int = 8765, requests: int = 1000, concurrency: int = 32,
+                    batch: int = 1, deadline: float = None) -> dict:
+    """Send requests of batch puzzles each, cycling through puzzles, with at most concurrency in flight,
+    and return the client-side latency percentiles, throughput and count of each status."""
+    client = await ServiceClient.connect(host, port)
+    limit = asyncio.Semaphore(concurrency)
+    latencies = []
+    statuses = {}
+
+    async def one(i: int) -> None:
+        grids = [format_line(puzzles[(i * batch + j) % len(puzzles)]) for j in range(batch)]
+        async with limit:
+            start = time.perf_counter()
+            response = await client.request({"puzzles": grids, "deadline": deadline})
+            if response["status"] == "ok":
+                latencies.append(time.perf_counter() - start)
+            statuses[response["status"]] = statuses.get(response["status"], 0) + 1
+
+    start_time = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - start_time
+    server_stats = await client.stats()
+    await client.close()
+
+    result = {"requests": requests, "statuses": statuses, "elapsed": elapsed, "puzzles_per_second": len(latencies) * batch / elapsed}
+    if latencies:
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        result.update(p50=float(p50), p95=float(p95), p99=float(p99))
+    result["server"] = server_stats
+    return result
+
+
+async def _serve(args) -> None:
+    service = SolverService(args.engine, args.workers, args.max_batch, args.max_wait, args.max_queue, args.deadline)
+    await service.start(args.host, args.port)
+    print(f"Serving {args.engine} with {args.workers} workers on {args.host}:{service.port}")
+    try:
+        await service.server.serve_forever()
+    finally:
+        await service.close()
+
+
+async def _load(args) -> dict:
+    puzzles = np.load(args.corpus)
+    if args.port:
+        return await load_test(puzzles, args.host, args.port, args.requests, args.concurrency, args.batch, args.deadline)
+    async with SolverService(args.engine, args.workers, args.max_batch, args.max_wait, args.max_queue) as service:
+        return await load_test(puzzles, args.host, service.port, args.requests, args.concurrency, args.batch, args.deadline)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["serve", "load"])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, help="port to serve on, or to load test (default: serve on 8765, load test a server of our own)")
+    parser.add_argument("--engine", default="dlx")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--max-batch", type=int, default=32)
+    parser.add_argument("--max-wait", type=float, default=0.002, help="seconds to wait for a batch to fill")
+    parser.add_argument("--max-queue", type=int, default=4096, help="queued puzzles beyond which requests are shed")
+    parser.add_argument("--deadline", type=float, default=10.0, help="seconds each request may take")
+    parser.add_argument("--corpus", default="data/hard_puzzle.npy", help="puzzles to load test with")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--batch", type=int, default=1, help="puzzles per load test request")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        args.port = args.port or 8765
+        asyncio.run(_serve(args))
+    else:
+        print(json.dumps(asyncio.run(_load(args)), indent=2))
+
+if __name__ == "__main__":
+    main()
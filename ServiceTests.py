@@ -0,0 +1,83 @@
+import asyncio
+import unittest
+
+import numpy as np
+
+from Service import *
+
+
+class TestService(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.puzzles = np.load("data/hard_puzzle.npy")
+        self.solutions = np.load("data/hard_solution.npy")
+        self.service = SolverService("dlx", workers=0, max_queue=8)
+        await self.service.start()
+        self.client = await ServiceClient.connect(port=self.service.port)
+
+    async def asyncTearDown(self) -> None:
+        await self.client.close()
+        await self.service.close()
+
+    async def test_single_and_batch(self) -> None:
+        solution, batch = await asyncio.gather(
+            self.client.solve(self.puzzles[0]),
+            self.client.solve_many(self.puzzles[1:5]),
+        )
+
+        np.testing.assert_array_equal(solution, self.solutions[0])
+        np.testing.assert_array_equal(batch, self.solutions[1:5])
+
+    async def test_no_solution(self) -> None:
+        puzzle = self.puzzles[0].copy()
+        puzzle[0, :2] = 9
+
+        self.assertTrue((await self.client.solve(puzzle) == -1).all())
+
+    async def test_queue_depth_before_start(self) -> None:
+        self.assertEqual(SolverService("dlx", workers=0).queue_depth, 0)
+
+    async def test_close_keeps_the_loop_running(self) -> None:
+        service = SolverService("dfs_mrv", workers=1)
+        await service.start()
+        # A puzzle that takes seconds, cut short by its deadline
+        solving = asyncio.ensure_future(service.solve(np.load("data/large_36_puzzle.npy")[:1], deadline=0.5))
+        while service.queue_depth:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.1)  # the batch is now running in the worker
+
+        ticks = 0
+        async def tick() -> None:
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+        ticker = asyncio.ensure_future(tick())
+        await service.close()
+        ticker.cancel()
+        solving.cancel()
+
+        self.assertGreater(ticks, 0)
+
+    async def test_full_queue_sheds(self) -> None:
+        with self.assertRaises(Overloaded):
+            await self.client.solve_many(self.puzzles[:9])
+        self.assertEqual((await self.client.stats())["shed"], 1)
+
+    async def test_deadline(self) -> None:
+        with self.assertRaises(asyncio.TimeoutError):
+            await self.client.solve(self.puzzles[0], deadline=1e-9)
+        self.assertEqual((await self.client.stats())["timeouts"], 1)
+
+    async def test_bad_request(self) -> None:
+        response = await self.client.request({"puzzle": "123"})
+
+        self.assertEqual(response["status"], "error")
+
+    async def test_load_test(self) -> None:
+        result = await load_test(self.puzzles, port=self.service.port, requests=20, concurrency=4)
+
+        self.assertEqual(result["statuses"], {"ok": 20})
+        self.assertEqual(result["server"]["puzzles"], 20)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,247 @@
+"""Cache solutions under a canonical form shared by every puzzle equivalent up to Sudoku symmetry.
+
+Two puzzles are equivalent if one can be turned into the other by relabelling the digits, permuting
+the bands (and the stacks), permuting the rows within a band (and the columns within a stack) and,
+for square boxes, transposing. `canonical_form` picks one representative of each class, so a
+solution found for any member of the class is cached once and mapped back through the inverse of
+the transform for every other member."""
+import sqlite3
+from collections import OrderedDict
+from itertools import chain, groupby, islice, permutations, product
+from time import perf_counter
+
+import numpy as np
+
+from Engines import get_engine
+
+# Most (row order, column order) pairs to compare per orientation, for puzzles whose lines cannot
+# be told apart by their signatures. Past this two equivalent puzzles may get different keys, which
+# costs a cache miss but never a wrong answer
+MAX_ORDERINGS = 64
+
+def _line_signatures(grid) -> tuple:
+    """Return digit-blind signatures of the rows and of the columns of a grid.
+
+    Each line starts with its clue count, then for each clue the signature of the line crossing it
+    and how often the clue's digit appears in the grid are folded in, for a couple of rounds, so
+    that lines with equal counts can still be told apart."""
+    filled = grid > 0
+    rows = filled.sum(axis=1).tolist()
+    cols = filled.sum(axis=0).tolist()
+    frequency = np.bincount(grid[filled], minlength=len(grid) + 1)
+    cells = [(r, c, int(frequency[grid[r, c]])) for r, c in zip(*np.nonzero(filled))]
+    for _ in range(2):
+        row_sigs = [[(count,)] for count in rows]
+        col_sigs = [[(count,)] for count in cols]
+        for r, c, times in cells:
+            row_sigs[r].append((cols[c], times))
+            col_sigs[c].append((rows[r], times))
+        # Replace each signature with its rank so the next round compares small integers
+        rows = _ranks([tuple(sorted(s)) for s in row_sigs])
+        cols = _ranks([tuple(sorted(s)) for s in col_sigs])
+    return rows, cols
+
+def _ranks(values) -> list:
+    order = {value: rank for rank, value in enumerate(sorted(set(values)))}
+    return [order[value] for value in values]
+
+def _tie_orders(items, key) -> list:
+    """Return the orderings of items by key, trying every order of each run of items with the same key."""
+    runs = [list(run) for _, run in groupby(sorted(items, key=key), key=key)]
+    return [list(chain.from_iterable(choice)) for choice in islice(product(*map(permutations, runs)), MAX_ORDERINGS)]
+
+def _line_orders(signatures, per_band: int) -> list:
+    """Return candidate orders of the lines, sorting bands of per_band lines and the lines within each band by signature."""
+    bands = [tuple(range(start, start + per_band)) for start in range(0, len(signatures), per_band)]
+    band_orders = _tie_orders(bands, key=lambda band: sorted(signatures[i] for i in band))
+    within = [_tie_orders(band, key=signatures.__getitem__) for band in bands]
+    return [
+        [line for band in band_order for line in lines[band[0] // per_band]]
+        for band_order, lines in islice(product(band_orders, product(*within)), MAX_ORDERINGS)
+    ]
+
+def _relabel(grid) -> np.ndarray:
+    """Return the digit map that numbers digits in order of first appearance, left to right and top to bottom.
+
+    Index d of the result is what digit d becomes, with 0 and the digits that do not appear kept in order at the end."""
+    N = len(grid)
+    flat = grid.ravel()
+    seen, first = np.unique(flat[flat > 0], return_index=True)
+    order = seen[np.argsort(first)].tolist()
+    order += sorted(set(range(1, N + 1)).difference(order))
+    to_canonical = np.zeros(N + 1, dtype=np.int16)
+    to_canonical[order] = np.arange(1, N + 1)
+    return to_canonical
+
+def canonical_form(grid, size=(3, 3)) -> tuple:
+    """Return (key, transform) for a puzzle.
+
+    The key is the same bytes for every puzzle equivalent to this one, as long as their lines can be told
+    apart within MAX_ORDERINGS tries. The transform takes the puzzle to its canonical grid and back, see
+    `to_canonical` and `from_canonical`. Raises ValueError for a cell that is not empty or a digit of the grid."""
+    grid = np.asarray(grid)
+    num_rows, num_cols = size
+    N = num_rows * num_cols
+    if grid.shape != (N, N):
+        raise ValueError(f"Expected a {N}x{N} grid, got shape {grid.shape}")
+    bad = np.argwhere((grid < 0) | (grid > N))
+    if len(bad):
+        row, col = bad[0].tolist()
+        raise ValueError(f"Cell ({row}, {col}) holds {grid[row, col]}, which does not fit a {N}x{N} grid")
+    orientations = [False, True] if num_rows == num_cols else [False]
+
+    best = None
+    for transposed in orientations:
+        oriented = grid.T if transposed else grid
+        row_sigs, col_sigs = _line_signatures(oriented)
+        row_orders = _line_orders(row_sigs, num_rows)
+        col_orders = _line_orders(col_sigs, num_cols)
+        for rows, cols in islice(product(row_orders, col_orders), MAX_ORDERINGS):
+            permuted = oriented[np.ix_(rows, cols)]
+            digits = _relabel(permuted)
+            key = digits[permuted].astype(np.int8).tobytes()
+            if best is None or key < best[0]:
+                best = (key, (transposed, rows, cols, digits))
+    key, transform = best
+    return bytes([num_rows, num_cols]) + key, transform
+
+def to_canonical(grid, transform) -> np.ndarray:
+    """Apply a transform from `canonical_form` to a grid of the puzzle it came from."""
+    transposed, rows, cols, digits = transform
+    grid = np.asarray(grid)
+    oriented = grid.T if transposed else grid
+    return digits[oriented[np.ix_(rows, cols)]]
+
+def from_canonical(grid, transform) -> np.ndarray:
+    """Undo a transform from `canonical_form`, mapping a canonical grid (e.g. its solution) back to the original puzzle."""
+    transposed, rows, cols, digits = transform
+    grid = np.asarray(grid)
+    if grid.min() < 0:
+        return np.full(grid.shape, -1)
+    from_digits = np.empty_like(digits)
+    from_digits[digits] = np.arange(len(digits))
+    oriented = np.empty_like(grid)
+    oriented[np.ix_(rows, cols)] = from_digits[grid]
+    return oriented.T if transposed else oriented
+
+
+class CacheStats:
+    """Counters for a `SolutionCache`, in the style of `SearchStats`."""
+
+    __slots__ = ("lookups", "hits", "disk_hits", "misses", "evictions", "lookup_time")
+
+    def __init__(self) -> None:
+        self.lookups = 0        # calls to get
+        self.hits = 0           # lookups answered from memory
+        self.disk_hits = 0      # lookups answered from the on-disk tier
+        self.misses = 0         # lookups neither tier could answer
+        self.evictions = 0      # entries dropped from memory to stay within capacity
+        self.lookup_time = 0.0  # seconds spent in get, canonicalising included
+
+    @property
+    def hit_rate(self) -> float:
+        return (self.hits + self.disk_hits) / self.lookups if self.lookups else 0.0
+
+    @property
+    def mean_lookup_time(self) -> float:
+        return self.lookup_time / self.lookups if self.lookups else 0.0
+
+    def as_dict(self) -> dict:
+        result = {name: getattr(self, name) for name in self.__slots__}
+        result.update(hit_rate=self.hit_rate, mean_lookup_time=self.mean_lookup_time)
+        return result
+
+    def __repr__(self) -> str:
+        return f"CacheStats({', '.join(f'{k}={v!r}' for k, v in self.as_dict().items())})"
+
+
+class SolutionCache:
+    """An engine with a cache of solutions in front of it.
+
+    Solutions are kept under their canonical key in an in-memory LRU of at most capacity entries and,
+    if a path is given, in an SQLite file that survives restarts and is shared by every cache opened
+    on it. Puzzles without a solution are cached too, as grids of -1s."""
+
+    def __init__(self, engine: str = "dlx", size=(3, 3), capacity: int = 4096, path: str = None) -> None:
+        self.solve_uncached = get_engine(engine)
+        self.size = tuple(size)
+        self.capacity = capacity
+        self.memory = OrderedDict()
+        self.stats = CacheStats()
+        self.db = None
+        if path is not None:
+            self.db = sqlite3.connect(path)
+            self.db.execute("CREATE TABLE IF NOT EXISTS solutions (key BLOB PRIMARY KEY, solution BLOB NOT NULL)")
+
+    def _lookup(self, key: bytes):
+        """Return the canonical solution stored under key, or None."""
+        solution = self.memory.get(key)
+        if solution is not None:
+            self.memory.move_to_end(key)
+            self.stats.hits += 1
+            return solution
+        if self.db is not None:
+            row = self.db.execute("SELECT solution FROM solutions WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                N = self.size[0] * self.size[1]
+                solution = np.frombuffer(row[0], dtype=np.int8).reshape(N, N)
+                self._remember(key, solution)
+                self.stats.disk_hits += 1
+                return solution
+        self.stats.misses += 1
+        return None
+
+    def _remember(self, key: bytes, solution) -> None:
+        self.memory[key] = solution
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.capacity:
+            self.memory.popitem(last=False)
+            self.stats.evictions += 1
+
+    def _get(self, grid) -> tuple:
+        start = perf_counter()
+        key, transform = canonical_form(grid, self.size)
+        solution = self._lookup(key)
+        if solution is not None:
+            solution = from_canonical(solution, transform)
+        self.stats.lookups += 1
+        self.stats.lookup_time += perf_counter() - start
+        return solution, key, transform
+
+    def get(self, grid):
+        """Return the cached solution of a puzzle mapped back onto it, or None if it has not been solved yet."""
+        return self._get(grid)[0]
+
+    def put(self, grid, solution) -> None:
+        """Store the solution of a puzzle."""
+        self._store(*canonical_form(grid, self.size), solution)
+
+    def _store(self, key: bytes, transform, solution) -> None:
+        solution = np.asarray(solution)
+        canonical = np.full(solution.shape, -1, dtype=np.int8) if solution.min() < 0 else to_canonical(solution, transform).astype(np.int8)
+        self._remember(key, canonical)
+        if self.db is not None:
+            with self.db:
+                self.db.execute("INSERT OR REPLACE INTO solutions VALUES (?, ?)", (key, canonical.tobytes()))
+
+    def solve(self, grid, stats=None) -> np.ndarray:
+        """Return the solution of a puzzle, solving it with the engine only if no equivalent puzzle has been solved before.
+
+        Takes the same arguments as an engine, apart from the size set on the cache. stats is only
+        filled in when the engine runs."""
+        solution, key, transform = self._get(grid)
+        if solution is None:
+            solution = self.solve_uncached(grid, self.size, stats)
+            self._store(key, transform, solution)
+        return solution
+
+    def close(self) -> None:
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+    def __enter__(self) -> "SolutionCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
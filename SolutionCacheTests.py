@@ -0,0 +1,102 @@
+import os
+import random
+import tempfile
+import unittest
+
+import numpy as np
+
+from Engines import solve_dlx
+from SolutionCache import *
+
+
+def shuffle(grid, rng, size=(3, 3)):
+    """Return a random puzzle equivalent to grid."""
+    num_rows, num_cols = size
+    N = len(grid)
+    rows = [band * num_rows + r for band in rng.sample(range(N // num_rows), N // num_rows) for r in rng.sample(range(num_rows), num_rows)]
+    cols = [stack * num_cols + c for stack in rng.sample(range(N // num_cols), N // num_cols) for c in rng.sample(range(num_cols), num_cols)]
+    shuffled = grid[np.ix_(rows, cols)]
+    if num_rows == num_cols and rng.random() < 0.5:
+        shuffled = shuffled.T
+    digits = np.array([0] + rng.sample(range(1, N + 1), N))
+    return digits[shuffled]
+
+
+class TestCanonicalForm(unittest.TestCase):
+    def test_equivalent_puzzles_share_a_key(self) -> None:
+        rng = random.Random(1)
+        for difficulty in ("easy", "hard"):
+            for puzzle in np.load(f"data/{difficulty}_puzzle.npy"):
+                key, _ = canonical_form(puzzle)
+                self.assertEqual(canonical_form(shuffle(puzzle, rng))[0], key)
+
+    def test_transform_round_trip(self) -> None:
+        solution = np.load("data/large_16_solution.npy")[0]
+        _, transform = canonical_form(np.load("data/large_16_puzzle.npy")[0], (4, 4))
+
+        np.testing.assert_array_equal(from_canonical(to_canonical(solution, transform), transform), solution)
+
+    def test_different_puzzles_differ(self) -> None:
+        puzzles = np.load("data/hard_puzzle.npy")
+
+        self.assertEqual(len({canonical_form(puzzle)[0] for puzzle in puzzles}), len(puzzles))
+
+    def test_out_of_range_given(self) -> None:
+        for value in (10, -1):
+            puzzle = np.load("data/hard_puzzle.npy")[2]
+            puzzle[4, 7] = value
+            with self.subTest(value=value), self.assertRaisesRegex(ValueError, r"Cell \(4, 7\)"):
+                SolutionCache("dlx").solve(puzzle)
+
+
+class TestSolutionCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.puzzles = np.load("data/hard_puzzle.npy")
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_hit_maps_back_to_the_puzzle(self) -> None:
+        cache = SolutionCache("dlx")
+        rng = random.Random(2)
+        for puzzle in self.puzzles:
+            cache.solve(puzzle)
+        for puzzle in self.puzzles:
+            variant = shuffle(puzzle, rng)
+            np.testing.assert_array_equal(cache.solve(variant), solve_dlx(variant))
+
+        self.assertEqual((cache.stats.hits, cache.stats.misses), (len(self.puzzles), len(self.puzzles)))
+        self.assertEqual(cache.stats.hit_rate, 0.5)
+
+    def test_lru_eviction(self) -> None:
+        cache = SolutionCache("dlx", capacity=2)
+        for puzzle in self.puzzles[:3]:
+            cache.solve(puzzle)
+
+        self.assertEqual(cache.stats.evictions, 1)
+        self.assertIsNone(cache.get(self.puzzles[0]))
+        self.assertIsNotNone(cache.get(self.puzzles[2]))
+
+    def test_disk_tier_survives_a_new_cache(self) -> None:
+        path = os.path.join(self.tmp.name, "solutions.sqlite")
+        with SolutionCache("dlx", path=path) as cache:
+            for puzzle in self.puzzles[:4]:
+                cache.solve(puzzle)
+
+        with SolutionCache("dlx", path=path) as cache:
+            np.testing.assert_array_equal(cache.get(self.puzzles[3]), solve_dlx(self.puzzles[3]))
+            self.assertEqual(cache.stats.disk_hits, 1)
+            cache.get(self.puzzles[3])
+            self.assertEqual(cache.stats.hits, 1)
+
+    def test_unsolvable_puzzles_are_cached(self) -> None:
+        cache = SolutionCache("dlx")
+        puzzle = self.puzzles[0].copy()
+        puzzle[0, :2] = 9
+
+        self.assertTrue((cache.solve(puzzle) == -1).all())
+        self.assertTrue((cache.get(puzzle) == -1).all())
+
+if __name__ == "__main__":
+    unittest.main()
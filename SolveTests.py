@@ -0,0 +1,66 @@
+import contextlib
+import io
+import subprocess
+import sys
+import unittest
+
+import numpy as np
+
+from CorpusIO import format_line
+from solve import main
+
+PUZZLE = "530070000600195000098000060800060003400803001700020006060000280000419005000080079"
+SOLUTION = "534678912672195348198342567859761423426853791713924856961537284287419635345286179"
+
+
+def run(argv, stdin: bytes = b"") -> list:
+    """Run the CLI on stdin and return its output lines."""
+    stdout = io.StringIO()
+    main(argv, io.BytesIO(stdin), stdout)
+    return stdout.getvalue().splitlines()
+
+
+class TestSolveCLI(unittest.TestCase):
+    def test_lines_from_stdin(self) -> None:
+        self.assertEqual(run([], f"# a comment\n{PUZZLE}\n\n{PUZZLE}\n".encode()), [SOLUTION, SOLUTION])
+
+    def test_npy_file_and_stdin(self) -> None:
+        puzzles = np.load("data/hard_puzzle.npy")
+        expected = [format_line(solution) for solution in np.load("data/hard_solution.npy").astype(int)]
+        with open("data/hard_puzzle.npy", "rb") as f:
+            from_stdin = run(["--engine", "algox"], f.read())
+
+        self.assertEqual(run(["data/hard_puzzle.npy"]), expected)
+        self.assertEqual(from_stdin, expected)
+        self.assertEqual(len(run(["data/hard_puzzle.npy", "--workers", "2", "--batch", "4"])), len(puzzles))
+
+    def test_count_and_unique(self) -> None:
+        empty = b"0" * 16 + b"\n"
+
+        self.assertEqual(run(["--count", "1000"], empty), ["288"])
+        self.assertEqual(run(["--unique"], empty + PUZZLE.encode()), ["multiple", "unique"])
+
+    def test_count_stats_and_engine(self) -> None:
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            run(["--unique", "--stats"], PUZZLE.encode())
+        self.assertRegex(stderr.getvalue(), r"# puzzle 1: solutions=1 time=\S+\n")
+
+        with self.assertRaises(SystemExit), contextlib.redirect_stderr(io.StringIO()):
+            run(["--count", "10", "--engine", "algox"], PUZZLE.encode())
+
+    def test_unsolved_cell_with_dfs(self) -> None:
+        self.assertEqual(run(["--engine", "dfs"], ("-" + PUZZLE[1:]).encode()), ["-" * 81])
+
+    def test_bad_line(self) -> None:
+        with self.assertRaises(SystemExit), contextlib.redirect_stderr(io.StringIO()):
+            run([], b"12\n")
+
+    def test_lines_do_not_import_numpy(self) -> None:
+        code = "import io, sys, solve; solve.main([], io.BytesIO(sys.argv[1].encode()), io.StringIO()); print('numpy' in sys.modules)"
+        result = subprocess.run([sys.executable, "-c", code, PUZZLE], capture_output=True, text=True, check=True)
+
+        self.assertEqual(result.stdout.strip(), "False")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+# The uni_script modules import each other as top-level scripts
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "uni_script"))
+from SudokuSession import SudokuSession
+
+
+class TestSudokuSession(unittest.TestCase):
+    def setUp(self) -> None:
+        solutions = np.load("data/hard_solution.npy").astype(int)
+        solvable = int(np.flatnonzero((solutions > 0).all(axis=(1, 2)))[0])
+        self.puzzle = np.load("data/hard_puzzle.npy")[solvable]
+        self.solution = solutions[solvable]
+        self.session = SudokuSession(self.puzzle)
+        self.empty = [divmod(cell, 9) for cell in np.flatnonzero(self.puzzle == 0)]
+
+    def test_conflicts_and_candidates_follow_moves(self) -> None:
+        row, col = self.empty[0]
+        clash = int(self.puzzle[row][np.flatnonzero(self.puzzle[row])[0]])
+        self.session.place(row, col, clash)
+
+        self.assertIn((row, col), self.session.get_conflicts())
+        self.assertFalse(self.session.is_solvable())
+        self.session.erase(row, col)
+        self.assertEqual(self.session.get_conflicts(), [])
+        self.assertNotIn(clash, self.session.get_possible_values(row, col))
+        self.assertIn(self.solution[row, col], self.session.get_possible_values(row, col))
+
+    def test_hints_solve_the_puzzle_with_one_search(self) -> None:
+        while (hint := self.session.hint()) is not None:
+            self.session.place(*hint)
+
+        self.assertTrue(self.session.is_complete())
+        np.testing.assert_array_equal(self.session.get_board(), self.solution)
+        self.assertEqual(self.session.searches, 1)
+
+    def test_leaving_the_solution_searches_again(self) -> None:
+        self.assertTrue(self.session.is_solvable())
+        row, col = next((r, c) for r, c in self.empty if len(self.session.get_possible_values(r, c)) > 1)
+        wrong = next(v for v in self.session.get_possible_values(row, col) if v != self.solution[row, col])
+        self.session.place(row, col, wrong)
+
+        self.assertFalse(self.session.is_solvable())
+        self.assertFalse(self.session.is_solvable())
+        self.assertEqual(self.session.searches, 2)  # the answer for the wrong grid is cached
+        self.session.undo()
+        self.assertTrue(self.session.is_solvable())
+        self.assertEqual(self.session.searches, 2)
+
+    def test_undo_and_redo(self) -> None:
+        (r1, c1), (r2, c2) = self.empty[:2]
+        self.session.place(r1, c1, 1)
+        self.session.place(r2, c2, 2)
+        self.session.erase(r1, c1)
+
+        self.assertTrue(self.session.undo())
+        self.assertEqual(self.session.get_board()[r1, c1], 1)
+        self.assertTrue(self.session.undo())
+        self.assertTrue(self.session.undo())
+        self.assertFalse(self.session.undo())
+        np.testing.assert_array_equal(self.session.get_board(), self.puzzle)
+        self.assertTrue(self.session.redo())
+        self.assertEqual(self.session.get_board()[r1, c1], 1)
+
+    def test_givens_are_fixed(self) -> None:
+        row, col = divmod(int(np.flatnonzero(self.puzzle)[0]), 9)
+        with self.assertRaises(ValueError):
+            self.session.erase(row, col)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import copy
+import unittest
+
+import numpy as np
+
+from DoublyLinkedList import ToroidalMatrix
+
+
+def columns(matrix: ToroidalMatrix) -> list:
+    """Return (col_Id, node_count, row_Ids) for every column still linked into matrix, checking the links both ways."""
+    result = []
+    column = matrix.header.right
+    while column is not matrix.header:
+        row_ids = []
+        node = column.down
+        while node is not column:
+            assert node.down.up is node and node.right.left is node
+            row_ids.append(node.row_Id)
+            node = node.down
+        result.append((column.col_Id, column.node_count, row_ids))
+        column = column.right
+    return result
+
+
+class TestSparseFill(unittest.TestCase):
+    def setUp(self) -> None:
+        self.rows = [[0, 3, 6], [0, 3], [3, 4, 6], [2, 4, 5], [1, 2, 5, 6], [1, 6], [0, 3]]
+        self.expected = [(j, sum(j in row for row in self.rows), [i for i, row in enumerate(self.rows) if j in row]) for j in range(7)]
+
+    def test_constructors_agree(self) -> None:
+        row_ids = np.array([i for i, row in enumerate(self.rows) for _ in row])
+        col_ids = np.array([j for row in self.rows for j in row])
+        indptr = np.cumsum([0] + [len(row) for row in self.rows])
+
+        by_rows, by_coo, by_csr = ToroidalMatrix(), ToroidalMatrix(), ToroidalMatrix()
+        by_rows.fill_rows(self.rows, 7)
+        by_coo.fill_coo(row_ids[::-1], col_ids[::-1], (7, 7))
+        by_csr.fill_csr(indptr, col_ids, 7)
+
+        for matrix in (by_rows, by_coo, by_csr):
+            self.assertEqual(columns(matrix), self.expected)
+
+    def test_dense_fill_leaves_its_input(self) -> None:
+        dense = [[j in row for j in range(7)] for row in self.rows]
+        before = copy.deepcopy(dense)
+        matrix = ToroidalMatrix()
+        matrix.fill(dense)
+
+        self.assertEqual(dense, before)
+        self.assertEqual(columns(matrix), [(j, count, [i + 1 for i in ids]) for j, count, ids in self.expected])
+        self.assertIs(matrix.matrix[1][3].right, matrix.matrix[1][6])
+
+    def test_uncover_restores_cover(self) -> None:
+        matrix = ToroidalMatrix()
+        matrix.fill_rows(self.rows, 7)
+        matrix.cover(matrix.columns[3])
+
+        # Rows 0, 1, 2 and 6 go with column 3, which leaves column 4 with row 3 alone
+        self.assertEqual(columns(matrix)[3], (4, 1, [3]))
+        matrix.uncover(matrix.columns[3])
+        self.assertEqual(columns(matrix), self.expected)
+
+if __name__ == "__main__":
+    unittest.main()
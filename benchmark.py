@@ -0,0 +1,268 @@
+"""Benchmark every solver engine over the data/ corpora.
+
+    python benchmark.py --output results.json
+    python benchmark.py --baseline results.json --threshold 0.2
+
+Reports p50/p95/p99/max wall time, throughput and peak memory per engine and difficulty,
+and exits with status 1 if any statistic is worse than the saved baseline by more than the threshold.
+An engine is stopped after --timeout seconds on a puzzle, which then counts as a timeout."""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+import AlgoX
+from Engines import ENGINES, box_size, get_engine
+from SearchBudget import SearchBudget, TimedOut
+from SearchStats import SearchStats
+
+DIFFICULTIES = ['very_easy', 'easy', 'medium', 'hard']
+
+# 16x16, 25x25 and 36x36 corpora of unique puzzles made with Generator.py, only run when asked for.
+# Some engines take minutes on a 36x36 puzzle, so give them a --timeout
+LARGE = ['large_16', 'large_25', 'large_36']
+
+# Propagation rule sets compared by --rules, from none to all of AlgoX.RULES
+RULE_SETS = [
+    (),
+    ("singles",),
+    ("singles", "box_line"),
+    ("singles", "naked_pairs"),
+    ("singles", "naked_pairs", "naked_triples"),
+    ("singles", "naked_pairs", "naked_triples", "box_line"),
+]
+
+# The statistics compared against a baseline, and whether bigger is better for each
+COMPARED = {"p50": False, "p95": False, "throughput": True}
+
+# Seconds an engine may spend on one puzzle before it is stopped and the puzzle counted as timed out
+DEFAULT_TIMEOUT = 60.0
+
+def time_per_call(func, repeats: int) -> float:
+    """Return the mean wall time in seconds of calling func() repeats times."""
+    start_time = time.perf_counter()
+    for _ in range(repeats):
+        func()
+    return (time.perf_counter() - start_time) / repeats
+
+def bench_setup(size=(3, 3), repeats: int = 200) -> dict:
+    """Compare the per-puzzle exact-cover setup cost of rebuilding the tables against copying the cached template."""
+    AlgoX.get_template(size)  # warm the cache so only the copy is timed
+    rebuild = time_per_call(lambda: AlgoX.build_template(size), repeats)
+    copy = time_per_call(lambda: AlgoX.working_copy(size), repeats)
+    return {"size": size, "rebuild": rebuild, "template_copy": copy, "speedup": rebuild / copy}
+
+def bench_rules(difficulty: str = "hard", data_dir: str = "data") -> list:
+    """Solve a corpus with AlgoX under each rule set and return the search nodes, inferences and time each one took."""
+    puzzles, _ = load_corpus(difficulty, data_dir)
+    size = box_size(puzzles.shape[1])
+    results = []
+    for rules in RULE_SETS:
+        stats = SearchStats()
+        start_time = time.perf_counter()
+        for puzzle in puzzles:
+            for _ in AlgoX.solve_sudoku(size, puzzle.copy(), stats, rules):
+                break
+        elapsed = time.perf_counter() - start_time
+        results.append({
+            "rules": list(rules),
+            "nodes": stats.nodes,
+            "backtracks": stats.backtracks,
+            "propagations": stats.propagations,
+            "time": elapsed,
+            "time_per_node": elapsed / stats.nodes,
+        })
+    return results
+
+def bench_choices(difficulty: str = "hard", data_dir: str = "data") -> list:
+    """Solve a corpus with AlgoX under each way of choosing the branching column and return the search nodes and time each one took."""
+    puzzles, _ = load_corpus(difficulty, data_dir)
+    size = box_size(puzzles.shape[1])
+    results = []
+    for choose in AlgoX.CHOICES:
+        stats = SearchStats()
+        start_time = time.perf_counter()
+        for puzzle in puzzles:
+            for _ in AlgoX.solve_sudoku(size, puzzle.copy(), stats, choose=choose):
+                break
+        elapsed = time.perf_counter() - start_time
+        results.append({
+            "choose": choose,
+            "nodes": stats.nodes,
+            "backtracks": stats.backtracks,
+            "time": elapsed,
+            "time_per_node": elapsed / stats.nodes,
+        })
+    return results
+
+def load_corpus(difficulty: str, data_dir: str = "data") -> tuple:
+    """Return the (puzzles, solutions) stacks of one difficulty or large corpus."""
+    return np.load(f"{data_dir}/{difficulty}_puzzle.npy"), np.load(f"{data_dir}/{difficulty}_solution.npy")
+
+def bench_engine(engine: str, puzzles, solutions, repeat: int = 1, memory: bool = True, timeout: float = DEFAULT_TIMEOUT) -> dict:
+    """Time one engine over a corpus and return its latency, throughput, memory and correctness statistics.
+
+    The box size is worked out from the grid size. Every corpus has unique solutions, so a result is
+    only correct if it is the stored solution. A solve that takes longer than timeout seconds is
+    stopped, counted in timeouts rather than correct, and its latency is the time it was given."""
+    solve = get_engine(engine)
+    size = box_size(puzzles.shape[1])
+    latencies = []
+    correct = 0
+    timeouts = 0
+
+    for _ in range(repeat):
+        for puzzle, solution in zip(puzzles, solutions):
+            start_time = time.perf_counter()
+            result = solve(puzzle.copy(), size, None, SearchBudget(timeout))
+            latencies.append(time.perf_counter() - start_time)
+            if isinstance(result, TimedOut):
+                timeouts += 1
+            else:
+                correct += np.array_equal(result, solution)
+
+    # Memory is measured in a separate pass as tracing slows every allocation down
+    peak_memory = None
+    if memory:
+        peak_memory = 0
+        tracemalloc.start()
+        try:
+            for puzzle in puzzles:
+                tracemalloc.reset_peak()
+                solve(puzzle.copy(), size, None, SearchBudget(timeout))
+                peak_memory = max(peak_memory, tracemalloc.get_traced_memory()[1])
+        finally:
+            tracemalloc.stop()
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {
+        "puzzles": len(latencies),
+        "correct": correct,
+        "timeouts": timeouts,
+        "p50": float(p50),
+        "p95": float(p95),
+        "p99": float(p99),
+        "max": max(latencies),
+        "mean": sum(latencies) / len(latencies),
+        "throughput": len(latencies) / sum(latencies),
+        "peak_memory": peak_memory,
+    }
+
+def run(engines=None, difficulties=None, repeat: int = 1, memory: bool = True, data_dir: str = "data", timeout: float = DEFAULT_TIMEOUT) -> dict:
+    """Benchmark every engine over every difficulty and return the machine-readable report."""
+    engines = engines or list(ENGINES)
+    difficulties = difficulties or DIFFICULTIES
+    results = {engine: {} for engine in engines}
+
+    for difficulty in difficulties:
+        puzzles, solutions = load_corpus(difficulty, data_dir)
+        for engine in engines:
+            results[engine][difficulty] = bench_engine(engine, puzzles, solutions, repeat, memory, timeout)
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "repeat": repeat,
+            "timeout": timeout,
+        },
+        "results": results,
+    }
+
+def compare(report: dict, baseline: dict, threshold: float) -> list:
+    """Return a description of every statistic that is worse than the baseline by more than threshold (a fraction)."""
+    regressions = []
+    for engine, by_difficulty in report["results"].items():
+        for difficulty, stats in by_difficulty.items():
+            old = baseline.get("results", {}).get(engine, {}).get(difficulty)
+            if old is None:
+                continue
+            for name, bigger_is_better in COMPARED.items():
+                if not old.get(name):
+                    continue
+                change = stats[name] / old[name] - 1
+                if bigger_is_better:
+                    change = old[name] / stats[name] - 1
+                if change > threshold:
+                    regressions.append(f"{engine} {difficulty} {name}: {old[name]:.6g} -> {stats[name]:.6g} ({change:+.0%} worse)")
+            if stats["correct"] < old.get("correct", 0):
+                regressions.append(f"{engine} {difficulty} correct: {old['correct']} -> {stats['correct']}")
+            if stats["timeouts"] > old.get("timeouts", 0):
+                regressions.append(f"{engine} {difficulty} timeouts: {old.get('timeouts', 0)} -> {stats['timeouts']}")
+    return regressions
+
+def print_report(report: dict) -> None:
+    print(f"{'engine':<8}{'difficulty':<12}{'correct':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'puzzles/s':>11}{'peak KiB':>10}{'timeouts':>10}")
+    for engine, by_difficulty in report["results"].items():
+        for difficulty, stats in by_difficulty.items():
+            memory = "-" if stats["peak_memory"] is None else f"{stats['peak_memory'] / 1024:.0f}"
+            print(
+                f"{engine:<8}{difficulty:<12}{stats['correct']:>4}/{stats['puzzles']:<4}"
+                f"{stats['p50'] * 1e3:>10.3f}{stats['p95'] * 1e3:>10.3f}{stats['p99'] * 1e3:>10.3f}{stats['max'] * 1e3:>10.3f}"
+                f"{stats['throughput']:>11.1f}{memory:>10}{stats['timeouts']:>10}"
+            )
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--engines", nargs="+", choices=sorted(ENGINES), help="engines to run (default: all)")
+    parser.add_argument("--difficulties", nargs="+", choices=DIFFICULTIES + LARGE, help="corpora to run (default: all 9x9 ones)")
+    parser.add_argument("--repeat", type=int, default=1, help="times to solve each corpus")
+    parser.add_argument("--no-memory", action="store_true", help="skip the peak memory pass")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help=f"seconds an engine may take on one puzzle (default: {DEFAULT_TIMEOUT:g})")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--baseline", help="JSON report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed fractional regression (default: 0.2)")
+    parser.add_argument("--setup", action="store_true", help="also time the AlgoX exact-cover setup")
+    parser.add_argument("--rules", metavar="DIFFICULTY", help="only compare AlgoX propagation rule sets on this corpus")
+    parser.add_argument("--choices", metavar="DIFFICULTY", help="only compare the ways AlgoX can choose a column on this corpus")
+    args = parser.parse_args(argv)
+
+    if args.rules:
+        print(f"{'rules':<50}{'nodes':>8}{'dead ends':>11}{'inferences':>12}{'ms':>9}{'us/node':>9}")
+        for result in bench_rules(args.rules, args.data_dir):
+            print(
+                f"{'+'.join(result['rules']) or 'none':<50}{result['nodes']:>8}{result['backtracks']:>11}"
+                f"{result['propagations']:>12}{result['time'] * 1e3:>9.1f}{result['time_per_node'] * 1e6:>9.1f}"
+            )
+        return 0
+
+    if args.choices:
+        print(f"{'choose':<10}{'nodes':>8}{'dead ends':>11}{'ms':>9}{'us/node':>9}")
+        for result in bench_choices(args.choices, args.data_dir):
+            print(
+                f"{result['choose']:<10}{result['nodes']:>8}{result['backtracks']:>11}"
+                f"{result['time'] * 1e3:>9.1f}{result['time_per_node'] * 1e6:>9.1f}"
+            )
+        return 0
+
+    report = run(args.engines, args.difficulties, args.repeat, not args.no_memory, args.data_dir, args.timeout)
+    if args.setup:
+        report["setup"] = bench_setup()
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+            print(*regressions, sep="\n")
+            return 1
+        print(f"\nNo regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
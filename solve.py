@@ -0,0 +1,170 @@
+"""Solve puzzles from files or stdin and stream the answers to stdout, one line per puzzle.
+
+    echo 530070000600195000098000060800060003400803001700020006060000280000419005000080079 | python -m solve
+    python -m solve data/hard_puzzle.npy --engine algox --workers 4 > solutions.txt
+    python -m solve corpus.sdkp --count 1000
+    python -m solve --unique --stats < puzzles.txt
+
+Files are read by suffix: .npy stacks, packed .sdkp corpora, or otherwise the line format of
+`LineFormat`, whose length gives the board size. Stdin is read as lines unless it starts
+with the header of a .npy or packed file. Each answer is written as soon as it is found, in input
+order: the solution, or a line of `-` if there is none. --count writes the number of solutions
+up to a limit instead, and --unique writes unique, multiple or none; both count with AlgoX
+whatever the engine, so --engine cannot be given with them, and their --stats are just the count.
+
+Modules are imported only when needed. Solving lines with the default dlx engine on one worker
+never imports NumPy, so one puzzle is answered in tens of milliseconds."""
+import argparse
+import os
+import sys
+from itertools import islice
+from time import perf_counter
+
+from LineFormat import format_line, parse_line
+from uni_script.SudokuBitState import default_box as box_size
+
+# How the binary formats begin: a .npy file, and a packed corpus (`CorpusIO.MAGIC`)
+NPY_MAGIC = b"\x93NUMPY"
+PACKED_MAGIC = b"SUDOKUP1"
+
+def read_puzzles(paths, stdin):
+    """Yield the grids of each path in turn, reading "-" from the binary stream stdin."""
+    for path in paths:
+        if path == "-":
+            yield from read_stream(stdin)
+        elif path.endswith((".npy", ".sdkp")):
+            from CorpusIO import read_corpus
+            yield from read_corpus(path)
+        else:
+            with open(path, "rb") as f:
+                yield from read_stream(f)
+
+def read_stream(stream):
+    """Yield the grids of a binary stream, line by line unless it starts like a .npy or packed file."""
+    if not hasattr(stream, "peek"):
+        import io
+        stream = io.BufferedReader(stream)
+    head = stream.peek(len(PACKED_MAGIC))[:len(PACKED_MAGIC)]
+    if head.startswith(NPY_MAGIC):
+        import io
+        import numpy as np
+        yield from np.load(io.BytesIO(stream.read()))
+    elif head.startswith(PACKED_MAGIC):
+        import numpy as np
+        from CorpusIO import HEADER_SIZE, record_size, unpack
+        data = stream.read()
+        N = data[len(PACKED_MAGIC)]
+        count = (len(data) - HEADER_SIZE) // record_size(N)
+        yield from unpack(np.frombuffer(data, dtype=np.uint8, count=count * record_size(N), offset=HEADER_SIZE).reshape(count, -1), N)
+    else:
+        for line in stream:
+            if line.strip() and not line.startswith(b"#"):
+                yield parse_line(line)
+
+def solve_dlx(grid, size, stats=None):
+    """`Engines.solve_dlx` on grids of lists, which is all the default engine needs."""
+    import DLX
+    for solution in DLX.solve_sudoku(size, [list(row) for row in grid], stats):
+        return solution
+    N = size[0] * size[1]
+    return [[-1] * N for _ in range(N)]
+
+def answer(job) -> tuple:
+    """Answer one puzzle, returning its output line, a dict of its stats or None, and the seconds it took.
+
+    job is (grid, mode, engine, limit, with_stats). The stats are those of `SearchStats` when solving,
+    and only the number of solutions when counting, which does not count its search. This runs in
+    the worker processes too."""
+    grid, mode, engine, limit, with_stats = job
+    start = perf_counter()
+    stats = None
+    size = box_size(len(grid))
+    if mode == "solve":
+        if with_stats:
+            from SearchStats import SearchStats
+            stats = SearchStats()
+        if engine == "dlx":
+            line = format_line(solve_dlx(grid, size, stats))
+        else:
+            from Engines import get_engine
+            line = format_line(get_engine(engine)(grid, size, stats))
+        if stats is not None:
+            stats = stats.as_dict()
+    else:
+        from AlgoX import count_solutions
+        found = count_solutions(grid, limit, size)
+        if with_stats:
+            stats = {"solutions": found}
+        line = str(found) if mode == "count" else ("none", "unique", "multiple")[found]
+    return line, stats, perf_counter() - start
+
+def main(argv=None, stdin=None, stdout=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m solve", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("inputs", nargs="*", default=["-"], help="puzzle files, - for stdin (default: stdin)")
+    parser.add_argument("--engine", help="solver engine, one of Engines.ENGINES (default: dlx); --count and --unique always count with AlgoX")
+    parser.add_argument("--workers", type=int, default=1, help="processes to answer puzzles on (default: 1)")
+    parser.add_argument("--batch", type=int, default=256, help="puzzles handed to the workers at a time (default: 256)")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--count", type=int, metavar="LIMIT", help="write the number of solutions, counting up to LIMIT")
+    mode.add_argument("--unique", action="store_true", help="write whether each puzzle has a unique solution")
+    parser.add_argument("--stats", action="store_true", help="write the search stats of each puzzle and a summary to stderr")
+    args = parser.parse_args(argv)
+    stdin = sys.stdin.buffer if stdin is None else stdin
+    stdout = sys.stdout if stdout is None else stdout
+
+    if args.engine is not None and (args.count is not None or args.unique):
+        parser.error("--engine cannot be used with --count or --unique, which always count with AlgoX")
+    if args.engine is None:
+        args.engine = "dlx"
+    if args.engine != "dlx":
+        from Engines import get_engine
+        try:
+            get_engine(args.engine)
+        except ValueError as e:
+            parser.error(str(e))
+    if args.count is not None:
+        task = ("count", args.engine, args.count, args.stats)
+    elif args.unique:
+        task = ("unique", args.engine, 2, args.stats)
+    else:
+        task = ("solve", args.engine, None, args.stats)
+
+    puzzles = ((grid, *task) for grid in read_puzzles(args.inputs, stdin))
+    start = perf_counter()
+    total = 0
+    try:
+        if args.workers > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(args.workers) as executor:
+                # Hand out a batch at a time, so stdin is read as it arrives rather than all up front
+                while batch := list(islice(puzzles, args.batch)):
+                    for result in executor.map(answer, batch, chunksize=max(1, len(batch) // (4 * args.workers))):
+                        total = _write(stdout, total, *result)
+        else:
+            for job in puzzles:
+                total = _write(stdout, total, *answer(job))
+    except ValueError as e:
+        parser.exit(1, f"{parser.prog}: error: puzzle {total + 1}: {e}\n")
+    except BrokenPipeError:
+        # The reader went away, as `| head` does. Point stdout at devnull so closing it cannot fail again
+        if stdout is sys.stdout:
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+
+    if args.stats:
+        seconds = perf_counter() - start
+        print(f"# {total} puzzles in {seconds:.3f} s, {total / seconds if seconds else 0:.1f} puzzles/s", file=sys.stderr)
+    return 0
+
+def _write(stdout, total: int, line: str, stats, seconds: float) -> int:
+    """Write one answer, flushing so that it reaches the next stage of a pipeline at once."""
+    stdout.write(line + "\n")
+    stdout.flush()
+    total += 1
+    if stats is not None:
+        counts = " ".join(f"{name}={value:.6f}" if isinstance(value, float) else f"{name}={value}" for name, value in stats.items())
+        print(f"# puzzle {total}: {counts} time={seconds:.6f}", file=sys.stderr)
+    return total
+
+if __name__ == "__main__":
+    sys.exit(main())
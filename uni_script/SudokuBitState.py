@@ -0,0 +1,272 @@
+from math import isqrt
+
+# Cell geometry for each board size, shared by every state of that size
+_geometry = {}
+
+def default_box(n):
+    """
+    Return the (rows, cols) of the boxes of an n x n board - as square as possible, e.g. 3x3 for 9 and 2x3 for 6
+    """
+    box_rows = max(d for d in range(1, isqrt(n) + 1) if n % d == 0)
+    return box_rows, n // box_rows
+
+def get_geometry(n, box):
+    """
+    Return the row, column and box of every cell, and the peers of every cell, for an n x n board
+    with boxes of box = (rows, cols) cells
+    """
+    key = (n, box)
+    if key not in _geometry:
+        box_rows, box_cols = box
+        rows = [cell // n for cell in range(n * n)]
+        cols = [cell % n for cell in range(n * n)]
+        boxes = [(rows[cell] // box_rows) * box_rows + cols[cell] // box_cols for cell in range(n * n)]
+
+        # Build the peers unit by unit rather than comparing every pair of cells
+        units = {}
+        for cell in range(n * n):
+            for unit in (("r", rows[cell]), ("c", cols[cell]), ("b", boxes[cell])):
+                units.setdefault(unit, []).append(cell)
+        peers = []
+        for cell in range(n * n):
+            cell_peers = set(units[("r", rows[cell])]) | set(units[("c", cols[cell])]) | set(units[("b", boxes[cell])])
+            cell_peers.discard(cell)
+            peers.append(tuple(sorted(cell_peers)))
+        _geometry[key] = (rows, cols, boxes, peers)
+    return _geometry[key]
+
+
+class SudokuBitState:
+    """
+    A single mutable search state. Rows, columns and boxes keep the digits they hold as
+    n-bit masks (bit v-1 for digit v), so the candidates of a cell are the digits missing
+    from all three masks. Python integers have no fixed width, so this works for any n.
+    Every placement is recorded on a trail so it can be undone. A given outside 1..n raises ValueError.
+    """
+    def __init__(self, board, n=None, box=None):
+        self.n = n = n or len(board)
+        self.box = box = tuple(box) if box else default_box(n)
+        self.full = (1 << n) - 1
+        self.rows, self.cols, self.boxes, self.peers = get_geometry(n, box)
+        self.board = board.copy()
+
+        self.cells = [int(v) for row in board for v in row]
+        self.row_used = [0] * n
+        self.col_used = [0] * n
+        self.box_used = [0] * n
+        self.trail = []
+        self.filled = 0
+        self.repeats = False
+        self.stats = None # set to a stats object to count forced placements
+        self.buckets = None # empty cells by number of candidates, once track_remaining is called
+
+        for cell, value in enumerate(self.cells):
+            if value:
+                if not 1 <= value <= n:
+                    raise ValueError(f"Cell ({cell // n}, {cell % n}) holds {value}, which does not fit a {n}x{n} board")
+                bit = 1 << (value - 1)
+                r, c, b = self.rows[cell], self.cols[cell], self.boxes[cell]
+                if (self.row_used[r] | self.col_used[c] | self.box_used[b]) & bit:
+                    self.repeats = True
+                self.row_used[r] |= bit
+                self.col_used[c] |= bit
+                self.box_used[b] |= bit
+                self.filled += 1
+
+    def no_repeats(self):
+        """
+        Return true if no row, column or box of the starting board repeats a digit
+        """
+        return not self.repeats
+
+    def is_complete(self):
+        """
+        Return true if there are no more empty cells
+        """
+        return self.filled == self.n * self.n
+
+    def get_empty_cells(self):
+        """
+        Return the indices of the empty cells
+        """
+        return [cell for cell, value in enumerate(self.cells) if not value]
+
+    def candidates(self, cell):
+        """
+        Return the bitmask of the digits that can still go in an empty cell
+        """
+        return self.full & ~(self.row_used[self.rows[cell]] | self.col_used[self.cols[cell]] | self.box_used[self.boxes[cell]])
+
+    def get_possible_values(self, cell):
+        """
+        Return the digits that can still go in an empty cell
+        """
+        mask = self.candidates(cell)
+        return [v + 1 for v in range(self.n) if mask >> v & 1]
+
+    def track_remaining(self):
+        """
+        Start keeping every empty cell in a bucket for its number of candidates, and a count of the
+        empty peers of every cell, both updated as values are placed and undone. The most constrained
+        cell can then be found without scanning the board.
+        """
+        n, cells, peers = self.n, self.cells, self.peers
+        self.remaining = [0] * (n * n)
+        self.open_peers = [sum(1 for peer in peers[cell] if not cells[peer]) for cell in range(n * n)]
+        self.buckets = [set() for _ in range(n + 1)]
+        for cell in self.get_empty_cells():
+            count = self.candidates(cell).bit_count()
+            self.remaining[cell] = count
+            self.buckets[count].add(cell)
+
+    def _recount(self, cell, mask):
+        """
+        Move an empty cell to the bucket for the candidates in mask
+        """
+        count = mask.bit_count()
+        if count != self.remaining[cell]:
+            self.buckets[self.remaining[cell]].discard(cell)
+            self.buckets[count].add(cell)
+            self.remaining[cell] = count
+
+    def most_constrained(self):
+        """
+        Return the empty cell with the fewest candidates, breaking ties by the most empty peers
+        and then the lowest index. Needs track_remaining.
+        """
+        open_peers = self.open_peers
+        for bucket in self.buckets:
+            if bucket:
+                return min(bucket, key=lambda cell: (-open_peers[cell], cell))
+
+    def random_empty_cell(self, rng):
+        """
+        Return an empty cell chosen uniformly with rng, by counting along the board rather than listing the empty cells
+        """
+        skip = rng.randrange(self.n * self.n - self.filled)
+        for cell, value in enumerate(self.cells):
+            if not value:
+                if not skip:
+                    return cell
+                skip -= 1
+
+    def least_constraining(self, cell, mask):
+        """
+        Return the bit of the candidate in mask that rules out the fewest candidates of the empty
+        peers of cell, the lowest digit on a tie
+        """
+        cells, rows, cols, boxes = self.cells, self.rows, self.cols, self.boxes
+        row_used, col_used, box_used = self.row_used, self.col_used, self.box_used
+        peers = self.peers[cell]
+        best, fewest = 0, None
+        while mask:
+            bit = mask & -mask
+            mask ^= bit
+            ruled_out = 0
+            for peer in peers:
+                # A peer loses the digit unless it is filled or one of its units already holds it
+                if not cells[peer] and not (row_used[rows[peer]] | col_used[cols[peer]] | box_used[boxes[peer]]) & bit:
+                    ruled_out += 1
+            if fewest is None or ruled_out < fewest:
+                best, fewest = bit, ruled_out
+        return best
+
+    def mark(self):
+        """
+        Return a marker for the current position on the trail, to pass to undo
+        """
+        return len(self.trail)
+
+    def undo(self, mark):
+        """
+        Take back every placement made since mark was taken
+        """
+        cells, trail = self.cells, self.trail
+        while len(trail) > mark:
+            cell = trail.pop()
+            bit = ~(1 << (cells[cell] - 1))
+            self.row_used[self.rows[cell]] &= bit
+            self.col_used[self.cols[cell]] &= bit
+            self.box_used[self.boxes[cell]] &= bit
+            cells[cell] = 0
+            self.filled -= 1
+            if self.buckets is not None:
+                # The cell is empty again and its empty peers may have got a candidate back
+                for peer in self.peers[cell]:
+                    self.open_peers[peer] += 1
+                    if not cells[peer]:
+                        self._recount(peer, self.candidates(peer))
+                count = self.candidates(cell).bit_count()
+                self.remaining[cell] = count
+                self.buckets[count].add(cell)
+
+    def place(self, cell, value):
+        """
+        Put value in cell and then fill in every peer left with a single candidate, repeating for those.
+        Return false if this leaves some empty cell with no candidates, in which case the caller should undo.
+        """
+        cells, rows, cols, boxes = self.cells, self.rows, self.cols, self.boxes
+        row_used, col_used, box_used = self.row_used, self.col_used, self.box_used
+
+        pending = [(cell, value)]
+        while pending:
+            cell, value = pending.pop()
+            if cells[cell]:
+                # Already forced by an earlier placement
+                if cells[cell] != value:
+                    return False
+                continue
+
+            bit = 1 << (value - 1)
+            r, c, b = rows[cell], cols[cell], boxes[cell]
+            if (row_used[r] | col_used[c] | box_used[b]) & bit:
+                return False
+            row_used[r] |= bit
+            col_used[c] |= bit
+            box_used[b] |= bit
+            cells[cell] = value
+            self.trail.append(cell)
+            self.filled += 1
+            tracking = self.buckets is not None
+            if tracking:
+                self.buckets[self.remaining[cell]].discard(cell)
+                for peer in self.peers[cell]:
+                    self.open_peers[peer] -= 1
+
+            # Only the peers of this cell can have lost a candidate
+            for peer in self.peers[cell]:
+                if not cells[peer]:
+                    mask = self.full & ~(row_used[rows[peer]] | col_used[cols[peer]] | box_used[boxes[peer]])
+                    if tracking:
+                        self._recount(peer, mask)
+                    if not mask:
+                        return False
+                    if not mask & (mask - 1):
+                        pending.append((peer, mask.bit_length()))
+                        if self.stats is not None:
+                            self.stats.propagations += 1
+        return True
+
+    def fill_singles(self):
+        """
+        Fill in every empty cell of the starting board that has a single candidate.
+        Return false if some empty cell has no candidates.
+        """
+        for cell in self.get_empty_cells():
+            if self.cells[cell]:
+                continue
+            mask = self.candidates(cell)
+            if not mask:
+                return False
+            if not mask & (mask - 1) and not self.place(cell, mask.bit_length()):
+                return False
+        return True
+
+    def get_board(self):
+        """
+        Return a copy of the starting board with the current placements written in
+        """
+        board = self.board.copy()
+        for cell in self.trail:
+            board[self.rows[cell]][self.cols[cell]] = self.cells[cell]
+        return board
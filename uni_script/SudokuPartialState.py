@@ -1,10 +1,14 @@
 import copy
 
+from SudokuBitState import default_box
+
 class SudokuPartialState:
     number = 0
     
-    def __init__(self, board, n=9):
+    def __init__(self, board, n=9, box=None):
         self.n = n
+        # Size of the boxes as (rows, cols)
+        self.box_rows, self.box_cols = box if box else default_box(n)
         self.board = board 
         # Possible values for all empty cells
         self.possible_moves = {}
@@ -17,8 +21,8 @@ class SudokuPartialState:
         """
         Return true if all rows have no repeating values, false otherwise
         """
-        digit_count = { 0:1, 1:0, 2:0, 3:0, 4:0, 5:0, 6:0, 7:0, 8:0, 9:0 }
-        for c in range(9):
+        digit_count = dict.fromkeys(range(self.n + 1), 0)
+        for c in range(self.n):
             digit_count[self.board[row][c]] += 1
         digit_count.pop(0, None) # disregard empty cells
         for i in digit_count:
@@ -30,8 +34,8 @@ class SudokuPartialState:
         """
         Return true if all columns have no repeating values, false otherwise
         """
-        digit_count = { 0:1, 1:0, 2:0, 3:0, 4:0, 5:0, 6:0, 7:0, 8:0, 9:0 }
-        for r in range(9):
+        digit_count = dict.fromkeys(range(self.n + 1), 0)
+        for r in range(self.n):
             digit_count[self.board[r][col]] += 1
         digit_count.pop(0, None) # disregard empty cells
         for i in digit_count:
@@ -43,7 +47,7 @@ class SudokuPartialState:
         """
         Return true if all boxes have no repeating values, false otherwise
         """
-        digit_count = { 0:1, 1:0, 2:0, 3:0, 4:0, 5:0, 6:0, 7:0, 8:0, 9:0 }
+        digit_count = dict.fromkeys(range(self.n + 1), 0)
         for r in range(from_row, to_row):
             for c in range(from_col, to_col):
                 digit_count[self.board[r][c]] += 1
@@ -59,19 +63,19 @@ class SudokuPartialState:
         Return true if all rows, cols and boxes are valid, false otherwise
         """        
         # validate all rows        
-        for c in range(9):
+        for c in range(self.n):
             if not self.is_row_valid(c):
                 return False
 
         # validate all columns
-        for r in range(9):
+        for r in range(self.n):
             if not self.is_col_valid(r):
                 return False
 
         # validate all boxes
-        for x in range(0, 7, 3):
-            for y in range(0, 7, 3):
-                if not self.is_box_valid(x, x+3, y, y+3):
+        for x in range(0, self.n, self.box_rows):
+            for y in range(0, self.n, self.box_cols):
+                if not self.is_box_valid(x, x+self.box_rows, y, y+self.box_cols):
                     return False
                 
         return True
@@ -110,7 +114,7 @@ class SudokuPartialState:
         Calculate all the possible values of a cell in position (row, col)
         """
         # Get numbers in row, column and box and remove them from possible values list
-        possible_values = [i for i in range(1,10)]
+        possible_values = [i for i in range(1,self.n+1)]
         
         for num in self.board[row,:]:
             if num in possible_values:
@@ -118,8 +122,10 @@ class SudokuPartialState:
         for num in self.board[:,col]:
             if num in possible_values:
                 possible_values.remove(num)
-        for x in range((row//3)*3, (row//3)*3 + 3):
-            for y in range((col//3)*3, (col//3)*3 + 3):
+        b_row = row//self.box_rows * self.box_rows
+        b_col = col//self.box_cols * self.box_cols
+        for x in range(b_row, b_row + self.box_rows):
+            for y in range(b_col, b_col + self.box_cols):
                 num = self.board[x][y]
                 if num in possible_values:
                     possible_values.remove(num)
@@ -139,8 +145,8 @@ class SudokuPartialState:
         """
         positions = []
         
-        for r in range(9):
-            for c in range(9):
+        for r in range(self.n):
+            for c in range(self.n):
                 if self.board[r,c] == 0:
                     positions.append((r,c))
                     
@@ -162,7 +168,7 @@ class SudokuPartialState:
         value = self.board[row, col]
         
         # Remove from row
-        for c in range(9):
+        for c in range(self.n):
             if self.board[row, c] == 0:
                 try:
                     self.possible_moves[(row, c)].remove(value) # remove value
@@ -170,7 +176,7 @@ class SudokuPartialState:
                     pass
                 
         # Remove from column
-        for r in range(9):
+        for r in range(self.n):
             if self.board[r, col] == 0:
                 try:
                     self.possible_moves[(r, col)].remove(value) # remove value
@@ -178,10 +184,10 @@ class SudokuPartialState:
                     pass
                 
         # Remove from box
-        b_row = row//3 * 3
-        b_col = col//3 * 3
-        for y in range(b_row, b_row+3):
-            for x in range(b_col, b_col+3):
+        b_row = row//self.box_rows * self.box_rows
+        b_col = col//self.box_cols * self.box_cols
+        for y in range(b_row, b_row+self.box_rows):
+            for x in range(b_col, b_col+self.box_cols):
                 if self.board[y, x] == 0:
                     try:
                         self.possible_moves[(y, x)].remove(value) # remove value
@@ -0,0 +1,202 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from SudokuBitState import default_box, get_geometry
+from driver import sudoku_solver
+
+
+class SudokuSession:
+    """
+    One puzzle being played by hand. Each row, column and box counts how many times it holds each
+    digit, so placing or erasing a digit only touches the cell and its peers to keep the candidates
+    and the cells in conflict up to date, where SudokuPartialState.update_connected_empty_cells can
+    only take candidates away. Every move can be undone and redone.
+    Whether the grid can still be solved, and hints, come from a cached solution. It is searched
+    for again only once the grid leaves it, and the answers for the grids searched are kept too.
+    """
+    def __init__(self, puzzle, box=None, cell_choice="mrv", value_order="lcv", cache_size=256):
+        puzzle = np.asarray(puzzle)
+        self.n = n = len(puzzle)
+        self.box = tuple(box) if box else default_box(n)
+        self.full = (1 << n) - 1
+        self.rows, self.cols, self.boxes, self.peers = get_geometry(n, self.box)
+        self.cell_choice, self.value_order = cell_choice, value_order
+
+        self.cells = [0] * (n * n)
+        self.counts = [[0] * (n + 1) for _ in range(3 * n)] # for each row, then column, then box: how often it holds each digit
+        self.used = [0] * (3 * n) # for each unit, the bitmask of the digits it holds
+        self.conflicts = set() # filled cells that share a unit with the same digit
+        self.solution = None # the cells of a solution of the grid as it was at some point
+        self.off_path = set() # filled cells that disagree with that solution
+        for cell, value in enumerate(puzzle.ravel().tolist()):
+            if value:
+                self._set(cell, int(value))
+        self.givens = frozenset(cell for cell, value in enumerate(self.cells) if value)
+
+        self.history = [] # (cell, old value, new value) of every move made, and
+        self.undone = [] # of every move undone since the last one made
+        self.results = OrderedDict() # the solution, or None, found for each grid searched
+        self.cache_size = cache_size
+        self.searches = 0
+
+    def _units(self, cell):
+        n = self.n
+        return self.rows[cell], n + self.cols[cell], 2 * n + self.boxes[cell]
+
+    def _in_conflict(self, cell):
+        value = self.cells[cell]
+        return value and any(self.counts[unit][value] > 1 for unit in self._units(cell))
+
+    def _set(self, cell, value):
+        """
+        Put value (0 to erase) in cell, updating the counts, candidates, conflicts and solution path
+        of the cell and its peers
+        """
+        old = self.cells[cell]
+        if old:
+            for unit in self._units(cell):
+                self.counts[unit][old] -= 1
+                if not self.counts[unit][old]:
+                    self.used[unit] &= ~(1 << (old - 1))
+        self.cells[cell] = value
+        if value:
+            for unit in self._units(cell):
+                self.counts[unit][value] += 1
+                self.used[unit] |= 1 << (value - 1)
+
+        # Only the peers holding the digit that left or arrived can have changed conflict
+        if self._in_conflict(cell):
+            self.conflicts.add(cell)
+        else:
+            self.conflicts.discard(cell)
+        for peer in self.peers[cell]:
+            if self.cells[peer] and self.cells[peer] in (old, value):
+                if self._in_conflict(peer):
+                    self.conflicts.add(peer)
+                else:
+                    self.conflicts.discard(peer)
+
+        if self.solution is not None:
+            if value and value != self.solution[cell]:
+                self.off_path.add(cell)
+            else:
+                self.off_path.discard(cell)
+
+    def _move(self, row, col, value):
+        cell = row * self.n + col
+        if cell in self.givens:
+            raise ValueError(f"Cell ({row}, {col}) is a given")
+        if not 0 <= value <= self.n:
+            raise ValueError(f"{value} does not fit a {self.n}x{self.n} grid")
+        old = self.cells[cell]
+        if old != value:
+            self._set(cell, value)
+            self.history.append((cell, old, value))
+            self.undone.clear()
+
+    def place(self, row, col, value):
+        """
+        Put value in an empty or filled cell that is not a given
+        """
+        self._move(row, col, value)
+
+    def erase(self, row, col):
+        """
+        Empty a cell that is not a given
+        """
+        self._move(row, col, 0)
+
+    def undo(self):
+        """
+        Take back the last move, returning false if there is none
+        """
+        if not self.history:
+            return False
+        cell, old, value = self.history.pop()
+        self._set(cell, old)
+        self.undone.append((cell, old, value))
+        return True
+
+    def redo(self):
+        """
+        Make the last move undone again, returning false if there is none
+        """
+        if not self.undone:
+            return False
+        cell, old, value = self.undone.pop()
+        self._set(cell, value)
+        self.history.append((cell, old, value))
+        return True
+
+    def get_possible_values(self, row, col):
+        """
+        Return the digits that no peer of the cell holds
+        """
+        cell = row * self.n + col
+        r, c, b = self._units(cell)
+        mask = self.full & ~(self.used[r] | self.used[c] | self.used[b])
+        return [v + 1 for v in range(self.n) if mask >> v & 1]
+
+    def get_conflicts(self):
+        """
+        Return the (row, col) of every filled cell that shares a row, column or box with the same digit
+        """
+        return sorted(divmod(cell, self.n) for cell in self.conflicts)
+
+    def get_board(self):
+        """
+        Return the grid as an n x n numpy array
+        """
+        return np.array(self.cells).reshape(self.n, self.n)
+
+    def is_complete(self):
+        """
+        Return true if every cell is filled in and none is in conflict
+        """
+        return all(self.cells) and not self.conflicts
+
+    def is_solvable(self):
+        """
+        Return true if the grid as it is can still be completed. This needs no search while every
+        filled cell agrees with the cached solution
+        """
+        if self.conflicts:
+            return False
+        if self.solution is not None and not self.off_path:
+            return True
+        key = bytes(self.cells) if self.n < 256 else tuple(self.cells)
+        if key in self.results:
+            self.results.move_to_end(key)
+            solution = self.results[key]
+        else:
+            self.searches += 1
+            result = sudoku_solver(self.get_board(), None, self.box, None, self.cell_choice, self.value_order)
+            solution = None if result[0][0] == -1 else [int(v) for v in np.asarray(result).ravel()]
+            self.results[key] = solution
+            if len(self.results) > self.cache_size:
+                self.results.popitem(last=False)
+        if solution is not None:
+            # Every filled cell agrees with a solution of the grid it was found for
+            self.solution = solution
+            self.off_path = set()
+        return solution is not None
+
+    def hint(self):
+        """
+        Return (row, col, value) for the empty cell with the fewest candidates, from a solution of
+        the grid as it is, or None if the grid is full or cannot be solved
+        """
+        if not self.is_solvable():
+            return None
+        best, fewest = None, self.n + 1
+        for cell, value in enumerate(self.cells):
+            if not value:
+                r, c, b = self._units(cell)
+                count = (self.full & ~(self.used[r] | self.used[c] | self.used[b])).bit_count()
+                if count < fewest:
+                    best, fewest = cell, count
+        if best is None:
+            return None
+        row, col = divmod(best, self.n)
+        return row, col, self.solution[best]
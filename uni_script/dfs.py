@@ -1,5 +1,12 @@
 import random 
 
+# How trail_search picks the next cell: a random empty one, or the one with the fewest candidates
+# (minimum remaining values) breaking ties by the most empty peers (degree)
+CELL_CHOICES = ("random", "mrv")
+
+# How trail_search orders the values of a cell: randomly, or the least constraining value first
+VALUE_ORDERS = ("random", "lcv")
+
 def pick_next_cell(partial_state):
     """
     Pick the next cell to try to place values into.
@@ -15,21 +22,103 @@ def order_values(partial_state, row, col):
     random.shuffle(values)
     return values
 
-def depth_first_search(partial_state):
+def depth_first_search(partial_state, budget=None):
+    """
+    DFS to search all of the possible states, keeping the path on an explicit stack rather than
+    recursing so that large boards cannot hit the recursion limit. Each new state is checked
+    once, as valid and then complete, rather than rescanned for is_goal and is_valid.
+    If a budget object is passed, its tick method is called at every state and may raise to stop the search.
+    """
+    stack = [] # (state, cell, values left to try) for each state on the current path
+    state = partial_state
+    while True:
+        if budget is not None:
+            budget.tick()
+        (row,col) = pick_next_cell(state) # pick the next cell to fill with a value
+        stack.append((state, row, col, iter(order_values(state, row, col))))
+
+        while stack:
+            state, row, col, values = stack[-1]
+            for value in values:
+                new_state = state.set_value(row, col, value)
+                if new_state.is_valid():
+                    if new_state.is_complete():
+                        return new_state
+                    break
+            else:
+                stack.pop() # no value works here, so go back to the previous state
+                continue
+            state = new_state
+            break
+        else:
+            return None # This is returned if no valid solutions exist
+
+def random_bit(mask, rng):
+    """
+    Return one set bit of mask, chosen uniformly with rng
     """
-    Recursive implementation of DFS to search all of the possible states
+    skip = rng.randrange(mask.bit_count())
+    while skip:
+        mask &= mask - 1
+        skip -= 1
+    return mask & -mask
+
+def trail_search(state, stats=None, depth=0, budget=None, cell_choice="random", value_order="random", rng=random):
     """
-    (row,col) = pick_next_cell(partial_state) # pick the next cell to fill with a value
-    values = order_values(partial_state, row, col)
+    DFS over a single SudokuBitState. Moves are made in place and taken back with undo on
+    backtrack, so no state is ever copied, and the guesses are kept on an explicit stack
+    rather than recursing. The values left to try at each guess are kept as a bitmask and taken
+    from it one bit at a time, so no list is built at a node.
+    If a stats object is passed, nodes, dead ends and the deepest level are counted on it.
+    If a budget object is passed, its tick method is called at every node and may raise to stop the search.
+    cell_choice and value_order pick the heuristics, from CELL_CHOICES and VALUE_ORDERS. The random
+    ones draw from rng, so pass a seeded random.Random to make a run repeatable. With "mrv" the
+    state tracks its candidate counts as it goes, so no cell is scanned to find the next one.
+    """
+    if cell_choice == "mrv" and state.buckets is None:
+        state.track_remaining()
+
+    # For each guess on the current path: its cell, the candidates not yet tried there, and the trail mark before it
+    cells, untried, marks = [], [], []
+    while True:
+        if budget is not None:
+            budget.tick()
+        if stats is not None:
+            stats.nodes += 1
+            stats.depth(depth + len(cells))
+        # pick the next cell to fill with a value
+        if cell_choice == "mrv":
+            cell = state.most_constrained()
+        else:
+            cell = state.random_empty_cell(rng)
+        cells.append(cell)
+        untried.append(state.candidates(cell))
+        marks.append(state.mark())
 
-    for value in values:
-        new_state = partial_state.set_value(row, col, value)
-        if new_state.is_goal():
-            #print("Goal!")
-            return new_state
-        if new_state.is_valid():
-            deep_state = depth_first_search(new_state)
-            if deep_state is not None and deep_state.is_goal():
-                return deep_state
-        
-    return None # This is returned if no valid solutions exist
\ No newline at end of file
+        while cells:
+            cell, mask, mark = cells[-1], untried[-1], marks[-1]
+            state.undo(mark) # take back the value tried last here, if any
+            while mask:
+                if value_order == "lcv":
+                    bit = state.least_constraining(cell, mask)
+                else:
+                    bit = random_bit(mask, rng)
+                mask ^= bit
+                if state.place(cell, bit.bit_length()):
+                    break
+                state.undo(mark)
+            else:
+                if stats is not None:
+                    stats.backtracks += 1
+                cells.pop()
+                untried.pop()
+                marks.pop()
+                continue
+            untried[-1] = mask
+            if state.is_complete():
+                if stats is not None:
+                    stats.solutions += 1
+                return state
+            break
+        else:
+            return None # This is returned if no valid solutions exist
@@ -1,27 +1,64 @@
+import random
+import time
+
 import numpy as np
 
-from SudokuPartialState import SudokuPartialState
-from dfs import depth_first_search
+from SudokuBitState import SudokuBitState
+from dfs import CELL_CHOICES, VALUE_ORDERS, trail_search
 
-def sudoku_solver(sudoku):
+def sudoku_solver(sudoku, stats=None, box=None, budget=None, cell_choice="random", value_order="random", seed=None):
     """
     Solves a Sudoku puzzle and returns its unique solution.
 
     Input
-        sudoku : 9x9 numpy array
+        sudoku : nxn numpy array (9x9 for a standard sudoku)
             Empty cells are designated by 0.
 
+        stats : optional SearchStats-like object
+            If given, the search is counted on it and each phase of the solve is timed.
+
+        box : optional (rows, cols)
+            The size of the boxes, otherwise as square as fits the board.
+
+        budget : optional SearchBudget-like object
+            Ticked at every search node. Whatever it raises to stop the search is passed on to the caller.
+
+        cell_choice, value_order : the search heuristics, see dfs.CELL_CHOICES and dfs.VALUE_ORDERS
+            "mrv" and "lcv" give the same search every run.
+
+        seed : optional
+            Seeds the random choices, otherwise they come from the random module.
+
     Output
-        9x9 numpy array of integers
+        nxn numpy array of integers
             It contains the solution, if there is one. If there is no solution, all array entries should be -1.
     """
-    solved_sudoku = SudokuPartialState(board=sudoku)
-    if solved_sudoku.no_repeats():
-        solved_sudoku = depth_first_search(SudokuPartialState(board=sudoku))
+    if cell_choice not in CELL_CHOICES or value_order not in VALUE_ORDERS:
+        raise ValueError(f"Unknown heuristic {cell_choice!r}/{value_order!r}, expected one of {CELL_CHOICES}/{VALUE_ORDERS}")
+    if stats is not None:
+        start = time.perf_counter()
+    n = len(sudoku)
+    try:
+        state = SudokuBitState(board=sudoku, n=n, box=box)
+        state.stats = stats
+    except ValueError:
+        state = None # a given that is not a digit of the board, so there is no solution
+    if stats is not None:
+        start = stats.lap("build", start)
+
+    if state is not None and state.no_repeats() and state.fill_singles():
+        if stats is not None:
+            start = stats.lap("propagate", start)
+        solved_sudoku = state if state.is_complete() else trail_search(state, stats, 0, budget, cell_choice, value_order, random if seed is None else random.Random(seed))
     else:
         solved_sudoku = None
+    if stats is not None:
+        start = stats.lap("search", start)
     
     if solved_sudoku is not None:    
-        return solved_sudoku.board
+        board = solved_sudoku.get_board()
     else:
-        return np.full((9,9),-1)
\ No newline at end of file
+        board = np.full((n,n),-1)
+    if stats is not None:
+        stats.lap("write_back", start)
+    return board
\ No newline at end of file